@@ -1,6 +1,7 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.database import db
+from app.executor import ExecutorSaturatedError
 from typing import Optional
 
 security = HTTPBearer()
@@ -9,7 +10,15 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     """Mevcut kullanıcıyı Firebase ID token'dan al"""
     token = credentials.credentials
     
-    user = await db.verify_user_token(token)
+    try:
+        user = await db.verify_user_token(token)
+    except ExecutorSaturatedError:
+        # Doğrulama kuyruğu dolu; worker'ı bloklamak yerine istemci tekrar denesin
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Kimlik doğrulama servisi şu anda yoğun, lütfen tekrar deneyin",
+            headers={"Retry-After": "1"},
+        )
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,261 @@
+import hashlib
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+from app.config import settings
+
+def _estimate_size(value: Any) -> int:
+    """Bir değerin yaklaşık bellek boyutunu (byte) hesapla"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_estimate_size(k) + _estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set)):
+        size += sum(_estimate_size(item) for item in value)
+    return size
+
+class LRUCache:
+    """
+    TTL ve bellek sınırı olan LRU cache
+
+    Kayıtlar en son kullanılma sırasına göre tutulur. Toplam tahmini boyut
+    max_bytes'ı aştığında en eski kayıtlar atılır; süresi dolan kayıtlar
+    okunurken düşürülür. on_remove verilmişse cache'ten çıkan her kaydın
+    anahtarıyla çağrılır (clear hariç).
+    """
+
+    def __init__(self, ttl: float, max_bytes: int, on_remove: Optional[Callable[[Hashable], None]] = None):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.on_remove = on_remove
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, int]]" = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Kayıt cache'te mi (süre kontrolü yapılmaz, sayaçlar değişmez)"""
+        return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Kaydı getir; yoksa veya süresi dolmuşsa None döndür"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at, _ = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Kaydı ekle veya güncelle, gerekirse eski kayıtları at"""
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            self.delete(key)
+            return
+        self._remove(key)
+        self._entries[key] = (value, time.monotonic() + self.ttl, size)
+        self._size += size
+        while self._size > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        """Kaydı sil"""
+        self._remove(key)
+
+    def clear(self) -> None:
+        """Tüm kayıtları sil"""
+        self._entries.clear()
+        self._size = 0
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry[2]
+            if self.on_remove is not None:
+                self.on_remove(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache boyutlandırması için sayaçları döndür"""
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+class NoteCache:
+    """
+    Kullanıcı ve not bazlı read-through cache
+
+    Tekil notlar (user_id, note_id) anahtarıyla ve biliniyorsa Firestore
+    update_time'ı ile birlikte tutulur; bu sayede koşullu yazmalar okuma
+    yapmadan precondition kullanabilir. Liste sayfaları ise
+    (user_id, sorgu parametreleri) anahtarıyla tutulur. Yazma işlemleri
+    notu yerinde günceller ve kullanıcının tüm liste sayfalarını geçersiz kılar.
+    Kullanıcının liste anahtarları ayrı bir indekste tutulur; LRU'dan atılan
+    veya süresi dolan sayfalar bu indeksten de çıkarılır, böylece indeks
+    cache'teki sayfa sayısıyla sınırlı kalır.
+    Cache process içidir; birden fazla worker arasında en fazla TTL kadar
+    eski veri görülebilir.
+    """
+
+    def __init__(self, ttl: float, max_bytes: int):
+        self._cache = LRUCache(ttl=ttl, max_bytes=max_bytes, on_remove=self._forget_list_key)
+        self._list_keys: Dict[str, Set[Hashable]] = {}
+
+    def _forget_list_key(self, key: Hashable) -> None:
+        """Cache'ten çıkan liste sayfasını kullanıcının liste indeksinden sil"""
+        if key[0] != "list":
+            return
+        keys = self._list_keys.get(key[1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._list_keys[key[1]]
+
+    def get_note(self, user_id: str, note_id: str) -> Optional[dict]:
+        note, _ = self.get_note_version(user_id, note_id)
+        return note
+
+    def get_note_version(self, user_id: str, note_id: str) -> Tuple[Optional[dict], Optional[Any]]:
+        """Notu ve Firestore update_time'ını getir"""
+        entry = self._cache.get(("note", user_id, note_id))
+        if entry is None:
+            return None, None
+        note, update_time = entry
+        return dict(note), update_time
+
+    def put_note(self, user_id: str, note: dict, update_time: Optional[Any] = None) -> None:
+        self._cache.set(("note", user_id, note["id"]), (dict(note), update_time))
+
+    def invalidate_note(self, user_id: str, note_id: str) -> None:
+        self._cache.delete(("note", user_id, note_id))
+
+    def get_list(self, user_id: str, params: Hashable) -> Optional[Tuple[List[dict], Optional[str]]]:
+        cached = self._cache.get(("list", user_id, params))
+        if cached is None:
+            return None
+        notes, next_page_token = cached
+        return [dict(note) for note in notes], next_page_token
+
+    def put_list(
+        self,
+        user_id: str,
+        params: Hashable,
+        notes: List[dict],
+        next_page_token: Optional[str],
+        update_times: Optional[List[Any]] = None,
+        warm_notes: bool = True
+    ) -> None:
+        key = ("list", user_id, params)
+        self._cache.set(key, ([dict(note) for note in notes], next_page_token))
+        if key in self._cache:
+            self._list_keys.setdefault(user_id, set()).add(key)
+        if not warm_notes:
+            return
+        # Liste sonucu tekil not kayıtlarını da ısıtır
+        update_times = update_times or [None] * len(notes)
+        for note, update_time in zip(notes, update_times):
+            self.put_note(user_id, note, update_time)
+
+    def invalidate_lists(self, user_id: str) -> None:
+        for key in self._list_keys.pop(user_id, set()):
+            self._cache.delete(key)
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._list_keys.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._cache.stats(), "list_index_users": len(self._list_keys)}
+
+class TokenCache:
+    """
+    Doğrulanmış Firebase ID token'ları için cache
+
+    Anahtar token'ın SHA-256 hash'idir; ham token bellekte tutulmaz.
+    Geçerli token'lar claim'lerdeki exp zamanına kadar, geçersiz token'lar
+    ise kısa bir süre (negatif cache) boyunca tutulur. Kayıt sayısı
+    max_entries ile sınırlıdır; dolduğunda en eski kullanılan kayıt atılır.
+    """
+
+    def __init__(self, max_entries: int, negative_ttl: float):
+        self.max_entries = max_entries
+        self.negative_ttl = negative_ttl
+        self._entries: "OrderedDict[bytes, Tuple[Optional[dict], float]]" = OrderedDict()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Tuple[bool, Optional[dict]]:
+        """(bulundu mu, kullanıcı) döndür; negatif kayıtlarda kullanıcı None'dır"""
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+        user, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return False, None
+        self._entries.move_to_end(key)
+        if user is None:
+            self.negative_hits += 1
+            return True, None
+        self.hits += 1
+        return True, dict(user)
+
+    def put(self, token: str, user: dict, expires_at: float) -> None:
+        """Doğrulanmış kullanıcıyı token'ın exp zamanına (epoch saniye) kadar sakla"""
+        self._set(self._key(token), (dict(user), expires_at))
+
+    def put_invalid(self, token: str) -> None:
+        """Geçersiz token'ı negative_ttl boyunca sakla"""
+        self._set(self._key(token), (None, time.time() + self.negative_ttl))
+
+    def _set(self, key: bytes, entry: Tuple[Optional[dict], float]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "negative_ttl_seconds": self.negative_ttl,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+# Global cache instance
+note_cache = NoteCache(ttl=settings.NOTE_CACHE_TTL, max_bytes=settings.NOTE_CACHE_MAX_BYTES)
+ai_analysis_cache = LRUCache(ttl=settings.AI_CACHE_TTL, max_bytes=settings.AI_CACHE_MAX_BYTES)
+token_cache = TokenCache(max_entries=settings.TOKEN_CACHE_MAX_ENTRIES, negative_ttl=settings.TOKEN_NEGATIVE_CACHE_TTL)
@@ -1,9 +1,11 @@
 from .auth_commands import VerifyTokenCommand, RefreshTokenCommand
 from .note_commands import (
-    CreateNoteCommand, UpdateNoteCommand, DeleteNoteCommand, RestoreNoteCommand
+    CreateNoteCommand, UpdateNoteCommand, DeleteNoteCommand, RestoreNoteCommand,
+    BatchNotesCommand, CreateAIJobCommand, BulkAnalyzeNotesCommand
 )
 
 __all__ = [
     "VerifyTokenCommand", "RefreshTokenCommand",
-    "CreateNoteCommand", "UpdateNoteCommand", "DeleteNoteCommand", "RestoreNoteCommand"
+    "CreateNoteCommand", "UpdateNoteCommand", "DeleteNoteCommand", "RestoreNoteCommand",
+    "BatchNotesCommand", "CreateAIJobCommand", "BulkAnalyzeNotesCommand"
 ]
\ No newline at end of file
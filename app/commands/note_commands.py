@@ -1,13 +1,14 @@
 from dataclasses import dataclass
 from typing import Optional
 from uuid import UUID
-from app.models.note_models import NoteCreateRequest, NoteUpdateRequest
+from app.models.note_models import NoteCreateRequest, NoteUpdateRequest, NoteBatchRequest, NoteBulkAnalysisRequest
 
 @dataclass
 class CreateNoteCommand:
     """Not oluşturma komutu"""
     note_data: NoteCreateRequest
     user_id: str
+    check_duplicates: bool = False
 
 @dataclass
 class UpdateNoteCommand:
@@ -28,6 +29,24 @@ class RestoreNoteCommand:
     note_id: UUID
     user_id: str
 
+@dataclass
+class BatchNotesCommand:
+    """Toplu not işlemleri komutu"""
+    batch: NoteBatchRequest
+    user_id: str
+
+@dataclass
+class CreateAIJobCommand:
+    """Asenkron AI analiz işi oluşturma komutu"""
+    note_id: UUID
+    user_id: str
+
+@dataclass
+class BulkAnalyzeNotesCommand:
+    """Toplu AI analizi komutu"""
+    request: NoteBulkAnalysisRequest
+    user_id: str
+
 @dataclass
 class GetNotesCommand:
     """Notları getirme komutu"""
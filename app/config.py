@@ -16,12 +16,73 @@ class Settings:
     FIREBASE_AUTH_PROVIDER_X509_CERT_URL: str = os.getenv("FIREBASE_AUTH_PROVIDER_X509_CERT_URL", "https://www.googleapis.com/oauth2/v1/certs")
     FIREBASE_CLIENT_X509_CERT_URL: str = os.getenv("FIREBASE_CLIENT_X509_CERT_URL", "")
     
+    # Firestore Configuration
+    FIRESTORE_TIMEOUT: float = float(os.getenv("FIRESTORE_TIMEOUT", "10"))
+    
+    # Note Cache Configuration
+    NOTE_CACHE_TTL: float = float(os.getenv("NOTE_CACHE_TTL", "60"))
+    NOTE_CACHE_MAX_BYTES: int = int(os.getenv("NOTE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    
+    # Auth Token Cache Configuration
+    TOKEN_CACHE_MAX_ENTRIES: int = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+    TOKEN_NEGATIVE_CACHE_TTL: float = float(os.getenv("TOKEN_NEGATIVE_CACHE_TTL", "30"))
+    FIREBASE_CERT_REFRESH_INTERVAL: float = float(os.getenv("FIREBASE_CERT_REFRESH_INTERVAL", "1800"))
+    TOKEN_VERIFY_WORKERS: int = int(os.getenv("TOKEN_VERIFY_WORKERS", "4"))
+    TOKEN_VERIFY_MAX_PENDING: int = int(os.getenv("TOKEN_VERIFY_MAX_PENDING", "256"))
+    TOKEN_VERIFY_MAX_WAIT: float = float(os.getenv("TOKEN_VERIFY_MAX_WAIT", "2"))
+    
     # API Configuration
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "Notes API"
     
     # Gemini API Configuration
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
+    GEMINI_CONNECT_TIMEOUT: float = float(os.getenv("GEMINI_CONNECT_TIMEOUT", "5"))
+    GEMINI_READ_TIMEOUT: float = float(os.getenv("GEMINI_READ_TIMEOUT", "30"))
+    GEMINI_MAX_CONNECTIONS: int = int(os.getenv("GEMINI_MAX_CONNECTIONS", "20"))
+    GEMINI_KEEPALIVE_EXPIRY: float = float(os.getenv("GEMINI_KEEPALIVE_EXPIRY", "60"))
+    GEMINI_STRUCTURED_OUTPUT: bool = os.getenv("GEMINI_STRUCTURED_OUTPUT", "true").lower() == "true"
+    GEMINI_RATE_LIMIT_RPS: float = float(os.getenv("GEMINI_RATE_LIMIT_RPS", "5"))
+    GEMINI_RATE_LIMIT_BURST: float = float(os.getenv("GEMINI_RATE_LIMIT_BURST", "10"))
+    GEMINI_RATE_LIMIT_MAX_WAIT: float = float(os.getenv("GEMINI_RATE_LIMIT_MAX_WAIT", "2"))
+    GEMINI_MAX_RETRIES: int = int(os.getenv("GEMINI_MAX_RETRIES", "2"))
+    GEMINI_RETRY_BASE_DELAY: float = float(os.getenv("GEMINI_RETRY_BASE_DELAY", "0.5"))
+    GEMINI_RETRY_MAX_DELAY: float = float(os.getenv("GEMINI_RETRY_MAX_DELAY", "8"))
+    GEMINI_RETRY_BUDGET: float = float(os.getenv("GEMINI_RETRY_BUDGET", "10"))
+    GEMINI_CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("GEMINI_CIRCUIT_FAILURE_THRESHOLD", "5"))
+    GEMINI_CIRCUIT_RESET_TIMEOUT: float = float(os.getenv("GEMINI_CIRCUIT_RESET_TIMEOUT", "30"))
+    
+    # AI Analysis Cache Configuration
+    AI_CACHE_TTL: float = float(os.getenv("AI_CACHE_TTL", "86400"))
+    AI_CACHE_MAX_BYTES: int = int(os.getenv("AI_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+    
+    # AI Job Queue Configuration
+    AI_JOB_WORKERS: int = int(os.getenv("AI_JOB_WORKERS", "4"))
+    AI_JOB_MAX_QUEUE: int = int(os.getenv("AI_JOB_MAX_QUEUE", "100"))
+    AI_JOB_TTL: float = float(os.getenv("AI_JOB_TTL", "600"))
+    
+    # Bulk AI Analysis Configuration
+    AI_BULK_CONCURRENCY: int = int(os.getenv("AI_BULK_CONCURRENCY", "4"))
+    AI_BULK_PACK_SIZE: int = int(os.getenv("AI_BULK_PACK_SIZE", "8"))
+    AI_BULK_PACK_MAX_CHARS: int = int(os.getenv("AI_BULK_PACK_MAX_CHARS", "1000"))
+    AI_BULK_PROMPT_MAX_CHARS: int = int(os.getenv("AI_BULK_PROMPT_MAX_CHARS", "8000"))
+    AI_BULK_WRITE_BATCH: int = int(os.getenv("AI_BULK_WRITE_BATCH", "50"))
+    
+    # Long Note (Chunked) AI Analysis Configuration
+    AI_CHUNK_MAX_TOKENS: int = int(os.getenv("AI_CHUNK_MAX_TOKENS", "2000"))
+    AI_CHUNK_CONCURRENCY: int = int(os.getenv("AI_CHUNK_CONCURRENCY", "4"))
+    
+    # Full-Text Search Index Configuration
+    SEARCH_INDEX_MAX_USERS: int = int(os.getenv("SEARCH_INDEX_MAX_USERS", "1000"))
+    SEARCH_INDEX_REFRESH_INTERVAL: float = float(os.getenv("SEARCH_INDEX_REFRESH_INTERVAL", "60"))
+    
+    # Reminder Scheduler Configuration
+    # Birden fazla instance'ta sadece bir instance'ta true olmalı (zamanlayıcının tek sahibi)
+    REMINDER_SCHEDULER_ENABLED: bool = os.getenv("REMINDER_SCHEDULER_ENABLED", "true").lower() == "true"
+    REMINDER_RELOAD_INTERVAL: float = float(os.getenv("REMINDER_RELOAD_INTERVAL", "300"))
+    REMINDER_DUE_SOON_LEAD: float = float(os.getenv("REMINDER_DUE_SOON_LEAD", "3600"))
+    REMINDER_SINK_MAX_QUEUE: int = int(os.getenv("REMINDER_SINK_MAX_QUEUE", "10000"))
+    REMINDER_LOAD_PAGE_SIZE: int = int(os.getenv("REMINDER_LOAD_PAGE_SIZE", "1000"))
     
     def get_firebase_credentials(self) -> dict:
         """Firebase service account credentials'ını döndür"""
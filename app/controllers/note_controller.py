@@ -1,27 +1,364 @@
-from fastapi import HTTPException, status
-from typing import List
+import json
+import logging
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from fastapi import HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
 from uuid import UUID
 from app.models.note_models import (
-    NoteCreateRequest, NoteUpdateRequest, NoteResponse, AIAnalysisResponse
+    NoteCreateRequest, NoteUpdateRequest, NoteResponse, NoteSummaryResponse, AIAnalysisResponse, AIJobResponse,
+    NoteBatchRequest, NoteBatchResult, NoteLookupRequest, NoteLookupResult,
+    NoteBulkAnalysisRequest, NoteBulkAnalysisResult,
+    NoteChangesResponse, NoteSearchResult, TagFacet, NoteCalendarItem, CalendarDay,
+    NoteCreateResponse, DuplicateCluster
 )
-from app.models.base import StandardResponse
-from app.database import db
+from app.models.base import StandardResponse, PaginatedResponse
+from app.database import db, PreconditionFailedError
+from app.services.analysis_service import analysis_service, AIAnalysisError, AIUnavailableError
+from app.services.ai_job_queue import ai_job_queue, AIJobQueueFullError
+from app.etag import note_etag, list_etag, if_none_match as etag_if_none_match
+from app.responses import model_response
 from app.auth import get_current_user_id
-from app.services.gemini_service import gemini_service
+
+# Liste projeksiyonunda istenebilecek alanlar
+NOTE_FIELDS = set(NoteResponse.model_fields)
+
+# Firestore array_contains_any'nin kabul ettiği en fazla değer
+MAX_TAG_FILTERS = 30
+
+# Takvim sorgusunda izin verilen en uzun aralık
+MAX_CALENDAR_DAYS = 366
+
+# view=summary için Firestore'dan okunacak alanlar
+SUMMARY_FIELDS = list(NoteSummaryResponse.model_fields)
+
+# Hızlı serialization yolunda kullanılan, bir kez parametrize edilmiş response tipleri
+NoteListResponse = PaginatedResponse[List[NoteResponse]]
+NoteSummaryListResponse = PaginatedResponse[List[NoteSummaryResponse]]
+NoteFieldsListResponse = PaginatedResponse[List[Dict[str, Any]]]
+NoteDetailResponse = StandardResponse[NoteResponse]
+NoteLookupListResponse = StandardResponse[List[NoteLookupResult]]
+NoteChangesEnvelope = StandardResponse[NoteChangesResponse]
+NoteSearchListResponse = StandardResponse[List[NoteSearchResult]]
+TagFacetListResponse = StandardResponse[List[TagFacet]]
+CalendarResponse = StandardResponse[List[CalendarDay]]
+NoteCalendarListResponse = StandardResponse[List[NoteCalendarItem]]
+DuplicateClusterListResponse = StandardResponse[List[DuplicateCluster]]
+
+def _localize(value: datetime, zone: ZoneInfo) -> datetime:
+    """Tarihi verilen saat dilimine çevir; timezone'suz tarihler UTC kabul edilir"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(zone)
+
+def _group_by_day(notes: List[dict], start: datetime, end: datetime, zone: ZoneInfo) -> List[Dict[str, Any]]:
+    """
+    Notları etkin oldukları günlere dağıt
+    
+    Birden fazla güne yayılan not, istenen aralığa düşen her günün altında
+    yer alır. Notlar başlangıca göre sıralı geldiği için her günün listesi
+    de sıralı kalır.
+    """
+    first, last = start.astimezone(zone).date(), end.astimezone(zone).date()
+    days: Dict[date, List[dict]] = {}
+    for note in notes:
+        bounds = [_localize(value, zone) for value in (note.get("start_date"), note.get("end_date")) if value]
+        day = max(min(bounds).date(), first)
+        last_day = min(max(bounds).date(), last)
+        while day <= last_day:
+            days.setdefault(day, []).append(note)
+            day += timedelta(days=1)
+    return [{"day": day, "notes": days[day]} for day in sorted(days)]
+
+def _analysis_response(analysis_data: Dict[str, Any]) -> AIAnalysisResponse:
+    """Parse edilmiş analiz verisini AIAnalysisResponse modeline çevir"""
+    return AIAnalysisResponse(
+        note_type=analysis_data.get("note_type", "Belirsiz"),
+        importance_level=analysis_data.get("importance_level", "Orta"),
+        category=analysis_data.get("category", "Genel"),
+        suggestions=analysis_data.get("suggestions", []),
+        suggested_tags=analysis_data.get("suggested_tags", []),
+        raw_analysis=analysis_data.get("raw_analysis", "")
+    )
+
+def _job_response(job: Dict[str, Any]) -> AIJobResponse:
+    """Kuyruktaki iş kaydını AIJobResponse modeline çevir"""
+    result = job["result"]
+    return AIJobResponse(
+        job_id=job["job_id"],
+        note_id=job["note_id"],
+        status=job["status"],
+        result=_analysis_response(result) if result is not None else None,
+        error=job["error"],
+        created_at=job["created_at"],
+        finished_at=job["finished_at"]
+    )
 
 class NoteController:
     """Note işlemleri controller'ı"""
     
-    async def get_notes(self, user_id: str) -> StandardResponse[List[NoteResponse]]:
-        """Kullanıcının tüm notlarını getir"""
+    async def get_notes(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        page_token: Optional[str] = None,
+        if_none_match: Optional[str] = None,
+        view: str = "full",
+        fields: Optional[str] = None,
+        tags: Optional[List[str]] = None
+    ) -> Union[PaginatedResponse[List[NoteResponse]], Response]:
+        """
+        Kullanıcının notlarını getir (limit verilirse sayfalı)
+        
+        view="summary" veya fields verildiğinde sadece ilgili alanlar
+        Firestore'dan okunur. tags verildiğinde bu etiketlerden en az birini
+        taşıyan notlar döner. Başarılı yanıtlar model_response ile doğrudan
+        JSON byte'ları olarak döner.
+        """
+        if tags and len(set(tags)) > MAX_TAG_FILTERS:
+            return PaginatedResponse(
+                isSuccess=False,
+                errorCode="INVALID_TAGS",
+                message=f"En fazla {MAX_TAG_FILTERS} etiketle filtrelenebilir",
+                data=None
+            )
+        requested_fields = None
+        if fields:
+            requested_fields = [field.strip() for field in fields.split(",") if field.strip()]
+            unknown_fields = set(requested_fields) - NOTE_FIELDS
+            if unknown_fields:
+                return PaginatedResponse(
+                    isSuccess=False,
+                    errorCode="INVALID_FIELDS",
+                    message=f"Geçersiz alanlar: {', '.join(sorted(unknown_fields))}",
+                    data=None
+                )
+        elif view == "summary":
+            requested_fields = SUMMARY_FIELDS
+        
+        try:
+            try:
+                notes, next_page_token = await db.get_user_notes_page(
+                    user_id, limit=limit, page_token=page_token, fields=requested_fields, tags=tags
+                )
+            except ValueError as e:
+                return PaginatedResponse(
+                    isSuccess=False,
+                    errorCode="INVALID_PAGE_TOKEN",
+                    message=str(e),
+                    data=None
+                )
+            
+            # İstemcide aynı versiyon varsa gövdeyi serialize etmeden 304 dön
+            etag = list_etag(notes, next_page_token, ",".join(requested_fields or []))
+            if etag_if_none_match(if_none_match, etag):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+            
+            if requested_fields is None:
+                response_type = NoteListResponse
+                data = notes
+            elif fields:
+                response_type = NoteFieldsListResponse
+                output_fields = set(requested_fields) | {"id"}
+                data = [{k: v for k, v in note.items() if k in output_fields} for note in notes]
+            else:
+                response_type = NoteSummaryListResponse
+                data = notes
+            
+            return model_response(
+                response_type(
+                    isSuccess=True,
+                    errorCode=None,
+                    message="Notlar başarıyla getirildi",
+                    data=data,
+                    nextPageToken=next_page_token
+                ),
+                headers={"ETag": etag}
+            )
+        except Exception as e:
+            return PaginatedResponse(
+                isSuccess=False,
+                errorCode="NOTES_FETCH_ERROR",
+                message=f"Notlar getirilemedi: {str(e)}",
+                data=None
+            )
+    
+    async def get_note_changes(self, user_id: str, since: Optional[str] = None, limit: int = 100) -> StandardResponse[NoteChangesResponse]:
+        """Cursor'dan sonra değişen notları getir (delta sync)"""
         try:
-            notes = await db.get_user_notes(user_id)
+            try:
+                notes, cursor, has_more = await db.get_note_changes(user_id, since=since, limit=limit)
+            except ValueError as e:
+                return StandardResponse(
+                    isSuccess=False,
+                    errorCode="INVALID_SYNC_CURSOR",
+                    message=str(e),
+                    data=None
+                )
+            return model_response(NoteChangesEnvelope(
+                isSuccess=True,
+                errorCode=None,
+                message="Değişiklikler başarıyla getirildi",
+                data={"notes": notes, "cursor": cursor, "has_more": has_more}
+            ))
+        except Exception as e:
             return StandardResponse(
+                isSuccess=False,
+                errorCode="NOTE_CHANGES_FETCH_ERROR",
+                message=f"Değişiklikler getirilemedi: {str(e)}",
+                data=None
+            )
+    
+    async def search_notes(self, user_id: str, q: str, limit: int = 20) -> StandardResponse[List[NoteSearchResult]]:
+        """Notlarda tam metin arama yap (BM25 sıralı)"""
+        try:
+            results = await db.search_notes(user_id, q, limit=limit)
+            return model_response(NoteSearchListResponse(
                 isSuccess=True,
                 errorCode=None,
-                message="Notlar başarıyla getirildi",
+                message=f"{len(results)} not bulundu",
+                data=[{**summary, "score": score} for summary, score in results]
+            ))
+        except Exception as e:
+            return StandardResponse(
+                isSuccess=False,
+                errorCode="NOTE_SEARCH_ERROR",
+                message=f"Arama yapılamadı: {str(e)}",
+                data=None
+            )
+    
+    async def get_tag_facets(self, user_id: str, limit: Optional[int] = None) -> StandardResponse[List[TagFacet]]:
+        """Kullanıcının etiketlerini not sayılarıyla getir"""
+        try:
+            facets = await db.get_tag_facets(user_id, limit=limit)
+            return model_response(TagFacetListResponse(
+                isSuccess=True,
+                errorCode=None,
+                message="Etiketler başarıyla getirildi",
+                data=[{"tag": tag, "count": count} for tag, count in facets]
+            ))
+        except Exception as e:
+            return StandardResponse(
+                isSuccess=False,
+                errorCode="TAGS_FETCH_ERROR",
+                message=f"Etiketler getirilemedi: {str(e)}",
+                data=None
+            )
+    
+    async def autocomplete_tags(self, user_id: str, prefix: str, limit: int = 10) -> StandardResponse[List[TagFacet]]:
+        """Önekle başlayan etiketleri getir"""
+        try:
+            matches = await db.autocomplete_tags(user_id, prefix, limit=limit)
+            return model_response(TagFacetListResponse(
+                isSuccess=True,
+                errorCode=None,
+                message="Etiket önerileri başarıyla getirildi",
+                data=[{"tag": tag, "count": count} for tag, count in matches]
+            ))
+        except Exception as e:
+            return StandardResponse(
+                isSuccess=False,
+                errorCode="TAGS_FETCH_ERROR",
+                message=f"Etiket önerileri getirilemedi: {str(e)}",
+                data=None
+            )
+    
+    async def get_calendar(self, user_id: str, start: datetime, end: datetime, tz: str = "UTC") -> StandardResponse[List[CalendarDay]]:
+        """
+        [start, end] aralığında etkin olan notları güne göre gruplanmış getir
+        
+        Timezone'suz start/end değerleri tz saat diliminde yorumlanır; günler
+        de bu saat dilimine göre belirlenir.
+        """
+        try:
+            zone = ZoneInfo(tz)
+        except (ZoneInfoNotFoundError, ValueError):
+            return StandardResponse(
+                isSuccess=False,
+                errorCode="INVALID_TIMEZONE",
+                message=f"Geçersiz saat dilimi: {tz}",
+                data=None
+            )
+        
+        start = start if start.tzinfo else start.replace(tzinfo=zone)
+        end = end if end.tzinfo else end.replace(tzinfo=zone)
+        if end < start or end - start > timedelta(days=MAX_CALENDAR_DAYS):
+            return StandardResponse(
+                isSuccess=False,
+                errorCode="INVALID_RANGE",
+                message=f"Bitiş başlangıçtan önce olamaz ve aralık en fazla {MAX_CALENDAR_DAYS} gün olabilir",
+                data=None
+            )
+        
+        try:
+            notes = await db.get_notes_in_range(user_id, start, end)
+            return model_response(CalendarResponse(
+                isSuccess=True,
+                errorCode=None,
+                message=f"{len(notes)} not bulundu",
+                data=_group_by_day(notes, start, end, zone)
+            ))
+        except Exception as e:
+            return StandardResponse(
+                isSuccess=False,
+                errorCode="NOTES_FETCH_ERROR",
+                message=f"Takvim notları getirilemedi: {str(e)}",
+                data=None
+            )
+    
+    async def get_active_notes(self, user_id: str, at: Optional[datetime] = None) -> StandardResponse[List[NoteCalendarItem]]:
+        """Verilen anda (varsayılan: şimdi) etkin olan notları getir"""
+        at = at or datetime.now(timezone.utc)
+        try:
+            notes = await db.get_notes_in_range(user_id, at, at)
+            return model_response(NoteCalendarListResponse(
+                isSuccess=True,
+                errorCode=None,
+                message=f"{len(notes)} etkin not bulundu",
                 data=notes
+            ))
+        except Exception as e:
+            return StandardResponse(
+                isSuccess=False,
+                errorCode="NOTES_FETCH_ERROR",
+                message=f"Etkin notlar getirilemedi: {str(e)}",
+                data=None
             )
+    
+    async def get_duplicates(self, user_id: str, limit: Optional[int] = None) -> StandardResponse[List[DuplicateCluster]]:
+        """Yakın kopya not kümelerini getir (büyükten küçüğe)"""
+        try:
+            clusters = await db.get_duplicate_clusters(user_id, limit=limit)
+            return model_response(DuplicateClusterListResponse(
+                isSuccess=True,
+                errorCode=None,
+                message=f"{len(clusters)} yakın kopya kümesi bulundu",
+                data=[{"notes": cluster} for cluster in clusters]
+            ))
+        except Exception as e:
+            return StandardResponse(
+                isSuccess=False,
+                errorCode="NOTES_FETCH_ERROR",
+                message=f"Yakın kopyalar getirilemedi: {str(e)}",
+                data=None
+            )
+    
+    async def lookup_notes(self, lookup: NoteLookupRequest, user_id: str) -> StandardResponse[List[NoteLookupResult]]:
+        """Birden fazla notu ID listesiyle getir (istek sırasıyla)"""
+        try:
+            note_ids = [str(note_id) for note_id in lookup.ids]
+            notes = await db.get_notes_by_ids(note_ids, user_id)
+            results = [
+                {"id": note_id, "found": note is not None, "data": note}
+                for note_id, note in zip(note_ids, notes)
+            ]
+            return model_response(NoteLookupListResponse(
+                isSuccess=True,
+                errorCode=None,
+                message="Notlar başarıyla getirildi",
+                data=results
+            ))
         except Exception as e:
             return StandardResponse(
                 isSuccess=False,
@@ -30,16 +367,39 @@ class NoteController:
                 data=None
             )
     
-    async def create_note(self, note: NoteCreateRequest, user_id: str) -> StandardResponse[NoteResponse]:
-        """Yeni not oluştur"""
+    async def create_note(
+        self,
+        note: NoteCreateRequest,
+        user_id: str,
+        response: Optional[Response] = None,
+        check_duplicates: bool = False
+    ) -> StandardResponse[NoteCreateResponse]:
+        """
+        Yeni not oluştur
+        
+        check_duplicates verilirse notun yakın kopyaları possible_duplicates
+        alanında döner; kopya kontrolündeki bir hata oluşturmayı bozmaz.
+        """
         try:
             note_data = note.model_dump()
             created_note = await db.create_note(note_data, user_id)
+            if response is not None:
+                response.headers["ETag"] = note_etag(created_note)
+            
+            possible_duplicates: List[str] = []
+            if check_duplicates:
+                try:
+                    possible_duplicates = await db.find_duplicates(user_id, created_note)
+                except Exception as e:
+                    logging.warning(f"Yakın kopya kontrolü yapılamadı ({created_note['id']}): {e}")
             return StandardResponse(
                 isSuccess=True,
                 errorCode=None,
-                message="Not başarıyla oluşturuldu",
-                data=created_note
+                message=(
+                    f"Not başarıyla oluşturuldu ({len(possible_duplicates)} olası kopya)"
+                    if possible_duplicates else "Not başarıyla oluşturuldu"
+                ),
+                data={**created_note, "possible_duplicates": possible_duplicates}
             )
         except Exception as e:
             return StandardResponse(
@@ -49,7 +409,12 @@ class NoteController:
                 data=None
             )
     
-    async def get_note(self, note_id: UUID, user_id: str) -> StandardResponse[NoteResponse]:
+    async def get_note(
+        self,
+        note_id: UUID,
+        user_id: str,
+        if_none_match: Optional[str] = None
+    ) -> Union[StandardResponse[NoteResponse], Response]:
         """Belirli bir notu getir"""
         try:
             note = await db.get_note_by_id(str(note_id), user_id)
@@ -60,11 +425,20 @@ class NoteController:
                     message="Not bulunamadı veya erişim yetkiniz yok",
                     data=None
                 )
-            return StandardResponse(
-                isSuccess=True,
-                errorCode=None,
-                message="Not başarıyla getirildi",
-                data=note
+            
+            # İstemcide aynı versiyon varsa gövdeyi serialize etmeden 304 dön
+            etag = note_etag(note)
+            if etag_if_none_match(if_none_match, etag):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+            
+            return model_response(
+                NoteDetailResponse(
+                    isSuccess=True,
+                    errorCode=None,
+                    message="Not başarıyla getirildi",
+                    data=note
+                ),
+                headers={"ETag": etag}
             )
         except Exception as e:
             return StandardResponse(
@@ -74,19 +448,16 @@ class NoteController:
                 data=None
             )
     
-    async def update_note(self, note_id: UUID, note_update: NoteUpdateRequest, user_id: str) -> StandardResponse[NoteResponse]:
-        """Notu güncelle"""
+    async def update_note(
+        self,
+        note_id: UUID,
+        note_update: NoteUpdateRequest,
+        user_id: str,
+        if_match: Optional[str] = None,
+        response: Optional[Response] = None
+    ) -> StandardResponse[NoteResponse]:
+        """Notu güncelle (If-Match verilirse koşullu)"""
         try:
-            # Önce notun var olup olmadığını ve kullanıcının sahibi olup olmadığını kontrol et
-            existing_note = await db.get_note_by_id(str(note_id), user_id)
-            if not existing_note:
-                return StandardResponse(
-                    isSuccess=False,
-                    errorCode="NOTE_NOT_FOUND",
-                    message="Not bulunamadı veya erişim yetkiniz yok",
-                    data=None
-                )
-            
             # Sadece sağlanan alanları güncelle
             update_data = {k: v for k, v in note_update.model_dump().items() if v is not None}
             if not update_data:
@@ -97,21 +468,26 @@ class NoteController:
                     data=None
                 )
             
-            updated_note = await db.update_note(str(note_id), user_id, update_data)
+            # Varlık ve sahiplik kontrolü güncelleme ile aynı okuma üzerinde yapılır
+            updated_note = await db.update_note(str(note_id), user_id, update_data, if_match=if_match)
             if not updated_note:
                 return StandardResponse(
                     isSuccess=False,
-                    errorCode="NOTE_UPDATE_ERROR",
-                    message="Not güncellenemedi",
+                    errorCode="NOTE_NOT_FOUND",
+                    message="Not bulunamadı veya erişim yetkiniz yok",
                     data=None
                 )
             
+            if response is not None:
+                response.headers["ETag"] = note_etag(updated_note)
             return StandardResponse(
                 isSuccess=True,
                 errorCode=None,
                 message="Not başarıyla güncellendi",
                 data=updated_note
             )
+        except PreconditionFailedError:
+            return self._precondition_failed(response)
         except Exception as e:
             return StandardResponse(
                 isSuccess=False,
@@ -120,12 +496,18 @@ class NoteController:
                 data=None
             )
     
-    async def delete_note(self, note_id: UUID, user_id: str) -> StandardResponse[None]:
-        """Notu sil (soft delete)"""
+    async def delete_note(
+        self,
+        note_id: UUID,
+        user_id: str,
+        if_match: Optional[str] = None,
+        response: Optional[Response] = None
+    ) -> StandardResponse[None]:
+        """Notu sil (soft delete, If-Match verilirse koşullu)"""
         try:
-            # Önce notun var olup olmadığını ve kullanıcının sahibi olup olmadığını kontrol et
-            existing_note = await db.get_note_by_id(str(note_id), user_id)
-            if not existing_note:
+            # Varlık ve sahiplik kontrolü silme ile aynı okuma üzerinde yapılır
+            success = await db.delete_note(str(note_id), user_id, soft_delete=True, if_match=if_match)
+            if not success:
                 return StandardResponse(
                     isSuccess=False,
                     errorCode="NOTE_NOT_FOUND",
@@ -133,21 +515,14 @@ class NoteController:
                     data=None
                 )
             
-            success = await db.delete_note(str(note_id), user_id, soft_delete=True)
-            if not success:
-                return StandardResponse(
-                    isSuccess=False,
-                    errorCode="NOTE_DELETE_ERROR",
-                    message="Not silinemedi",
-                    data=None
-                )
-            
             return StandardResponse(
                 isSuccess=True,
                 errorCode=None,
                 message="Not başarıyla silindi",
                 data=None
             )
+        except PreconditionFailedError:
+            return self._precondition_failed(response)
         except Exception as e:
             return StandardResponse(
                 isSuccess=False,
@@ -156,11 +531,11 @@ class NoteController:
                 data=None
             )
     
-    async def restore_note(self, note_id: UUID, user_id: str) -> StandardResponse[NoteResponse]:
+    async def restore_note(self, note_id: UUID, user_id: str, response: Optional[Response] = None) -> StandardResponse[NoteResponse]:
         """Silinmiş notu geri yükle"""
         try:
-            success = await db.restore_note(str(note_id), user_id)
-            if not success:
+            restored_note = await db.restore_note(str(note_id), user_id)
+            if not restored_note:
                 return StandardResponse(
                     isSuccess=False,
                     errorCode="NOTE_RESTORE_ERROR",
@@ -168,8 +543,8 @@ class NoteController:
                     data=None
                 )
             
-            # Geri yüklenen notu getir
-            restored_note = await db.get_note_by_id(str(note_id), user_id)
+            if response is not None:
+                response.headers["ETag"] = note_etag(restored_note)
             return StandardResponse(
                 isSuccess=True,
                 errorCode=None,
@@ -184,7 +559,46 @@ class NoteController:
                 data=None
             )
     
-    async def analyze_note_with_ai(self, note_id: UUID, user_id: str) -> StandardResponse[AIAnalysisResponse]:
+    def _precondition_failed(self, response: Optional[Response]) -> StandardResponse[None]:
+        """If-Match eşleşmediğinde 412 yanıtı"""
+        if response is not None:
+            response.status_code = status.HTTP_412_PRECONDITION_FAILED
+        return StandardResponse(
+            isSuccess=False,
+            errorCode="PRECONDITION_FAILED",
+            message="Not başka bir istemci tarafından değiştirilmiş (ETag eşleşmedi)",
+            data=None
+        )
+    
+    async def batch_notes(self, batch: NoteBatchRequest, user_id: str) -> StandardResponse[List[NoteBatchResult]]:
+        """Toplu not operasyonlarını uygula (offline senkronizasyon)"""
+        try:
+            operations = []
+            for operation in batch.operations:
+                operations.append({
+                    "op": operation.op,
+                    "note_id": str(operation.note_id) if operation.note_id else None,
+                    "note": operation.note.model_dump() if operation.note else None,
+                    "changes": operation.changes.model_dump() if operation.changes else None
+                })
+            
+            results = await db.apply_batch(operations, user_id)
+            failed = sum(1 for result in results if not result["isSuccess"])
+            return StandardResponse(
+                isSuccess=True,
+                errorCode=None,
+                message=f"Toplu işlem tamamlandı ({len(results) - failed} başarılı, {failed} başarısız)",
+                data=results
+            )
+        except Exception as e:
+            return StandardResponse(
+                isSuccess=False,
+                errorCode="NOTE_BATCH_ERROR",
+                message=f"Toplu işlem uygulanamadı: {str(e)}",
+                data=None
+            )
+    
+    async def analyze_note_with_ai(self, note_id: UUID, user_id: str, response: Optional[Response] = None) -> StandardResponse[AIAnalysisResponse]:
         """Notu Gemini AI ile analiz et"""
         try:
             # Önce notun var olup olmadığını ve kullanıcının sahibi olup olmadığını kontrol et
@@ -197,37 +611,28 @@ class NoteController:
                     data=None
                 )
             
-            # Not verilerini dictionary'ye çevir
-            note_data = {
-                "title": note.get("title", "Başlık yok"),
-                "content": note.get("content", "İçerik yok"),
-                "tags": note.get("tags", []),
-                "pinned": note.get("pinned", False),
-                "start_date": note.get("start_date").isoformat() if note.get("start_date") else None,
-                "end_date": note.get("end_date").isoformat() if note.get("end_date") else None
-            }
-            
-            # Gemini AI ile analiz yap
-            ai_result = gemini_service.generate_content(note_data)
-            
-            if not ai_result["success"]:
+            # Aynı prompt girdileri için cache'teki sonuç kullanılır, yoksa Gemini çağrılır
+            try:
+                analysis_data = await analysis_service.analyze(note, user_id)
+            except AIUnavailableError as e:
+                # Gemini sağlıksız veya kota dolu; 30 saniye beklemek yerine hemen dön
+                if response is not None:
+                    response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+                    response.headers["Retry-After"] = str(e.retry_after)
+                return StandardResponse(
+                    isSuccess=False,
+                    errorCode="AI_UNAVAILABLE",
+                    message=f"AI analizi şu an yapılamıyor: {str(e)}",
+                    data=None
+                )
+            except AIAnalysisError as e:
                 return StandardResponse(
                     isSuccess=False,
                     errorCode="AI_ANALYSIS_ERROR",
-                    message=f"AI analizi başarısız: {ai_result.get('error', 'Bilinmeyen hata')}",
+                    message=f"AI analizi başarısız: {str(e)}",
                     data=None
                 )
-            
-            # Parse edilmiş analiz verisini AIAnalysisResponse modeline çevir
-            analysis_data = ai_result["analysis"]
-            ai_response = AIAnalysisResponse(
-                note_type=analysis_data.get("note_type", "Belirsiz"),
-                importance_level=analysis_data.get("importance_level", "Orta"),
-                category=analysis_data.get("category", "Genel"),
-                suggestions=analysis_data.get("suggestions", []),
-                suggested_tags=analysis_data.get("suggested_tags", []),
-                raw_analysis=analysis_data.get("raw_analysis", "")
-            )
+            ai_response = _analysis_response(analysis_data)
             
             return StandardResponse(
                 isSuccess=True,
@@ -242,4 +647,160 @@ class NoteController:
                 errorCode="AI_ANALYSIS_ERROR",
                 message=f"AI analizi sırasında hata oluştu: {str(e)}",
                 data=None
-            )
\ No newline at end of file
+            )
+    
+    async def create_ai_job(self, note_id: UUID, user_id: str, response: Response) -> StandardResponse[AIJobResponse]:
+        """Not için asenkron AI analiz işi oluştur"""
+        try:
+            note = await db.get_note_by_id(str(note_id), user_id)
+            if not note:
+                return StandardResponse(
+                    isSuccess=False,
+                    errorCode="NOTE_NOT_FOUND",
+                    message="Not bulunamadı veya erişim yetkiniz yok",
+                    data=None
+                )
+            
+            try:
+                job, created = await ai_job_queue.submit(note, user_id)
+            except AIJobQueueFullError as e:
+                # Kuyruk dolu; istemci bir süre sonra tekrar denemeli
+                response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+                response.headers["Retry-After"] = "5"
+                return StandardResponse(
+                    isSuccess=False,
+                    errorCode="AI_QUEUE_FULL",
+                    message=str(e),
+                    data=None
+                )
+            
+            response.status_code = status.HTTP_202_ACCEPTED
+            return StandardResponse(
+                isSuccess=True,
+                errorCode=None,
+                message="AI analiz işi oluşturuldu" if created else "Bu not için devam eden AI analiz işi var",
+                data=_job_response(job)
+            )
+        except Exception as e:
+            return StandardResponse(
+                isSuccess=False,
+                errorCode="AI_JOB_ERROR",
+                message=f"AI analiz işi oluşturulamadı: {str(e)}",
+                data=None
+            )
+    
+    async def get_ai_job(self, note_id: UUID, job_id: UUID, user_id: str) -> StandardResponse[AIJobResponse]:
+        """AI analiz işinin durumunu getir"""
+        job = ai_job_queue.get(str(job_id), user_id)
+        if job is None or job["note_id"] != str(note_id):
+            return StandardResponse(
+                isSuccess=False,
+                errorCode="AI_JOB_NOT_FOUND",
+                message="AI analiz işi bulunamadı veya süresi doldu",
+                data=None
+            )
+        return StandardResponse(
+            isSuccess=True,
+            errorCode=None,
+            message="AI analiz işi başarıyla getirildi",
+            data=_job_response(job)
+        )
+    
+    async def bulk_analyze_notes(self, request: NoteBulkAnalysisRequest, user_id: str) -> Union[StandardResponse, StreamingResponse]:
+        """
+        Birden fazla notu AI ile analiz et
+        
+        Sonuçlar tamamlandıkça her satırı bir NoteBulkAnalysisResult olan
+        NDJSON akışı olarak döner.
+        """
+        try:
+            if request.ids is not None:
+                note_ids = [str(note_id) for note_id in request.ids]
+                found = await db.get_notes_by_ids(note_ids, user_id)
+                notes = [note for note in found if note is not None]
+                missing_ids = [note_id for note_id, note in zip(note_ids, found) if note is None]
+            else:
+                # Sadece henüz (güncel haliyle) analiz edilmemiş notlar
+                notes = [
+                    note for note in await db.get_user_notes(user_id)
+                    if analysis_service.cached_analysis(note)[1] is None
+                ]
+                missing_ids = []
+        except Exception as e:
+            return StandardResponse(
+                isSuccess=False,
+                errorCode="NOTES_FETCH_ERROR",
+                message=f"Notlar getirilemedi: {str(e)}",
+                data=None
+            )
+        
+        async def stream() -> AsyncIterator[bytes]:
+            for note_id in missing_ids:
+                yield NoteBulkAnalysisResult(
+                    note_id=note_id,
+                    isSuccess=False,
+                    errorCode="NOTE_NOT_FOUND",
+                    message="Not bulunamadı veya erişim yetkiniz yok"
+                ).model_dump_json().encode() + b"\n"
+            async for result in analysis_service.analyze_bulk(notes, user_id):
+                data = result["data"]
+                yield NoteBulkAnalysisResult(
+                    **{**result, "data": _analysis_response(data) if data is not None else None}
+                ).model_dump_json().encode() + b"\n"
+        
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+    
+    async def stream_note_analysis(self, note_id: UUID, user_id: str) -> Union[StandardResponse, StreamingResponse]:
+        """
+        Notu Gemini AI ile analiz et ve sonucu Server-Sent Events olarak akıt
+        
+        Olaylar: delta (ham metin parçası), field (tamamlanan analiz alanı),
+        result (AIAnalysisResponse) ve hata durumunda error.
+        """
+        try:
+            note = await db.get_note_by_id(str(note_id), user_id)
+        except Exception as e:
+            return StandardResponse(
+                isSuccess=False,
+                errorCode="AI_ANALYSIS_ERROR",
+                message=f"AI analizi sırasında hata oluştu: {str(e)}",
+                data=None
+            )
+        if not note:
+            return StandardResponse(
+                isSuccess=False,
+                errorCode="NOTE_NOT_FOUND",
+                message="Not bulunamadı veya erişim yetkiniz yok",
+                data=None
+            )
+        
+        def event(name: str, data: str) -> bytes:
+            return f"event: {name}\ndata: {data}\n\n".encode()
+        
+        async def stream() -> AsyncIterator[bytes]:
+            try:
+                async for kind, payload in analysis_service.analyze_stream(note, user_id):
+                    if kind == "delta":
+                        yield event("delta", json.dumps({"text": payload}, ensure_ascii=False))
+                    elif kind == "field":
+                        name, value = payload
+                        yield event("field", json.dumps({"field": name, "value": value}, ensure_ascii=False))
+                    else:
+                        yield event("result", _analysis_response(payload).model_dump_json())
+            except AIUnavailableError as e:
+                yield event("error", json.dumps({
+                    "errorCode": "AI_UNAVAILABLE",
+                    "message": f"AI analizi şu an yapılamıyor: {str(e)}",
+                    "retryAfter": e.retry_after
+                }, ensure_ascii=False))
+            except Exception as e:
+                yield event("error", json.dumps({
+                    "errorCode": "AI_ANALYSIS_ERROR",
+                    "message": f"AI analizi başarısız: {str(e)}"
+                }, ensure_ascii=False))
+        
+        return StreamingResponse(
+            stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
@@ -1,222 +1,1160 @@
+import asyncio
+import base64
+import json
+import os
+import cachecontrol
 import firebase_admin
-from firebase_admin import credentials, firestore, auth
+import requests
+from firebase_admin import credentials, firestore_async, auth
+from google.api_core import exceptions as gcp_exceptions
+from google.auth import exceptions as google_auth_exceptions
+from google.auth.transport import requests as google_requests
+from google.oauth2 import id_token as google_id_token
 from app.config import settings
-from typing import List, Optional, Dict, Any
+from app.cache import note_cache, token_cache
+from app.search import search_index, UserSearchIndex
+from app.duplicates import simhash
+from app.services.reminder_scheduler import reminder_scheduler
+from app.executor import BoundedExecutor, ExecutorSaturatedError
+from app.etag import note_etag, if_match as etag_if_match
+from typing import List, Optional, Dict, Any, Awaitable, AsyncIterable, Callable, Tuple
 from uuid import UUID, uuid4
-from datetime import datetime
+from datetime import datetime, timezone
 import logging
+import time
+
+# Eşzamanlı yazma çakışmasında read-modify-write'ın kaç kez deneneceği
+MAX_WRITE_ATTEMPTS = 3
+
+# Çakışma nedeniyle yazılamayan read-modify-write denemesinin işareti
+_CONFLICT = object()
+
+# Firestore'un tek bir WriteBatch'te kabul ettiği en fazla yazma sayısı
+MAX_BATCH_WRITES = 500
+
+# Liste görünümü için saklanan içerik özetinin uzunluğu
+SNIPPET_LENGTH = 160
+
+# AI analiz prompt'unu etkileyen alanlar; biri değişince saklanan analiz düşürülür
+AI_ANALYSIS_FIELDS = ("title", "content", "tags", "pinned", "start_date", "end_date")
+
+# Firebase ID token'larını imzalayan Google sertifikaları ve token'ların issuer'ı
+ID_TOKEN_CERT_URL = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+ID_TOKEN_ISSUER_PREFIX = "https://securetoken.google.com/"
+
+# Arama indeksi yüklenirken delta sync'in sayfa boyutu
+SEARCH_SYNC_PAGE_SIZE = 500
+
+# Projeksiyonlu liste sorgularında her zaman okunan alanlar (sıralama, cursor ve ETag için)
+REQUIRED_LIST_FIELDS = ("id", "pinned", "created_at", "updated_at")
 
 # Firebase Admin SDK'yı başlat
+# Async client kullanılıyor; böylece Firestore çağrıları event loop'u bloklamaz
 try:
     if not firebase_admin._apps:
         cred = credentials.Certificate(settings.get_firebase_credentials())
         firebase_admin.initialize_app(cred)
-    db_client = firestore.client()
+    db_client = firestore_async.client()
 except Exception as e:
     logging.error(f"Firebase başlatılamadı: {e}")
     db_client = None
 
+class PreconditionFailedError(Exception):
+    """If-Match ile gönderilen versiyon notun güncel versiyonuyla eşleşmiyor"""
+    pass
+
+def _normalize_note(note_data: dict) -> dict:
+    """
+    Firestore timestamp'lerini timezone'suz datetime'a çevir
+
+    snippet alanı eklenmeden önce oluşturulmuş notlarda özet içerikten türetilir.
+    """
+    for field in ("created_at", "updated_at", "start_date", "end_date"):
+        value = note_data.get(field)
+        if value and value.tzinfo:
+            note_data[field] = value.astimezone(timezone.utc).replace(tzinfo=None)
+    if "snippet" not in note_data and isinstance(note_data.get("content"), str):
+        note_data["snippet"] = _make_snippet(note_data["content"])
+    return note_data
+
+def _apply_write_time(note: dict, update_time: Any) -> dict:
+    """
+    SERVER_TIMESTAMP olarak yazılan updated_at'i commit zamanıyla değiştir
+
+    Firestore sentinel'i yazmanın commit zamanına çözer; bu zaman
+    WriteResult.update_time ile aynıdır, not yeniden okunmadan döndürülebilir.
+    """
+    if note.get("updated_at") is firestore_async.SERVER_TIMESTAMP:
+        note["updated_at"] = update_time
+    return _normalize_note(note)
+
+def _encode_token(payload: dict) -> str:
+    """Cursor alanlarını opak, URL-safe bir token'a çevir"""
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode_token(token: str) -> dict:
+    """_encode_token ile üretilmiş token'ı çöz"""
+    padded = token + "=" * (-len(token) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+def _encode_page_token(note: dict) -> str:
+    """Son notun sıralama alanlarından opak sayfa token'ı üret"""
+    return _encode_token({"p": note.get("pinned", False), "c": note["created_at"].isoformat(), "i": note["id"]})
+
+def _decode_page_token(page_token: str) -> dict:
+    """Sayfa token'ını Firestore start_after cursor'ına çevir"""
+    try:
+        cursor = _decode_token(page_token)
+        return {
+            "pinned": bool(cursor["p"]),
+            "created_at": datetime.fromisoformat(cursor["c"]),
+            "id": str(cursor["i"])
+        }
+    except Exception:
+        raise ValueError("Geçersiz sayfa token'ı")
+
+def _encode_sync_cursor(note: dict) -> str:
+    """Son görülen değişiklikten delta sync cursor'ı üret"""
+    return _encode_token({"u": note["updated_at"].isoformat(), "i": note["id"]})
+
+def _decode_sync_cursor(cursor: str) -> dict:
+    """Delta sync cursor'ını Firestore start_after cursor'ına çevir"""
+    try:
+        payload = _decode_token(cursor)
+        return {
+            "updated_at": datetime.fromisoformat(payload["u"]),
+            "id": str(payload["i"])
+        }
+    except Exception:
+        raise ValueError("Geçersiz senkronizasyon cursor'ı")
+
+def _make_snippet(content: str) -> str:
+    """İçeriğin boşlukları sadeleştirilmiş kısa özetini üret"""
+    text = " ".join(content.split())
+    if len(text) <= SNIPPET_LENGTH:
+        return text
+    return text[:SNIPPET_LENGTH].rstrip() + "…"
+
+def _build_note(note_data: dict, user_id: str) -> dict:
+    """
+    Create isteğinden Firestore'a yazılacak not dokümanını oluştur
+
+    updated_at sunucu zamanıyla yazılır (delta sync cursor'ı bu alana
+    dayanır; uygulama sunucularının saat farkı değişiklik atlatmamalı).
+    """
+    return {
+        "id": str(uuid4()),
+        "user_id": user_id,
+        "title": note_data["title"],
+        "content": note_data["content"],
+        "snippet": _make_snippet(note_data["content"]),
+        # Yakın kopya tespiti için imza yazmada bir kez hesaplanıp saklanır
+        "simhash": simhash(note_data["title"], note_data["content"]),
+        "start_date": note_data.get("start_date"),
+        "end_date": note_data.get("end_date"),
+        "pinned": note_data.get("pinned", False),
+        "deleted": False,
+        "tags": note_data.get("tags"),
+        "created_at": datetime.utcnow(),
+        "updated_at": firestore_async.SERVER_TIMESTAMP
+    }
+
+def _update_mutation(update_data: dict) -> Callable[[dict], Optional[dict]]:
+    """Güncelleme için mutate fonksiyonu (silinmiş notlar güncellenemez)"""
+    # None değerleri temizle (sadece güncellenecek alanları dahil et)
+    clean_update_data = {k: v for k, v in update_data.items() if v is not None}
+    # İçerik değiştiyse liste görünümündeki özeti de güncelle
+    if "content" in clean_update_data:
+        clean_update_data["snippet"] = _make_snippet(clean_update_data["content"])
+    # Prompt girdileri değiştiyse saklanan AI analizi artık geçersiz
+    if any(field in clean_update_data for field in AI_ANALYSIS_FIELDS):
+        clean_update_data["ai_analysis"] = None
+    
+    def mutate(note_data: dict) -> Optional[dict]:
+        if note_data.get("deleted", False):
+            return None
+        changes = {**clean_update_data, "updated_at": firestore_async.SERVER_TIMESTAMP}
+        if "title" in changes or "content" in changes:
+            changes["simhash"] = simhash(
+                changes.get("title", note_data.get("title")),
+                changes.get("content", note_data.get("content"))
+            )
+        return changes
+    return mutate
+
+def _soft_delete_mutation(note_data: dict) -> Optional[dict]:
+    """Soft delete - sadece deleted flag'ini true yap (zaten silinmişse işlem yok)"""
+    if note_data.get("deleted", False):
+        return None
+    return {"deleted": True, "updated_at": firestore_async.SERVER_TIMESTAMP}
+
+def _restore_mutation(note_data: dict) -> Optional[dict]:
+    """Geri yükleme - sadece silinmiş notlar geri yüklenebilir"""
+    if not note_data.get("deleted", False):
+        return None
+    return {"deleted": False, "updated_at": firestore_async.SERVER_TIMESTAMP}
+
 class Database:
     def __init__(self):
         self.db = db_client
         self.notes_collection = "notes"
+        # Her Firestore çağrısı için üst süre sınırı (saniye)
+        self.timeout = settings.FIRESTORE_TIMEOUT
+        # Okumaların önündeki process içi cache; yazmalar burada güncellenir
+        self.cache = note_cache
+        # Kullanıcı başına tam metin arama indeksi; yazmalar burada artımlı uygulanır
+        self.search_index = search_index
+        # Not tarihlerine bağlı hatırlatmalar; yazmalar burada yeniden planlanır
+        self.reminders = reminder_scheduler
+        # Doğrulanmış ID token'ların cache'i; imza kontrolü token başına bir kez yapılır
+        self.token_cache = token_cache
+        # İmza sertifikalarını HTTP cache-control'a göre cache'leyen transport;
+        # token doğrulama ve arka plandaki sertifika yenileme aynı cache'i kullanır
+        self.cert_request = google_requests.Request(session=cachecontrol.CacheControl(requests.Session()))
+        # Cache'te olmayan token'ların doğrulaması event loop dışında, sınırlı bir pool'da yapılır
+        self.auth_executor = BoundedExecutor(
+            name="token-verify",
+            workers=settings.TOKEN_VERIFY_WORKERS,
+            max_pending=settings.TOKEN_VERIFY_MAX_PENDING,
+            max_wait=settings.TOKEN_VERIFY_MAX_WAIT
+        )
+    
+    async def _call(self, awaitable: Awaitable) -> Any:
+        """Firestore çağrısını deadline ile çalıştır"""
+        try:
+            return await asyncio.wait_for(awaitable, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise Exception(f"Firestore isteği {self.timeout} saniyede tamamlanamadı")
+    
+    async def _collect(self, stream: AsyncIterable) -> List[Any]:
+        """Firestore stream'ini deadline ile listeye topla"""
+        async def collect():
+            return [doc async for doc in stream]
+        return await self._call(collect())
     
     async def create_note(self, note_data: dict, user_id: str) -> dict:
         """Yeni not oluştur"""
         if not self.db:
             raise Exception("Firebase bağlantısı kurulamadı")
         
-        note_id = str(uuid4())
-        note = {
-            "id": note_id,
-            "user_id": user_id,
-            "title": note_data["title"],
-            "content": note_data["content"],
-            "start_date": note_data.get("start_date"),
-            "end_date": note_data.get("end_date"),
-            "pinned": note_data.get("pinned", False),
-            "deleted": False,
-            "tags": note_data.get("tags"),
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
-        }
+        note = _build_note(note_data, user_id)
         
         try:
-            doc_ref = self.db.collection(self.notes_collection).document(note_id)
-            doc_ref.set(note)
+            doc_ref = self.db.collection(self.notes_collection).document(note["id"])
+            write_result = await self._call(doc_ref.set(note, timeout=self.timeout))
+            # Firestore'dan okunan notlarla aynı biçimde (UTC, timezone'suz) döndür
+            note = _apply_write_time(note, write_result.update_time)
+            self.cache.put_note(user_id, note, write_result.update_time)
+            self.cache.invalidate_lists(user_id)
+            self.search_index.upsert(user_id, note)
+            self.reminders.upsert(user_id, note)
             return note
         except Exception as e:
             raise Exception(f"Not oluşturulamadı: {str(e)}")
     
     async def get_user_notes(self, user_id: str, include_deleted: bool = False) -> List[dict]:
         """Kullanıcının notlarını getir"""
+        notes, _ = await self.get_user_notes_page(user_id, include_deleted=include_deleted)
+        return notes
+    
+    async def get_user_notes_page(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        page_token: Optional[str] = None,
+        include_deleted: bool = False,
+        fields: Optional[List[str]] = None,
+        tags: Optional[List[str]] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        Kullanıcının notlarını sayfa sayfa getir
+        
+        Sıralama Firestore tarafında yapılır: önce sabitlenmiş notlar, sonra
+        created_at'e göre yeniden eskiye; created_at'i aynı notlar id ile
+        sıralanır, böylece sayfa sınırında not atlanmaz veya tekrarlanmaz.
+        Bu sorgu firestore.indexes.json'daki (user_id, deleted, pinned,
+        created_at, id) composite index'ini kullanır; etiket filtresinde
+        tags CONTAINS alanlı index'ler kullanılır.
+        
+        Args:
+            fields: Verilirse sadece bu alanlar (ve REQUIRED_LIST_FIELDS)
+                Firestore select() ile okunur
+            tags: Verilirse sadece bu etiketlerden en az birini taşıyan notlar
+                (tek etikette array_contains, birden fazlasında array_contains_any)
+        
+        Returns:
+            (notlar, sonraki sayfa token'ı) - son sayfada token None döner
+        """
         if not self.db:
             raise Exception("Firebase bağlantısı kurulamadı")
         
+        cursor = _decode_page_token(page_token) if page_token else None
+        
+        projection = tuple(sorted(set(fields) | set(REQUIRED_LIST_FIELDS))) if fields else None
+        
+        tag_filter = tuple(dict.fromkeys(tags)) if tags else None
+        cache_params = (include_deleted, limit, page_token, projection, tag_filter)
+        cached = self.cache.get_list(user_id, cache_params)
+        if cached is not None:
+            return cached
+        
         try:
             notes_ref = self.db.collection(self.notes_collection)
-            # Firestore composite index gerektirmemek için önce user_id'ye göre filtrele, sonra sırala
             query = notes_ref.where("user_id", "==", user_id)
             
             # Soft delete kontrolü
             if not include_deleted:
                 query = query.where("deleted", "==", False)
             
-            docs = query.stream()
+            if tag_filter and len(tag_filter) == 1:
+                query = query.where("tags", "array_contains", tag_filter[0])
+            elif tag_filter:
+                query = query.where("tags", "array_contains_any", list(tag_filter))
             
-            notes = []
-            for doc in docs:
-                note_data = doc.to_dict()
-                # Firestore timestamp'lerini datetime'a çevir
-                if 'created_at' in note_data:
-                    note_data['created_at'] = note_data['created_at'].replace(tzinfo=None)
-                if 'updated_at' in note_data:
-                    note_data['updated_at'] = note_data['updated_at'].replace(tzinfo=None)
-                if 'start_date' in note_data and note_data['start_date']:
-                    note_data['start_date'] = note_data['start_date'].replace(tzinfo=None)
-                if 'end_date' in note_data and note_data['end_date']:
-                    note_data['end_date'] = note_data['end_date'].replace(tzinfo=None)
-                notes.append(note_data)
-            
-            # Python tarafında pinned notları önce, sonra created_at'e göre sırala
-            notes.sort(key=lambda x: (not x.get('pinned', False), x.get('created_at', datetime.min)), reverse=True)
-            
-            return notes
+            query = query.order_by("pinned", direction=firestore_async.Query.DESCENDING)
+            query = query.order_by("created_at", direction=firestore_async.Query.DESCENDING)
+            query = query.order_by("id", direction=firestore_async.Query.DESCENDING)
+            
+            if projection:
+                # Gereksiz alanlar (ör. uzun içerik) veritabanından hiç çıkmaz
+                query = query.select(projection)
+            if cursor:
+                query = query.start_after(cursor)
+            # Sonraki sayfa olup olmadığını anlamak için bir fazla kayıt iste
+            if limit:
+                query = query.limit(limit + 1)
+            
+            docs = await self._collect(query.stream(timeout=self.timeout))
+            
+            # Firestore timestamp'lerini datetime'a çevir
+            notes = [_normalize_note(doc.to_dict()) for doc in docs]
+            
+            next_page_token = None
+            if limit and len(notes) > limit:
+                notes = notes[:limit]
+                next_page_token = _encode_page_token(notes[-1])
+            
+            if projection and "snippet" in projection:
+                await self._fill_missing_snippets(notes)
+            
+            update_times = [doc.update_time for doc in docs[:len(notes)]]
+            # Eksik alanlı notlar tekil not cache'ini ısıtmamalı
+            self.cache.put_list(
+                user_id, cache_params, notes, next_page_token, update_times, warm_notes=projection is None
+            )
+            return notes, next_page_token
         except Exception as e:
             raise Exception(f"Notlar getirilemedi: {str(e)}")
     
+    async def _fill_missing_snippets(self, notes: List[dict]) -> None:
+        """
+        snippet alanı olmayan eski notların özetini içerikten türet
+        
+        Projeksiyonlu sorgu içeriği okumadığı için bu notların sadece
+        content alanı tek bir get_all çağrısıyla okunur; yeni ve
+        güncellenmiş notlarda snippet yazmada saklandığından ek okuma olmaz.
+        """
+        missing = {note["id"]: note for note in notes if "snippet" not in note}
+        if not missing:
+            return
+        collection = self.db.collection(self.notes_collection)
+        snapshots = await self._collect(self.db.get_all(
+            [collection.document(note_id) for note_id in missing], field_paths=["content"], timeout=self.timeout
+        ))
+        for snapshot in snapshots:
+            content = (snapshot.to_dict() or {}).get("content") if snapshot.exists else None
+            missing[snapshot.id]["snippet"] = _make_snippet(content or "")
+    
+    async def get_note_changes(
+        self,
+        user_id: str,
+        since: Optional[str] = None,
+        limit: int = 100,
+        warm_cache: bool = True
+    ) -> Tuple[List[dict], Optional[str], bool]:
+        """
+        Cursor'dan sonra değişen notları getir (delta sync)
+        
+        Soft delete edilmiş notlar da tombstone olarak döner (deleted=True).
+        Kalıcı (hard) silmeler tombstone bırakmaz ve delta sync'te görünmez;
+        istemci bu notları ancak tam senkronizasyonla (since olmadan) fark eder.
+        Sıralama (updated_at, id) üzerinden yapılır; aynı updated_at'e sahip
+        notlar sayfa sınırında atlanmaz. updated_at sunucu commit zamanıdır
+        (SERVER_TIMESTAMP), bu yüzden cursor'dan sonra görünür olan her
+        yazmanın updated_at'i cursor'dan büyüktür.
+        
+        Args:
+            since: Önceki yanıttaki cursor; verilmezse tüm geçmiş döner
+            warm_cache: False ise okunan notlar tekil not cache'ine yazılmaz
+                (toplu indeks yüklemesi sıcak notları cache'ten atmasın diye)
+            
+        Returns:
+            (değişen notlar, yeni cursor, daha fazla değişiklik var mı)
+            Değişiklik yoksa cursor olduğu gibi geri döner
+        """
+        if not self.db:
+            raise Exception("Firebase bağlantısı kurulamadı")
+        
+        start = _decode_sync_cursor(since) if since else None
+        
+        try:
+            query = self.db.collection(self.notes_collection).where("user_id", "==", user_id)
+            query = query.order_by("updated_at").order_by("id")
+            if start:
+                query = query.start_after(start)
+            query = query.limit(limit + 1)
+            
+            docs = await self._collect(query.stream(timeout=self.timeout))
+            
+            # Firestore timestamp'lerini datetime'a çevir
+            notes = [_normalize_note(doc.to_dict()) for doc in docs]
+        except Exception as e:
+            raise Exception(f"Değişiklikler getirilemedi: {str(e)}")
+        
+        has_more = len(notes) > limit
+        notes = notes[:limit]
+        if warm_cache:
+            for note, doc in zip(notes, docs):
+                self.cache.put_note(user_id, note, doc.update_time)
+        
+        cursor = _encode_sync_cursor(notes[-1]) if notes else since
+        return notes, cursor, has_more
+    
     async def get_note_by_id(self, note_id: str, user_id: str, include_deleted: bool = False) -> Optional[dict]:
         """Belirli bir notu getir (sadece sahibi)"""
         if not self.db:
             raise Exception("Firebase bağlantısı kurulamadı")
         
+        cached = self.cache.get_note(user_id, note_id)
+        if cached is not None:
+            # Soft delete kontrolü
+            if not include_deleted and cached.get("deleted", False):
+                return None
+            return cached
+        
         try:
             doc_ref = self.db.collection(self.notes_collection).document(note_id)
-            doc = doc_ref.get()
+            doc = await self._call(doc_ref.get(timeout=self.timeout))
             
             if doc.exists:
                 note_data = doc.to_dict()
                 # Sahiplik kontrolü
                 if note_data.get("user_id") == user_id:
+                    # Firestore timestamp'lerini datetime'a çevir
+                    note_data = _normalize_note(note_data)
+                    self.cache.put_note(user_id, note_data, doc.update_time)
+                    
                     # Soft delete kontrolü
                     if not include_deleted and note_data.get("deleted", False):
                         return None
-                    
-                    # Firestore timestamp'lerini datetime'a çevir
-                    if 'created_at' in note_data:
-                        note_data['created_at'] = note_data['created_at'].replace(tzinfo=None)
-                    if 'updated_at' in note_data:
-                        note_data['updated_at'] = note_data['updated_at'].replace(tzinfo=None)
-                    if 'start_date' in note_data and note_data['start_date']:
-                        note_data['start_date'] = note_data['start_date'].replace(tzinfo=None)
-                    if 'end_date' in note_data and note_data['end_date']:
-                        note_data['end_date'] = note_data['end_date'].replace(tzinfo=None)
                     return note_data
             return None
         except Exception as e:
             raise Exception(f"Not getirilemedi: {str(e)}")
     
-    async def update_note(self, note_id: str, user_id: str, update_data: dict) -> Optional[dict]:
-        """Notu güncelle"""
+    async def get_notes_by_ids(self, note_ids: List[str], user_id: str, include_deleted: bool = False) -> List[Optional[dict]]:
+        """
+        Birden fazla notu tek round trip'te getir
+        
+        Cache'te olmayan notlar tek bir get_all çağrısıyla okunur. Sahiplik ve
+        soft delete filtresi burada uygulanır.
+        
+        Returns:
+            İstek sırasıyla notlar; bulunamayan veya erişilemeyen ID'ler için None
+        """
         if not self.db:
             raise Exception("Firebase bağlantısı kurulamadı")
         
-        try:
-            # Önce notun var olup olmadığını ve sahiplik kontrolü yap
-            existing_note = await self.get_note_by_id(note_id, user_id)
-            if not existing_note:
+        found = {}
+        missing_ids = []
+        for note_id in dict.fromkeys(note_ids):
+            cached = self.cache.get_note(user_id, note_id)
+            if cached is not None:
+                found[note_id] = cached
+            else:
+                missing_ids.append(note_id)
+        
+        if missing_ids:
+            try:
+                collection = self.db.collection(self.notes_collection)
+                snapshots = await self._collect(
+                    self.db.get_all([collection.document(note_id) for note_id in missing_ids], timeout=self.timeout)
+                )
+            except Exception as e:
+                raise Exception(f"Notlar getirilemedi: {str(e)}")
+            
+            for snapshot in snapshots:
+                if not snapshot.exists:
+                    continue
+                note_data = snapshot.to_dict()
+                # Sahiplik kontrolü
+                if note_data.get("user_id") == user_id:
+                    # Firestore timestamp'lerini datetime'a çevir
+                    note_data = _normalize_note(note_data)
+                    self.cache.put_note(user_id, note_data, snapshot.update_time)
+                    found[snapshot.id] = note_data
+        
+        notes = []
+        for note_id in note_ids:
+            note_data = found.get(note_id)
+            # Soft delete kontrolü
+            if note_data is not None and not include_deleted and note_data.get("deleted", False):
+                note_data = None
+            notes.append(dict(note_data) if note_data is not None else None)
+        return notes
+    
+    async def _read_modify_write(
+        self,
+        note_id: str,
+        user_id: str,
+        mutate: Callable[[dict], Optional[dict]],
+        if_match: Optional[str] = None
+    ) -> Optional[dict]:
+        """
+        Notu tek okuma + tek koşullu yazma ile güncelle
+        
+        Sahiplik ve durum kontrolü okunan snapshot üzerinde yapılır. Yazma,
+        snapshot'ın update_time'ına bağlı precondition ile gönderilir; arada
+        not değiştiyse Firestore yazmayı reddeder ve işlem baştan denenir.
+        Yazılan durum yeniden okunmadan döndürülür.
+        
+        If-Match verilmişse, not update_time'ı ile birlikte cache'te ve ETag
+        cache'teki notla eşleşiyorsa okuma hiç yapılmaz; yazma cache'teki
+        update_time'a bağlı precondition ile gönderilir. Eşleşmezse cache
+        eskimiş olabileceğinden not Firestore'dan okunur ve 412 ancak güncel
+        snapshot da eşleşmezse döner.
+        
+        Args:
+            mutate: Mevcut notu alıp yazılacak alanları döndüren fonksiyon;
+                None dönerse işlem yapılmaz
+            if_match: İstemcinin If-Match header'ı (opsiyonel)
+            
+        Returns:
+            Notun yazılmış hali; not yoksa, başkasına aitse veya mutate
+            reddettiyse None
+            
+        Raises:
+            PreconditionFailedError: If-Match notun güncel ETag'iyle eşleşmiyorsa
+        """
+        doc_ref = self.db.collection(self.notes_collection).document(note_id)
+        
+        if if_match:
+            cached, update_time = self.cache.get_note_version(user_id, note_id)
+            if cached is not None and update_time is not None and etag_if_match(if_match, note_etag(cached)):
+                changes = mutate(cached)
+                if changes is None:
+                    return None
+                return await self._write_note(doc_ref, user_id, cached, changes, update_time, retry_on_conflict=False)
+        
+        for _ in range(MAX_WRITE_ATTEMPTS):
+            snapshot = await self._call(doc_ref.get(timeout=self.timeout))
+            if not snapshot.exists:
+                self.cache.invalidate_note(user_id, note_id)
+                return None
+            
+            note_data = snapshot.to_dict()
+            # Sahiplik kontrolü
+            if note_data.get("user_id") != user_id:
                 return None
             
-            # None değerleri temizle (sadece güncellenecek alanları dahil et)
-            clean_update_data = {k: v for k, v in update_data.items() if v is not None}
-            clean_update_data["updated_at"] = datetime.utcnow()
+            # Firestore timestamp'lerini datetime'a çevir
+            note_data = _normalize_note(note_data)
+            if if_match and not etag_if_match(if_match, note_etag(note_data)):
+                self.cache.put_note(user_id, note_data, snapshot.update_time)
+                raise PreconditionFailedError()
             
-            doc_ref = self.db.collection(self.notes_collection).document(note_id)
-            doc_ref.update(clean_update_data)
-            
-            # Güncellenmiş notu getir
-            updated_doc = doc_ref.get()
-            if updated_doc.exists:
-                note_data = updated_doc.to_dict()
-                # Firestore timestamp'lerini datetime'a çevir
-                if 'created_at' in note_data:
-                    note_data['created_at'] = note_data['created_at'].replace(tzinfo=None)
-                if 'updated_at' in note_data:
-                    note_data['updated_at'] = note_data['updated_at'].replace(tzinfo=None)
-                if 'start_date' in note_data and note_data['start_date']:
-                    note_data['start_date'] = note_data['start_date'].replace(tzinfo=None)
-                if 'end_date' in note_data and note_data['end_date']:
-                    note_data['end_date'] = note_data['end_date'].replace(tzinfo=None)
-                return note_data
+            changes = mutate(note_data)
+            if changes is None:
+                self.cache.put_note(user_id, note_data, snapshot.update_time)
+                return None
+            
+            written_note = await self._write_note(
+                doc_ref, user_id, note_data, changes, snapshot.update_time,
+                retry_on_conflict=not if_match
+            )
+            if written_note is not _CONFLICT:
+                return written_note
+        
+        raise Exception("Not eşzamanlı olarak değiştirildi, lütfen tekrar deneyin")
+    
+    async def _write_note(
+        self,
+        doc_ref: Any,
+        user_id: str,
+        note_data: dict,
+        changes: dict,
+        update_time: Any,
+        retry_on_conflict: bool
+    ) -> Any:
+        """
+        Değişiklikleri update_time precondition'ı ile yaz ve cache'i güncelle
+        
+        Returns:
+            Notun yazılmış hali; not silinmişse None, çakışmada
+            retry_on_conflict True ise _CONFLICT
+        """
+        option = self.db.write_option(last_update_time=update_time)
+        try:
+            write_result = await self._call(doc_ref.update(changes, option=option, timeout=self.timeout))
+        except gcp_exceptions.FailedPrecondition:
+            # Okuma ile yazma arasında not değişti
+            self.cache.invalidate_note(user_id, doc_ref.id)
+            if retry_on_conflict:
+                return _CONFLICT
+            raise PreconditionFailedError()
+        except gcp_exceptions.NotFound:
+            self.cache.invalidate_note(user_id, doc_ref.id)
             return None
+        
+        written_note = _apply_write_time({**note_data, **changes}, write_result.update_time)
+        self.cache.put_note(user_id, written_note, write_result.update_time)
+        self.cache.invalidate_lists(user_id)
+        self.search_index.upsert(user_id, written_note)
+        self.reminders.upsert(user_id, written_note)
+        return written_note
+    
+    async def update_note(self, note_id: str, user_id: str, update_data: dict, if_match: Optional[str] = None) -> Optional[dict]:
+        """Notu güncelle (if_match verilirse sadece ETag eşleşiyorsa)"""
+        if not self.db:
+            raise Exception("Firebase bağlantısı kurulamadı")
+        
+        try:
+            return await self._read_modify_write(note_id, user_id, _update_mutation(update_data), if_match=if_match)
+        except PreconditionFailedError:
+            raise
         except Exception as e:
             raise Exception(f"Not güncellenemedi: {str(e)}")
     
-    async def delete_note(self, note_id: str, user_id: str, soft_delete: bool = True) -> bool:
-        """Notu sil (soft delete varsayılan)"""
+    async def delete_note(self, note_id: str, user_id: str, soft_delete: bool = True, if_match: Optional[str] = None) -> bool:
+        """Notu sil (soft delete varsayılan, if_match verilirse sadece ETag eşleşiyorsa)"""
         if not self.db:
             raise Exception("Firebase bağlantısı kurulamadı")
         
         try:
-            # Önce notun var olup olmadığını ve sahiplik kontrolü yap
-            existing_note = await self.get_note_by_id(note_id, user_id)
-            if not existing_note:
-                return False
-            
-            doc_ref = self.db.collection(self.notes_collection).document(note_id)
+            if not soft_delete:
+                # Hard delete - sahiplik kontrolü sonrası notu tamamen sil
+                existing_note = await self.get_note_by_id(note_id, user_id, include_deleted=True)
+                if not existing_note:
+                    return False
+                if if_match and not etag_if_match(if_match, note_etag(existing_note)):
+                    raise PreconditionFailedError()
+                doc_ref = self.db.collection(self.notes_collection).document(note_id)
+                await self._call(doc_ref.delete(timeout=self.timeout))
+                self.cache.invalidate_note(user_id, note_id)
+                self.cache.invalidate_lists(user_id)
+                self.search_index.purge(user_id, note_id)
+                self.reminders.cancel(user_id, note_id)
+                return True
             
-            if soft_delete:
-                # Soft delete - sadece deleted flag'ini true yap
-                doc_ref.update({
-                    "deleted": True,
-                    "updated_at": datetime.utcnow()
-                })
-            else:
-                # Hard delete - notu tamamen sil
-                doc_ref.delete()
-            
-            return True
+            return await self._read_modify_write(note_id, user_id, _soft_delete_mutation, if_match=if_match) is not None
+        except PreconditionFailedError:
+            raise
         except Exception as e:
             raise Exception(f"Not silinemedi: {str(e)}")
     
-    async def restore_note(self, note_id: str, user_id: str) -> bool:
-        """Silinmiş notu geri yükle"""
+    async def restore_note(self, note_id: str, user_id: str) -> Optional[dict]:
+        """
+        Silinmiş notu geri yükle
+        
+        Returns:
+            Geri yüklenen not; not yoksa veya silinmemişse None
+        """
         if not self.db:
             raise Exception("Firebase bağlantısı kurulamadı")
         
         try:
-            # Önce notun var olup olmadığını ve sahiplik kontrolü yap (deleted notları dahil)
-            existing_note = await self.get_note_by_id(note_id, user_id, include_deleted=True)
-            if not existing_note or not existing_note.get("deleted", False):
-                return False
+            return await self._read_modify_write(note_id, user_id, _restore_mutation)
+        except Exception as e:
+            raise Exception(f"Not geri yüklenemedi: {str(e)}")
+    
+    async def save_ai_analysis(self, note_id: str, user_id: str, key: str, analysis: dict) -> bool:
+        """
+        AI analiz sonucunu prompt girdilerinin hash'i ile not dokümanına kaydet
+        
+        updated_at değiştirilmez; analiz kullanıcı düzenlemesi değildir ve
+        notun ETag'ini etkilememelidir. Not cache'teyse yazma cache'teki
+        update_time precondition'ı ile yapılır, arada not değiştiyse kayıt
+        atlanır. Cache'te değilse diğer mutasyonlar gibi _read_modify_write
+        ile sahiplik kontrolünden ve koşullu yazmadan geçer.
+        
+        Returns:
+            Analiz kaydedildiyse True; not yoksa, başkasına aitse veya
+            arada değiştiyse False
+        """
+        if not self.db:
+            raise Exception("Firebase bağlantısı kurulamadı")
+        
+        changes = {"ai_analysis": {"key": key, "result": analysis}}
+        note_data, update_time = self.cache.get_note_version(user_id, note_id)
+        try:
+            if note_data is not None and update_time is not None:
+                # Cache'teki not sahiplik kontrolünden geçerek okunmuştur
+                doc_ref = self.db.collection(self.notes_collection).document(note_id)
+                written_note = await self._write_note(doc_ref, user_id, note_data, changes, update_time, retry_on_conflict=False)
+            else:
+                written_note = await self._read_modify_write(note_id, user_id, lambda note: changes)
+            return written_note is not None
+        except PreconditionFailedError:
+            return False
+        except Exception as e:
+            raise Exception(f"AI analizi kaydedilemedi: {str(e)}")
+    
+    async def save_ai_analyses(self, user_id: str, analyses: List[Tuple[str, str, dict]]) -> int:
+        """
+        Birden fazla AI analiz sonucunu WriteBatch'ler halinde kaydet
+        
+        Toplu analizde kullanılır; updated_at değiştirilmez. Commit'i başarısız
+        olan batch'in kayıtları tek tek save_ai_analysis ile denenir (ör.
+        arada silinmiş bir not tüm batch'i düşürmesin diye). Yazılan notlar
+        cache'ten düşürülür; bir sonraki okuma güncel update_time'ı alır.
+        
+        Args:
+            analyses: (note_id, analiz anahtarı, analiz sonucu) listesi
             
-            doc_ref = self.db.collection(self.notes_collection).document(note_id)
-            doc_ref.update({
-                "deleted": False,
-                "updated_at": datetime.utcnow()
-            })
+        Returns:
+            Kaydedilen analiz sayısı
+        """
+        if not self.db:
+            raise Exception("Firebase bağlantısı kurulamadı")
+        
+        collection = self.db.collection(self.notes_collection)
+        saved = 0
+        for start in range(0, len(analyses), MAX_BATCH_WRITES):
+            chunk = analyses[start:start + MAX_BATCH_WRITES]
+            batch = self.db.batch()
+            for note_id, key, analysis in chunk:
+                batch.update(collection.document(note_id), {"ai_analysis": {"key": key, "result": analysis}})
+            try:
+                await self._call(batch.commit(timeout=self.timeout))
+                for note_id, _, _ in chunk:
+                    self.cache.invalidate_note(user_id, note_id)
+                saved += len(chunk)
+            except Exception as e:
+                logging.error(f"AI analiz batch'i yazılamadı, tek tek deneniyor: {e}")
+                for note_id, key, analysis in chunk:
+                    try:
+                        if await self.save_ai_analysis(note_id, user_id, key, analysis):
+                            saved += 1
+                    except Exception as e:
+                        logging.error(f"AI analizi kaydedilemedi ({note_id}): {e}")
+        if saved:
+            self.cache.invalidate_lists(user_id)
+        return saved
+    
+    async def apply_batch(self, operations: List[dict], user_id: str) -> List[dict]:
+        """
+        Toplu not operasyonlarını uygula
+        
+        Hedef notlar tek bir get_all çağrısıyla okunur, sahiplik ve durum
+        kontrolleri bellekte yapılır; yazmalar MAX_BATCH_WRITES'lık
+        WriteBatch'ler halinde commit edilir. Aynı not üzerindeki ardışık
+        operasyonlar sırayla birbirinin üzerine uygulanır.
+        
+        Her notun batch'teki ilk güncellemesi okunan snapshot'ın (veya önceki
+        batch'teki yazmanın) update_time'ına bağlı precondition ile gönderilir.
+        Arada değişen bir not tüm batch'i düşürdüğü için bu durumda batch'in
+        yazmaları tek tek denenir; çakışan notun operasyonları NOTE_CONFLICT
+        ile döner, diğerleri yazılır. Yazması başarısız olan notun sonraki
+        operasyonları denenmez ve aynı hata koduyla döner.
+        
+        Args:
+            operations: {"op", "note_id", "note" | "changes"} içeren operasyonlar
             
-            return True
+        Returns:
+            Her operasyon için {"index", "op", "note_id", "isSuccess", "errorCode", "data"}
+        """
+        if not self.db:
+            raise Exception("Firebase bağlantısı kurulamadı")
+        
+        collection = self.db.collection(self.notes_collection)
+        
+        try:
+            # Mevcut notları tek round trip'te oku
+            note_ids = list(dict.fromkeys(op["note_id"] for op in operations if op["op"] != "create"))
+            snapshots = await self._collect(
+                self.db.get_all([collection.document(note_id) for note_id in note_ids], timeout=self.timeout)
+            )
         except Exception as e:
-            raise Exception(f"Not geri yüklenemedi: {str(e)}")
+            raise Exception(f"Notlar getirilemedi: {str(e)}")
+        
+        current = {}
+        # Notların bilinen son update_time'ı; yazmalar buna bağlı precondition ile gönderilir
+        versions = {}
+        for snapshot in snapshots:
+            note_data = snapshot.to_dict() if snapshot.exists else None
+            # Sahiplik kontrolü
+            if note_data and note_data.get("user_id") == user_id:
+                current[snapshot.id] = note_data
+                versions[snapshot.id] = snapshot.update_time
+        
+        mutations = {
+            "delete": _soft_delete_mutation,
+            "restore": _restore_mutation
+        }
+        results = []
+        writes = []
+        for index, operation in enumerate(operations):
+            op = operation["op"]
+            result = {"index": index, "op": op, "note_id": operation.get("note_id"), "isSuccess": False, "errorCode": None, "data": None}
+            results.append(result)
+            
+            if op == "create":
+                note = _build_note(operation["note"], user_id)
+                current[note["id"]] = note
+                result["note_id"] = note["id"]
+                writes.append((result, "set", note["id"], note, note))
+                continue
+            
+            note_data = current.get(operation["note_id"])
+            if note_data is None:
+                result["errorCode"] = "NOTE_NOT_FOUND"
+                continue
+            
+            if op == "update":
+                if not any(v is not None for v in operation["changes"].values()):
+                    result["errorCode"] = "NO_UPDATE_DATA"
+                    continue
+                mutate = _update_mutation(operation["changes"])
+            else:
+                mutate = mutations[op]
+            
+            changes = mutate(note_data)
+            if changes is None:
+                result["errorCode"] = "NOTE_RESTORE_ERROR" if op == "restore" else "NOTE_NOT_FOUND"
+                continue
+            current[operation["note_id"]] = {**note_data, **changes}
+            writes.append((result, "update", operation["note_id"], changes, current[operation["note_id"]]))
+        
+        written = {}
+        failed = {}
+        for start in range(0, len(writes), MAX_BATCH_WRITES):
+            chunk = []
+            for write in writes[start:start + MAX_BATCH_WRITES]:
+                result, _, note_id, _, _ = write
+                if note_id in failed:
+                    # Önceki yazması başarısız olan notun üzerine kurulan operasyon yazılmaz
+                    result["errorCode"] = failed[note_id]
+                else:
+                    chunk.append(write)
+            if not chunk:
+                continue
+            
+            batch = self.db.batch()
+            guarded = set()
+            for _, kind, note_id, payload, _ in chunk:
+                if kind == "set":
+                    guarded.add(note_id)
+                    batch.set(collection.document(note_id), payload)
+                elif note_id in guarded:
+                    # Aynı batch'teki önceki yazma precondition'ı taşır; batch atomiktir
+                    batch.update(collection.document(note_id), payload)
+                else:
+                    guarded.add(note_id)
+                    option = self.db.write_option(last_update_time=versions[note_id])
+                    batch.update(collection.document(note_id), payload, option=option)
+            try:
+                write_results = await self._call(batch.commit(timeout=self.timeout))
+            except gcp_exceptions.FailedPrecondition:
+                # Hangi notun değiştiği bilinmiyor; yazmalar tek tek denenir
+                await self._apply_writes_one_by_one(chunk, versions, written, failed)
+                continue
+            except Exception as e:
+                logging.error(f"Batch commit başarısız: {e}")
+                for result, _, note_id, _, _ in chunk:
+                    result["errorCode"] = "BATCH_COMMIT_ERROR"
+                    failed[note_id] = "BATCH_COMMIT_ERROR"
+                continue
+            for write, write_result in zip(chunk, write_results):
+                self._record_batch_write(write, write_result, versions, written)
+        
+        # Cache'i yazılan son durumlarla güncelle; yazması kısmen başarısız olan notlar cache'ten düşürülür
+        for note_id in failed:
+            self.cache.invalidate_note(user_id, note_id)
+        for note_id, written_note in written.items():
+            if note_id not in failed:
+                self.cache.put_note(user_id, written_note, versions[note_id])
+            self.search_index.upsert(user_id, written_note)
+            self.reminders.upsert(user_id, written_note)
+        if writes:
+            self.cache.invalidate_lists(user_id)
+        
+        return results
+    
+    def _record_batch_write(self, write: tuple, write_result: Any, versions: dict, written: dict) -> None:
+        """Başarılı batch yazmasını operasyon sonucuna ve notun son durumuna işle"""
+        result, _, note_id, _, state = write
+        versions[note_id] = write_result.update_time
+        written[note_id] = _apply_write_time(dict(state), write_result.update_time)
+        result["isSuccess"] = True
+        if result["op"] != "delete":
+            result["data"] = dict(written[note_id])
+    
+    async def _apply_writes_one_by_one(self, chunk: List[tuple], versions: dict, written: dict, failed: dict) -> None:
+        """
+        Precondition'ı tutmayan batch'in yazmalarını sırayla tek tek uygula
+        
+        Her güncelleme notun bilinen son update_time'ına bağlıdır; arada
+        değişmiş notun bu ve sonraki operasyonları NOTE_CONFLICT ile döner.
+        """
+        collection = self.db.collection(self.notes_collection)
+        for write in chunk:
+            result, kind, note_id, payload, _ = write
+            if note_id in failed:
+                result["errorCode"] = failed[note_id]
+                continue
+            doc_ref = collection.document(note_id)
+            try:
+                if kind == "set":
+                    write_result = await self._call(doc_ref.set(payload, timeout=self.timeout))
+                else:
+                    option = self.db.write_option(last_update_time=versions[note_id])
+                    write_result = await self._call(doc_ref.update(payload, option=option, timeout=self.timeout))
+            except gcp_exceptions.FailedPrecondition:
+                failed[note_id] = "NOTE_CONFLICT"
+            except gcp_exceptions.NotFound:
+                failed[note_id] = "NOTE_NOT_FOUND"
+            except Exception as e:
+                logging.error(f"Batch yazması başarısız ({note_id}): {e}")
+                failed[note_id] = "BATCH_COMMIT_ERROR"
+            else:
+                self._record_batch_write(write, write_result, versions, written)
+                continue
+            result["errorCode"] = failed[note_id]
+    
+    async def iter_upcoming_notes(self, after: datetime) -> AsyncIterable[dict]:
+        """
+        start_date veya end_date'i after'dan sonra olan notları sayfa sayfa getir
+        
+        Hatırlatma zamanlayıcısının (periyodik) yüklemesi için kullanılır.
+        Her alan için ayrı bir aralık sorgusu yapılır; silinmiş notlar
+        Firestore tarafında elenir (firestore.indexes.json'daki
+        (deleted, start_date) ve (deleted, end_date) index'leri). İki tarihi
+        de ileride olan not iki kez dönebilir. Sadece hatırlatma için
+        gereken alanlar okunur.
+        """
+        if not self.db:
+            raise Exception("Firebase bağlantısı kurulamadı")
+        
+        for field in ("start_date", "end_date"):
+            last_doc = None
+            while True:
+                query = self.db.collection(self.notes_collection).where("deleted", "==", False)
+                query = query.where(field, ">=", after)
+                query = query.order_by(field).select(["id", "user_id", "start_date", "end_date", "deleted"])
+                if last_doc is not None:
+                    query = query.start_after(last_doc)
+                query = query.limit(settings.REMINDER_LOAD_PAGE_SIZE)
+                try:
+                    docs = await self._collect(query.stream(timeout=self.timeout))
+                except Exception as e:
+                    raise Exception(f"Yaklaşan notlar getirilemedi: {str(e)}")
+                for doc in docs:
+                    yield _normalize_note(doc.to_dict())
+                if len(docs) < settings.REMINDER_LOAD_PAGE_SIZE:
+                    break
+                last_doc = docs[-1]
+    
+    async def get_reminder_note(self, user_id: str, note_id: str) -> Optional[dict]:
+        """
+        Hatırlatma tetiklenmeden önce notun güncel halini Firestore'dan oku
+
+        Not başka bir instance'ta değişmiş olabileceği için cache kullanılmaz.
+
+        Returns:
+            Notun tarih alanları; not yoksa veya başkasına aitse None
+        """
+        if not self.db:
+            raise Exception("Firebase bağlantısı kurulamadı")
+        
+        doc_ref = self.db.collection(self.notes_collection).document(note_id)
+        try:
+            doc = await self._call(doc_ref.get(["user_id", "start_date", "end_date", "deleted"], timeout=self.timeout))
+        except Exception as e:
+            raise Exception(f"Not getirilemedi: {str(e)}")
+        if not doc.exists:
+            return None
+        note_data = doc.to_dict()
+        if note_data.get("user_id") != user_id:
+            return None
+        return _normalize_note({**note_data, "id": note_id})
+    
+    async def search_notes(self, user_id: str, query: str, limit: int = 20) -> List[Tuple[dict, float]]:
+        """
+        Kullanıcının notlarında tam metin arama yap
+        
+        Sorgu bellekteki ters indekste BM25 ile puanlanır.
+        
+        Returns:
+            Skora göre azalan (not özeti, skor) listesi
+        """
+        await self._user_index(user_id)
+        return self.search_index.search(user_id, query, limit)
+    
+    async def get_tag_facets(self, user_id: str, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Kullanıcının etiketlerini not sayılarıyla getir
+        
+        Sayaçlar arama indeksiyle birlikte tutulur ve yazmalarda artımlı
+        güncellenir; istek başına notlar taranmaz.
+        
+        Returns:
+            Not sayısına göre azalan (etiket, sayı) listesi
+        """
+        index = await self._user_index(user_id)
+        return index.tags.facets(limit)
+    
+    async def autocomplete_tags(self, user_id: str, prefix: str, limit: int = 10) -> List[Tuple[str, int]]:
+        """Öneki taşıyan etiketleri not sayısına göre azalan sırada getir (büyük/küçük harf duyarsız)"""
+        index = await self._user_index(user_id)
+        return index.tags.complete(prefix, limit)
+    
+    async def find_duplicates(self, user_id: str, note: dict) -> List[str]:
+        """
+        Notun yakın kopyası olan diğer notların ID'lerini getir (en yakından uzağa)
+        
+        Aday notlar SimHash LSH kovalarından okunur; kullanıcının tüm
+        notlarıyla karşılaştırma yapılmaz.
+        """
+        index = await self._user_index(user_id)
+        signature = note.get("simhash")
+        if signature is None:
+            signature = simhash(note.get("title"), note.get("content"))
+        if signature is None:
+            return []
+        return index.duplicates.matches(signature, exclude=note["id"])
+    
+    async def get_duplicate_clusters(self, user_id: str, limit: Optional[int] = None) -> List[List[dict]]:
+        """
+        Kullanıcının yakın kopya not kümelerini getir
+        
+        Returns:
+            Büyükten küçüğe kümeler; her küme en az iki notun özetini içerir
+        """
+        index = await self._user_index(user_id)
+        clusters = index.duplicates.clusters()[:limit]
+        return [[index.summaries[note_id] for note_id in cluster] for cluster in clusters]
+    
+    async def get_notes_in_range(self, user_id: str, start: datetime, end: datetime) -> List[dict]:
+        """
+        [start, end] aralığıyla çakışan notları getir (takvim görünümü)
+        
+        Çakışma (start_date <= end ve end_date >= start) iki farklı alanda
+        eşitsizlik gerektirir ve tek bir index ile sorgulanamaz; sorgu
+        bellekteki not indeksinin interval tree'sinde cevaplanır.
+        
+        Returns:
+            Başlangıç tarihine göre sıralı not özetleri
+        """
+        index = await self._user_index(user_id)
+        return index.in_range(start, end)
+    
+    async def _user_index(self, user_id: str) -> UserSearchIndex:
+        """
+        Kullanıcının bellek içi not indeksini getir
+        
+        İndeks ilk kullanımda delta sync ile yüklenir;
+        SEARCH_INDEX_REFRESH_INTERVAL geçtiyse sadece son sync'ten beri
+        değişen notlar okunur (başka instance'lardan gelen yazmalar için).
+        Toplu okuma not cache'ine yazılmaz; kullanıcının tüm notları
+        LRU'daki sıcak kayıtları atmaz.
+        """
+        if not self.db:
+            raise Exception("Firebase bağlantısı kurulamadı")
+        
+        index = self.search_index.get(user_id)
+        if index.needs_sync():
+            async with index.lock:
+                if index.needs_sync():
+                    try:
+                        cursor, has_more = index.cursor, True
+                        while has_more:
+                            notes, cursor, has_more = await self.get_note_changes(
+                                user_id, since=cursor, limit=SEARCH_SYNC_PAGE_SIZE, warm_cache=False
+                            )
+                            for note in notes:
+                                index.add(note)
+                    except Exception as e:
+                        raise Exception(f"Not indeksi yüklenemedi: {str(e)}")
+                    index.cursor = cursor
+                    index.synced_at = time.monotonic()
+        return index
     
     async def verify_user_token(self, token: str) -> Optional[dict]:
-        """Kullanıcı token'ını doğrula"""
+        """
+        Kullanıcı token'ını doğrula (sonuç token'ın exp zamanına kadar cache'lenir)
+
+        İmza kontrolü ve olası sertifika indirme senkron olduğu için
+        auth_executor'da çalışır. Pool doluysa ExecutorSaturatedError fırlatılır.
+        """
+        found, user = self.token_cache.get(token)
+        if found:
+            return user
         try:
-            decoded_token = auth.verify_id_token(token)
-            return {
+            decoded_token = await self.auth_executor.run(self._verify_id_token, token)
+            user = {
                 "id": decoded_token["uid"],
                 "email": decoded_token.get("email", "")
             }
+            self.token_cache.put(token, user, decoded_token["exp"])
+            return user
         except auth.ExpiredIdTokenError:
             logging.error("Token süresi dolmuş")
+            self.token_cache.put_invalid(token)
             return None
         except auth.InvalidIdTokenError:
             logging.error("Geçersiz token")
+            self.token_cache.put_invalid(token)
             return None
+        except ExecutorSaturatedError:
+            raise
         except Exception as e:
+            # Sertifika alınamaması gibi geçici hatalar negatif cache'lenmez
             logging.error(f"Token doğrulanamadı: {e}")
             return None
+    
+    def _verify_id_token(self, token: str) -> dict:
+        """
+        Firebase ID token'ını cert_request'in cache'indeki sertifikalarla doğrula
+        
+        İmza, exp/iat ve audience google-auth ile, issuer ve subject Firebase
+        kurallarına göre kontrol edilir. Auth emulator'ı kullanılıyorsa
+        (imzasız token'lar) doğrulama Firebase Admin SDK'ya bırakılır.
+        
+        Raises:
+            auth.ExpiredIdTokenError: Token'ın süresi dolmuşsa
+            auth.InvalidIdTokenError: Token geçersizse
+        """
+        if os.getenv("FIREBASE_AUTH_EMULATOR_HOST"):
+            return auth.verify_id_token(token)
+        
+        project_id = settings.FIREBASE_PROJECT_ID
+        try:
+            claims = google_id_token.verify_firebase_token(token, self.cert_request, audience=project_id)
+        except google_auth_exceptions.TransportError:
+            # Sertifika alınamadı; geçici hata olarak çağırana bırakılır
+            raise
+        except ValueError as e:
+            if "Token expired" in str(e):
+                raise auth.ExpiredIdTokenError(str(e), cause=e)
+            raise auth.InvalidIdTokenError(str(e), cause=e)
+        
+        if claims.get("iss") != ID_TOKEN_ISSUER_PREFIX + project_id or not claims.get("sub"):
+            raise auth.InvalidIdTokenError("Token issuer veya subject alanı geçersiz")
+        claims["uid"] = claims["sub"]
+        return claims
+    
+    def refresh_signing_certs(self) -> None:
+        """
+        ID token imza sertifikalarını yeniden indir
+        
+        İstek cache'i atlar (Cache-Control: no-cache) ve yanıt cert_request'in
+        cache'ine yazılır; arka planda periyodik çağrıldığında sertifikaların
+        süresi dolmadan yenilenir ve hiçbir doğrulama indirmeyi beklemez.
+        """
+        response = self.cert_request(ID_TOKEN_CERT_URL, method="GET", headers={"Cache-Control": "no-cache"})
+        if response.status != 200:
+            raise Exception(f"Sertifikalar alınamadı: HTTP {response.status}")
 
 # Global database instance
 db = Database()
@@ -0,0 +1,160 @@
+import hashlib
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set
+from app.text import tokenize
+
+# 64 bitlik SimHash; en fazla MAX_DISTANCE bit farklı imzalar yakın kopya sayılır
+SIMHASH_BITS = 64
+MAX_DISTANCE = 3
+# İmza BANDS parçaya bölünür; MAX_DISTANCE < BANDS olduğundan (güvercin yuvası)
+# yakın kopyalar en az bir parçada birebir aynıdır ve aynı kovaya düşer
+BANDS = 4
+BAND_BITS = SIMHASH_BITS // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+UNSIGNED_MASK = (1 << SIMHASH_BITS) - 1
+
+# Bit sayaçları tek bir büyük tamsayıda LANE_BITS genişliğinde şeritler olarak tutulur;
+# _SPREAD[k << 8 | b], k. byte'ın b değerindeki her 1 bitini kendi şeridine 1 olarak yazar
+LANE_BITS = 32
+LANE_MASK = (1 << LANE_BITS) - 1
+_SPREAD = [
+    sum(1 << ((8 * k + bit) * LANE_BITS) for bit in range(8) if value >> bit & 1)
+    for k in range(SIMHASH_BITS // 8) for value in range(256)
+]
+
+def _features(title: str, content: str) -> Counter:
+    """Metnin kelime ikilileri (tek kelimelik metinlerde kelimenin kendisi)"""
+    tokens = tokenize(f"{title} {content}")
+    if len(tokens) < 2:
+        return Counter(tokens)
+    return Counter(zip(tokens, tokens[1:]))
+
+def simhash(title: str, content: str) -> Optional[int]:
+    """
+    Başlık ve içerikten 64 bitlik SimHash imzası üret
+
+    Firestore tamsayıları işaretli 64 bit olduğu için imza işaretli olarak
+    döner; karşılaştırmalarda UNSIGNED_MASK ile maskelenir. Kelimesi
+    olmayan not için None döner.
+    """
+    features = _features(title or "", content or "")
+    if not features:
+        return None
+    # 64 bit sayacı yerine (byte konumu, byte değeri) ağırlıkları toplanır, sonra
+    # her farklı byte bir kez şeritlere yayılır: özellik başına 64 yerine 8 işlem
+    byte_weights: Dict[int, int] = {}
+    total = 0
+    for feature, weight in features.items():
+        text = feature if isinstance(feature, str) else " ".join(feature)
+        value = int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little")
+        for k in range(SIMHASH_BITS // 8):
+            key = k << 8 | (value >> (8 * k) & 0xFF)
+            byte_weights[key] = byte_weights.get(key, 0) + weight
+        total += weight
+    counters = sum(weight * _SPREAD[key] for key, weight in byte_weights.items())
+    signature = 0
+    for bit in range(SIMHASH_BITS):
+        # Ağırlıkların yarısından fazlasında 1 olan bit imzada 1 olur
+        if 2 * (counters >> (bit * LANE_BITS) & LANE_MASK) > total:
+            signature |= 1 << bit
+    return signature - (1 << SIMHASH_BITS) if signature >> (SIMHASH_BITS - 1) else signature
+
+def distance(first: int, second: int) -> int:
+    """İki imza arasındaki Hamming uzaklığı"""
+    return bin((first ^ second) & UNSIGNED_MASK).count("1")
+
+class DuplicateIndex:
+    """
+    Tek kullanıcının notları üzerinde SimHash LSH indeksi
+
+    Her imza BANDS parçaya bölünür ve her parça (parça no, değer)
+    kovasına eklenir. Bir notun yakın kopya adayları sadece kendi
+    kovalarındaki notlardır; adaylar Hamming uzaklığıyla doğrulanır.
+    Not başına sabit bellek (bir imza ve BANDS kova girdisi) tutulur,
+    tüm notlarla ikili karşılaştırma yapılmaz.
+    """
+
+    def __init__(self):
+        self.signatures: Dict[str, int] = {}
+        self._buckets: Dict[int, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    @staticmethod
+    def _bucket_keys(signature: int) -> Iterable[int]:
+        signature &= UNSIGNED_MASK
+        for band in range(BANDS):
+            yield band << BAND_BITS | (signature >> (band * BAND_BITS) & BAND_MASK)
+
+    def add(self, note_id: str, signature: Optional[int]) -> None:
+        self.remove(note_id)
+        if signature is None:
+            return
+        self.signatures[note_id] = signature
+        for key in self._bucket_keys(signature):
+            self._buckets.setdefault(key, set()).add(note_id)
+
+    def remove(self, note_id: str) -> None:
+        signature = self.signatures.pop(note_id, None)
+        if signature is None:
+            return
+        for key in self._bucket_keys(signature):
+            bucket = self._buckets[key]
+            bucket.discard(note_id)
+            if not bucket:
+                del self._buckets[key]
+
+    def matches(self, signature: int, exclude: Optional[str] = None) -> List[str]:
+        """İmzaya en fazla MAX_DISTANCE uzaklıktaki notlar, en yakından uzağa"""
+        candidates: Set[str] = set()
+        for key in self._bucket_keys(signature):
+            candidates.update(self._buckets.get(key, ()))
+        candidates.discard(exclude)
+        scored = [(distance(signature, self.signatures[note_id]), note_id) for note_id in candidates]
+        return [note_id for score, note_id in sorted(scored) if score <= MAX_DISTANCE]
+
+    def clusters(self) -> List[List[str]]:
+        """
+        Yakın kopya kümeleri (en az iki not), büyükten küçüğe
+
+        Aynı kovadaki notlar birleşim-bul (union-find) ile kümelenir; birebir
+        aynı imzalı notlar karşılaştırılmadan birleştirilir, böylece tek bir
+        büyük kova bile sadece farklı imzalar arasında karşılaştırılır.
+        """
+        parent: Dict[str, str] = {}
+
+        def find(note_id: str) -> str:
+            root = note_id
+            while parent.get(root, root) != root:
+                root = parent[root]
+            while note_id != root:
+                parent[note_id], note_id = root, parent.get(note_id, note_id)
+            return root
+
+        def union(first: str, second: str) -> None:
+            parent.setdefault(first, first)
+            parent.setdefault(second, second)
+            first, second = find(first), find(second)
+            if first != second:
+                parent[max(first, second)] = min(first, second)
+
+        for bucket in self._buckets.values():
+            if len(bucket) < 2:
+                continue
+            by_signature: Dict[int, str] = {}
+            for note_id in bucket:
+                signature = self.signatures[note_id]
+                representative = by_signature.setdefault(signature, note_id)
+                if representative != note_id:
+                    union(representative, note_id)
+            distinct = list(by_signature.items())
+            for i, (signature, note_id) in enumerate(distinct):
+                for other_signature, other_id in distinct[i + 1:]:
+                    if distance(signature, other_signature) <= MAX_DISTANCE:
+                        union(note_id, other_id)
+
+        groups: Dict[str, List[str]] = {}
+        for note_id in parent:
+            groups.setdefault(find(note_id), []).append(note_id)
+        return sorted((sorted(group) for group in groups.values()), key=lambda group: (-len(group), group[0]))
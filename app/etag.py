@@ -0,0 +1,40 @@
+import hashlib
+from typing import Iterable, Optional
+
+def note_etag(note: dict) -> str:
+    """Notun id ve updated_at alanlarından strong ETag üret"""
+    version = f"{note['id']}:{note['updated_at'].isoformat()}"
+    return '"' + hashlib.sha1(version.encode()).hexdigest()[:20] + '"'
+
+def list_etag(notes: Iterable[dict], *extra: Optional[str]) -> str:
+    """
+    Liste için strong ETag üret
+
+    Gövdeyi serialize etmek yerine her notun versiyonu (id, updated_at) ve
+    sayfalama gibi ek alanlar hash'lenir; herhangi bir not değiştiğinde
+    updated_at da değiştiği için bu gövdenin içerik hash'iyle eşdeğerdir.
+    """
+    digest = hashlib.sha1()
+    for note in notes:
+        digest.update(f"{note['id']}:{note['updated_at'].isoformat()};".encode())
+    for value in extra:
+        digest.update(f"|{value or ''}".encode())
+    return '"' + digest.hexdigest()[:20] + '"'
+
+def _parse_etags(header: str) -> list:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+def if_none_match(header: Optional[str], etag: str) -> bool:
+    """If-None-Match header'ı mevcut ETag ile eşleşiyor mu? (weak karşılaştırma)"""
+    if not header:
+        return False
+    for tag in _parse_etags(header):
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+def if_match(header: Optional[str], etag: str) -> bool:
+    """If-Match header'ı mevcut ETag ile eşleşiyor mu? (strong karşılaştırma)"""
+    if not header:
+        return True
+    return any(tag == "*" or tag == etag for tag in _parse_etags(header))
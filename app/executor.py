@@ -0,0 +1,93 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+class ExecutorSaturatedError(Exception):
+    """İş kuyruğu dolu veya iş max_wait içinde başlatılamadı"""
+    pass
+
+class BoundedExecutor:
+    """
+    Sınırlı kuyruklu thread pool
+
+    Senkron ve bloklayan işleri (CPU yoğun doğrulama, SDK'nın senkron ağ
+    çağrıları) event loop dışında çalıştırır. Kuyrukta bekleyen iş sayısı
+    max_pending'i aşarsa yeni iş hemen reddedilir; kuyruktaki bir iş
+    max_wait saniye içinde başlayamazsa iptal edilir. Her iki durumda da
+    ExecutorSaturatedError fırlatılır ve çağıran taraf 503 döndürebilir.
+    """
+
+    def __init__(self, name: str, workers: int, max_pending: int, max_wait: float):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_wait = max_wait
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    async def run(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """func'ı pool'da çalıştır ve sonucunu döndür"""
+        if self.queued >= self.max_pending:
+            self.rejected += 1
+            raise ExecutorSaturatedError("İş kuyruğu dolu")
+
+        loop = asyncio.get_running_loop()
+        started = loop.create_future()
+
+        def job():
+            loop.call_soon_threadsafe(self._mark_started, started)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                loop.call_soon_threadsafe(self._mark_finished)
+
+        self.queued += 1
+        future = self._pool.submit(job)
+        try:
+            # Sadece kuyrukta bekleme süresi sınırlanır; başlamış iş tamamlanır
+            await asyncio.wait_for(asyncio.shield(started), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            if self._cancel(future):
+                self.timed_out += 1
+                raise ExecutorSaturatedError(f"İş {self.max_wait} saniye içinde başlatılamadı")
+            # İş tam zaman aşımı anında başlamış; sonucunu bekle
+        except asyncio.CancelledError:
+            self._cancel(future)
+            raise
+        return await asyncio.wrap_future(future)
+
+    def _cancel(self, future) -> bool:
+        """Henüz başlamamış işi kuyruktan çıkar"""
+        if future.cancel():
+            self.queued -= 1
+            return True
+        return False
+
+    def _mark_started(self, started: asyncio.Future) -> None:
+        self.queued -= 1
+        self.running += 1
+        if not started.done():
+            started.set_result(None)
+
+    def _mark_finished(self) -> None:
+        self.running -= 1
+        self.completed += 1
+
+    def shutdown(self) -> None:
+        """Kuyruktaki işleri iptal et ve pool'u kapat"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "queue_depth": self.queued,
+            "running": self.running,
+            "max_pending": self.max_pending,
+            "max_wait_seconds": self.max_wait,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out
+        }
@@ -0,0 +1,122 @@
+import bisect
+import math
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+# Bekleyen değişiklik sayısı bu eşiği (veya sqrt(n)'i) aşınca ağaç yeniden kurulur
+REBUILD_MIN_CHANGES = 64
+
+def timestamp(value: Optional[datetime]) -> Optional[float]:
+    """Tarihi epoch saniyesine çevir; timezone'suz tarihler UTC kabul edilir"""
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+class IntervalIndex:
+    """
+    Not tarih aralıkları üzerinde çakışma indeksi
+
+    Aralıklar başlangıca göre sıralı dizide tutulur ve üzerine bitiş
+    zamanlarının maksimumunu tutan bir segment ağacı kurulur (artırılmış
+    interval tree). [start, end] ile çakışan aralıklar için başlangıcı
+    end'den küçük olan önek bisect ile bulunur, ağaçta maksimum bitişi
+    start'tan küçük olan dallar budanır: O(log n + k).
+
+    Yazmalar ağacı hemen değiştirmez; değişen aralıklar küçük bir bekleyen
+    kümede tutulur ve sorguda doğrusal taranır. Bekleyen değişiklikler
+    çoğalınca ağaç bir sonraki sorguda yeniden kurulur.
+    """
+
+    def __init__(self):
+        self.intervals: Dict[str, Tuple[float, float]] = {}
+        # Son kurulumdaki sıralı diziler ve max-end segment ağacı
+        self._starts: List[float] = []
+        self._ids: List[str] = []
+        self._tree: List[float] = []
+        self._size = 0
+        self._built: Set[str] = set()
+        # Kurulumdan sonra eklenen/değişen aralıklar ve ağaçta geçersizleşen id'ler
+        self._pending: Dict[str, Tuple[float, float]] = {}
+        self._stale: Set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self.intervals)
+
+    def add(self, note_id: str, start: Optional[datetime], end: Optional[datetime]) -> None:
+        """
+        Notun aralığını ekle veya güncelle
+
+        Sadece bir tarihi olan not o ana ait tek noktalık aralık olarak
+        tutulur; iki tarihi de olmayan not indekslenmez.
+        """
+        start_ts, end_ts = timestamp(start), timestamp(end)
+        if start_ts is None and end_ts is None:
+            self.remove(note_id)
+            return
+        if start_ts is None:
+            start_ts = end_ts
+        elif end_ts is None:
+            end_ts = start_ts
+        interval = (min(start_ts, end_ts), max(start_ts, end_ts))
+        if self.intervals.get(note_id) == interval:
+            return
+        self.intervals[note_id] = interval
+        self._pending[note_id] = interval
+        if note_id in self._built:
+            self._stale.add(note_id)
+
+    def remove(self, note_id: str) -> None:
+        if self.intervals.pop(note_id, None) is None:
+            return
+        self._pending.pop(note_id, None)
+        if note_id in self._built:
+            self._stale.add(note_id)
+
+    def overlapping(self, start: float, end: float) -> List[str]:
+        """[start, end] ile çakışan aralıkların id'lerini başlangıca göre sıralı döndür"""
+        if len(self._pending) + len(self._stale) > max(REBUILD_MIN_CHANGES, math.isqrt(len(self.intervals))):
+            self._rebuild()
+
+        matches = [
+            note_id for note_id, (interval_start, interval_end) in self._pending.items()
+            if interval_start <= end and interval_end >= start
+        ]
+        limit = bisect.bisect_right(self._starts, end)
+        if limit:
+            tree, size, stale = self._tree, self._size, self._stale
+            # (düğüm, kapsadığı aralığın ilk indeksi, genişliği)
+            stack = [(1, 0, size)]
+            while stack:
+                node, first, width = stack.pop()
+                if first >= limit or tree[node] < start:
+                    continue
+                if width == 1:
+                    note_id = self._ids[first]
+                    if note_id not in stale:
+                        matches.append(note_id)
+                    continue
+                half = width // 2
+                stack.append((2 * node + 1, first + half, half))
+                stack.append((2 * node, first, half))
+
+        intervals = self.intervals
+        matches.sort(key=lambda note_id: (intervals[note_id], note_id))
+        return matches
+
+    def _rebuild(self) -> None:
+        ordered = sorted(self.intervals.items(), key=lambda item: item[1])
+        self._ids = [note_id for note_id, _ in ordered]
+        self._starts = [interval[0] for _, interval in ordered]
+        size = 1
+        while size < len(ordered):
+            size *= 2
+        tree = [-math.inf] * (2 * size)
+        for position, (_, interval) in enumerate(ordered):
+            tree[size + position] = interval[1]
+        for node in range(size - 1, 0, -1):
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+        self._tree, self._size = tree, size
+        self._built = set(self._ids)
+        self._pending, self._stale = {}, set()
@@ -1,10 +1,66 @@
+import asyncio
+import logging
+from datetime import datetime
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.routers import notes, auth
+from app.cache import note_cache, token_cache, ai_analysis_cache
+from app.database import db
+from app.search import search_index
+from app.services.gemini_service import gemini_service
+from app.services.ai_job_queue import ai_job_queue
+from app.services.reminder_scheduler import reminder_scheduler
+
+async def refresh_signing_certs_periodically():
+    """Firebase imza sertifikalarını arka planda düzenli olarak yenile"""
+    while True:
+        try:
+            await asyncio.to_thread(db.refresh_signing_certs)
+        except Exception as e:
+            logging.error(f"İmza sertifikaları yenilenemedi: {e}")
+        await asyncio.sleep(settings.FIREBASE_CERT_REFRESH_INTERVAL)
+
+async def load_reminders_periodically():
+    """
+    Yaklaşan not hatırlatmalarını açılışta ve düzenli aralıklarla yükle
+
+    Yeniden yükleme, başka instance'larda oluşturulan veya tarihi
+    değiştirilen notları zamanlayıcının sahibi olan instance'a taşır.
+    """
+    while True:
+        try:
+            count = await reminder_scheduler.load(db.iter_upcoming_notes(datetime.utcnow()))
+            logging.info(f"{count} not için hatırlatma planlandı")
+        except Exception as e:
+            logging.error(f"Hatırlatmalar yüklenemedi: {e}")
+        await asyncio.sleep(settings.REMINDER_RELOAD_INTERVAL)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Uygulama açılışında arka plan görevlerini başlat, kapanışta durdur"""
+    cert_refresher = asyncio.create_task(refresh_signing_certs_periodically())
+    await gemini_service.start()
+    await ai_job_queue.start()
+    reminder_loader = None
+    if reminder_scheduler.enabled and db.db:
+        # Tetiklemeden önce not Firestore'dan yeniden okunur (başka instance'lardaki yazmalar)
+        reminder_scheduler.verify = db.get_reminder_note
+        await reminder_scheduler.start()
+        reminder_loader = asyncio.create_task(load_reminders_periodically())
+    yield
+    cert_refresher.cancel()
+    if reminder_loader is not None:
+        reminder_loader.cancel()
+    await reminder_scheduler.stop()
+    await ai_job_queue.stop()
+    await gemini_service.close()
+    db.auth_executor.shutdown()
 
 app = FastAPI(
-    title=settings.PROJECT_NAME,    
+    title=settings.PROJECT_NAME,
+    lifespan=lifespan,
 )
 
 # CORS middleware ekle
@@ -34,6 +90,20 @@ async def health_check():
     """Sağlık kontrolü endpoint'i"""
     return {"status": "healthy", "message": "API çalışıyor"}
 
+@app.get("/metrics")
+async def metrics():
+    """Process içi cache, kuyruk ve Gemini istek sayaçları"""
+    return {
+        "note_cache": note_cache.stats(),
+        "ai_analysis_cache": ai_analysis_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "token_verifier": db.auth_executor.stats(),
+        "ai_jobs": ai_job_queue.stats(),
+        "gemini": gemini_service.stats(),
+        "search_index": search_index.stats(),
+        "reminders": reminder_scheduler.stats()
+    }
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
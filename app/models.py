@@ -1,9 +1,13 @@
 # Backward compatibility için eski imports'ları koruyalım
-from .models.base import StandardResponse, BaseEntity, BaseUserEntity, BaseResponse
+from .models.base import StandardResponse, PaginatedResponse, BaseEntity, BaseUserEntity, BaseResponse
 from .models.auth_models import User, Token, TokenData, UserResponse, AuthStatusResponse, TokenRefreshResponse
 from .models.note_models import (
-    NoteBase, Note, NoteResponse, AIAnalysisResponse,
-    NoteCreateRequest, NoteUpdateRequest
+    NoteBase, Note, NoteResponse, NoteSummaryResponse, AIAnalysisResponse, AIJobResponse,
+    NoteCreateRequest, NoteUpdateRequest,
+    NoteBatchOperation, NoteBatchRequest, NoteBatchResult,
+    NoteLookupRequest, NoteLookupResult,
+    NoteBulkAnalysisRequest, NoteBulkAnalysisResult, NoteChangesResponse, NoteSearchResult, TagFacet,
+    NoteCalendarItem, CalendarDay, NoteCreateResponse, DuplicateCluster
 )
 
 # Backward compatibility
@@ -12,9 +16,13 @@ NoteUpdate = NoteUpdateRequest
 
 # Tüm modelleri export et
 __all__ = [
-    "StandardResponse", "BaseEntity", "BaseUserEntity", "BaseResponse",
+    "StandardResponse", "PaginatedResponse", "BaseEntity", "BaseUserEntity", "BaseResponse",
     "User", "Token", "TokenData", "UserResponse", "AuthStatusResponse", "TokenRefreshResponse",
-    "NoteBase", "Note", "NoteResponse", "AIAnalysisResponse",
+    "NoteBase", "Note", "NoteResponse", "NoteSummaryResponse", "AIAnalysisResponse", "AIJobResponse",
     "NoteCreateRequest", "NoteUpdateRequest",
+    "NoteBatchOperation", "NoteBatchRequest", "NoteBatchResult",
+    "NoteLookupRequest", "NoteLookupResult",
+    "NoteBulkAnalysisRequest", "NoteBulkAnalysisResult", "NoteChangesResponse", "NoteSearchResult", "TagFacet",
+    "NoteCalendarItem", "CalendarDay", "NoteCreateResponse", "DuplicateCluster",
     "NoteCreate", "NoteUpdate"  # Backward compatibility
 ]
@@ -1,8 +1,12 @@
-from .base import StandardResponse, BaseEntity, BaseUserEntity, BaseResponse
+from .base import StandardResponse, PaginatedResponse, BaseEntity, BaseUserEntity, BaseResponse
 from .auth_models import User, Token, TokenData, UserResponse, AuthStatusResponse, TokenRefreshResponse
 from .note_models import (
-    NoteBase, Note, NoteResponse, AIAnalysisResponse,
-    NoteCreateRequest, NoteUpdateRequest
+    NoteBase, Note, NoteResponse, NoteSummaryResponse, AIAnalysisResponse, AIJobResponse,
+    NoteCreateRequest, NoteUpdateRequest,
+    NoteBatchOperation, NoteBatchRequest, NoteBatchResult,
+    NoteLookupRequest, NoteLookupResult,
+    NoteBulkAnalysisRequest, NoteBulkAnalysisResult, NoteChangesResponse, NoteSearchResult, TagFacet,
+    NoteCalendarItem, CalendarDay, NoteCreateResponse, DuplicateCluster
 )
 
 # Backward compatibility için eski modelleri export et
@@ -10,9 +14,13 @@ NoteCreate = NoteCreateRequest
 NoteUpdate = NoteUpdateRequest
 
 __all__ = [
-    "StandardResponse", "BaseEntity", "BaseUserEntity", "BaseResponse",
+    "StandardResponse", "PaginatedResponse", "BaseEntity", "BaseUserEntity", "BaseResponse",
     "User", "Token", "TokenData", "UserResponse", "AuthStatusResponse", "TokenRefreshResponse",
-    "NoteBase", "Note", "NoteResponse", "AIAnalysisResponse",
+    "NoteBase", "Note", "NoteResponse", "NoteSummaryResponse", "AIAnalysisResponse", "AIJobResponse",
     "NoteCreateRequest", "NoteUpdateRequest",
+    "NoteBatchOperation", "NoteBatchRequest", "NoteBatchResult",
+    "NoteLookupRequest", "NoteLookupResult",
+    "NoteBulkAnalysisRequest", "NoteBulkAnalysisResult", "NoteChangesResponse", "NoteSearchResult", "TagFacet",
+    "NoteCalendarItem", "CalendarDay", "NoteCreateResponse", "DuplicateCluster",
     "NoteCreate", "NoteUpdate"  # Backward compatibility
 ]
@@ -13,6 +13,10 @@ class StandardResponse(BaseModel, Generic[T]):
     message: str = Field(..., description="İşlem mesajı", example="Kayıt başarılı")
     data: Optional[T] = Field(None, description="Dönen veri", example=None)
 
+class PaginatedResponse(StandardResponse[T], Generic[T]):
+    """Sayfalı liste response formatı"""
+    nextPageToken: Optional[str] = Field(None, description="Sonraki sayfa için opak token (son sayfada null)", example=None)
+
 class BaseEntity(BaseModel):
     """Base entity modeli - tüm entityler için ortak alanlar"""
     id: UUID = Field(..., description="Entity ID'si")
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional, List, Union
-from datetime import datetime
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Optional, List, Union, Literal
+from datetime import date, datetime
 from uuid import UUID
 from app.models.base import BaseUserEntity, BaseResponse
 
@@ -71,6 +71,7 @@ class Note(BaseUserEntity):
     """Veritabanından gelen tam not modeli"""
     title: str
     content: str
+    snippet: Optional[str] = None
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
     pinned: bool = False
@@ -81,6 +82,7 @@ class NoteResponse(BaseResponse):
     id: UUID = Field(..., description="Not ID'si", example="123e4567-e89b-12d3-a456-426614174000")
     title: str = Field(..., description="Not başlığı", example="Alışveriş Listesi")
     content: str = Field(..., description="Not içeriği", example="Süt, ekmek, yumurta alınacak")
+    snippet: Optional[str] = Field(None, description="İçeriğin kısa özeti (liste görünümü için)", example="Süt, ekmek, yumurta alınacak")
     start_date: Optional[datetime] = Field(None, description="Notun/geçerliliğin başlangıç zamanı", example="2025-09-12T09:00:00Z")
     end_date: Optional[datetime] = Field(None, description="Notun/geçerliliğin bitiş zamanı", example="2025-09-12T17:00:00Z")
     pinned: bool = Field(False, description="Not sabitlenmiş mi?", example=False)
@@ -92,6 +94,17 @@ class NoteResponse(BaseResponse):
     class Config:
         from_attributes = True
 
+class NoteSummaryResponse(BaseResponse):
+    """Liste ekranı için hafif not modeli (içeriğin tamamı olmadan)"""
+    id: UUID = Field(..., description="Not ID'si", example="123e4567-e89b-12d3-a456-426614174000")
+    title: str = Field(..., description="Not başlığı", example="Alışveriş Listesi")
+    snippet: Optional[str] = Field(None, description="İçeriğin kısa özeti", example="Süt, ekmek, yumurta alınacak")
+    pinned: bool = Field(False, description="Not sabitlenmiş mi?", example=False)
+    deleted: bool = Field(False, description="Not silinmiş mi? (soft delete)", example=False)
+    tags: Optional[List[str]] = Field(None, description="Not etiketleri", example=["work", "todo"])
+    created_at: datetime = Field(..., description="Oluşturulma tarihi", example="2024-01-15T10:30:00")
+    updated_at: datetime = Field(..., description="Güncellenme tarihi", example="2024-01-15T10:30:00")
+
 class AIAnalysisResponse(BaseModel):
     """AI analiz sonucu modeli"""
     note_type: str = Field(..., description="Not türü", example="İş")
@@ -101,6 +114,16 @@ class AIAnalysisResponse(BaseModel):
     suggested_tags: List[str] = Field(..., description="Önerilen etiketler", example=["zaman çizelgesi", "görevler"])
     raw_analysis: str = Field(..., description="Ham analiz metni", example="ANALİZ SONUCU:\n- Not Türü: İş\n...")
 
+class AIJobResponse(BaseModel):
+    """Asenkron AI analiz işi modeli"""
+    job_id: str = Field(..., description="İş ID'si")
+    note_id: str = Field(..., description="Analiz edilen notun ID'si")
+    status: Literal["queued", "running", "succeeded", "failed"] = Field(..., description="İşin durumu")
+    result: Optional[AIAnalysisResponse] = Field(None, description="Tamamlanan işin analiz sonucu")
+    error: Optional[str] = Field(None, description="Başarısız işin hata mesajı")
+    created_at: datetime = Field(..., description="İşin oluşturulma zamanı")
+    finished_at: Optional[datetime] = Field(None, description="İşin bitiş zamanı")
+
 # Request Models
 class NoteCreateRequest(BaseModel):
     """Yeni not oluşturmak için kullanılan model"""
@@ -227,3 +250,125 @@ class NoteUpdateRequest(BaseModel):
     
     class Config:
         populate_by_name = True
+
+
+class NoteBatchOperation(BaseModel):
+    """Toplu işlemdeki tek bir not operasyonu"""
+    op: Literal["create", "update", "delete", "restore"] = Field(
+        ...,
+        description="Operasyon tipi",
+        example="update"
+    )
+    note_id: Optional[UUID] = Field(
+        None,
+        alias="noteId",
+        description="Hedef notun ID'si (create dışındaki operasyonlar için zorunlu)",
+        example="123e4567-e89b-12d3-a456-426614174000"
+    )
+    note: Optional[NoteCreateRequest] = Field(
+        None,
+        description="Oluşturulacak not (sadece create)"
+    )
+    changes: Optional[NoteUpdateRequest] = Field(
+        None,
+        description="Güncellenecek alanlar (sadece update)"
+    )
+    
+    @model_validator(mode='after')
+    def check_payload(self):
+        if self.op == "create" and self.note is None:
+            raise ValueError("create operasyonu için note alanı zorunludur")
+        if self.op != "create" and self.note_id is None:
+            raise ValueError(f"{self.op} operasyonu için noteId alanı zorunludur")
+        if self.op == "update" and self.changes is None:
+            raise ValueError("update operasyonu için changes alanı zorunludur")
+        return self
+    
+    class Config:
+        populate_by_name = True
+
+class NoteBatchRequest(BaseModel):
+    """Toplu not işlemleri için kullanılan model"""
+    operations: List[NoteBatchOperation] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="Sırayla uygulanacak operasyonlar"
+    )
+
+class NoteBatchResult(BaseModel):
+    """Toplu işlemdeki tek bir operasyonun sonucu"""
+    index: int = Field(..., description="Operasyonun istekteki sırası", example=0)
+    op: str = Field(..., description="Operasyon tipi", example="update")
+    note_id: Optional[UUID] = Field(None, description="Etkilenen notun ID'si", example="123e4567-e89b-12d3-a456-426614174000")
+    isSuccess: bool = Field(..., description="Operasyon başarılı mı?", example=True)
+    errorCode: Optional[str] = Field(None, description="Hata kodu (varsa)", example="NOTE_NOT_FOUND")
+    data: Optional[NoteResponse] = Field(None, description="Notun yazılmış hali (delete için null)")
+
+class NoteLookupRequest(BaseModel):
+    """ID listesiyle not getirmek için kullanılan model"""
+    ids: List[UUID] = Field(
+        ...,
+        min_length=1,
+        max_length=100,
+        description="Getirilecek notların ID'leri",
+        example=["123e4567-e89b-12d3-a456-426614174000"]
+    )
+
+class NoteLookupResult(BaseModel):
+    """ID ile getirilen tek bir notun sonucu"""
+    id: UUID = Field(..., description="İstenen not ID'si", example="123e4567-e89b-12d3-a456-426614174000")
+    found: bool = Field(..., description="Not bulundu mu?", example=True)
+    data: Optional[NoteResponse] = Field(None, description="Not (bulunamadıysa veya erişim yoksa null)")
+
+class NoteBulkAnalysisRequest(BaseModel):
+    """Toplu AI analizi için kullanılan model"""
+    ids: Optional[List[UUID]] = Field(
+        None,
+        min_length=1,
+        max_length=1000,
+        description="Analiz edilecek notların ID'leri (verilmezse henüz analiz edilmemiş tüm notlar)",
+        example=["123e4567-e89b-12d3-a456-426614174000"]
+    )
+
+class NoteBulkAnalysisResult(BaseModel):
+    """Toplu AI analizinde tek bir notun sonucu (NDJSON satırı)"""
+    note_id: UUID = Field(..., description="Analiz edilen not ID'si", example="123e4567-e89b-12d3-a456-426614174000")
+    isSuccess: bool = Field(..., description="Analiz başarılı mı?", example=True)
+    errorCode: Optional[str] = Field(None, description="Hata kodu", example=None)
+    message: Optional[str] = Field(None, description="Hata mesajı", example=None)
+    cached: bool = Field(False, description="Sonuç önceki analizden mi geldi?", example=False)
+    data: Optional[AIAnalysisResponse] = Field(None, description="Analiz sonucu")
+
+class NoteChangesResponse(BaseModel):
+    """Delta sync sonucu"""
+    notes: List[NoteResponse] = Field(..., description="Cursor'dan sonra değişen notlar (silinenler deleted=true ile)")
+    cursor: Optional[str] = Field(None, description="Bir sonraki senkronizasyonda since olarak gönderilecek cursor", example="eyJ1IjoiMjAyNC0wMS0xNVQxMDozMDowMCJ9")
+    has_more: bool = Field(..., description="Bu cursor'dan sonra alınmamış değişiklik var mı?", example=False)
+
+class NoteSearchResult(NoteSummaryResponse):
+    """Tam metin arama sonucu"""
+    score: float = Field(..., description="BM25 skoru (yüksek olan daha alakalı)", example=3.2145)
+
+class TagFacet(BaseModel):
+    """Etiket ve taşıdığı not sayısı"""
+    tag: str = Field(..., description="Etiket", example="work")
+    count: int = Field(..., description="Etiketi taşıyan (silinmemiş) not sayısı", example=12)
+
+class NoteCalendarItem(NoteSummaryResponse):
+    """Takvim görünümü için not özeti"""
+    start_date: Optional[datetime] = Field(None, description="Notun/geçerliliğin başlangıç zamanı", example="2025-09-12T09:00:00Z")
+    end_date: Optional[datetime] = Field(None, description="Notun/geçerliliğin bitiş zamanı", example="2025-09-12T17:00:00Z")
+
+class NoteCreateResponse(NoteResponse):
+    """Oluşturulan not ve (istendiyse) olası yakın kopyaları"""
+    possible_duplicates: List[UUID] = Field(default_factory=list, description="Yeni notun yakın kopyası olan notların ID'leri (check_duplicates=true ise)")
+
+class DuplicateCluster(BaseModel):
+    """Birbirinin yakın kopyası olan not kümesi"""
+    notes: List[NoteSummaryResponse] = Field(..., description="Kümedeki notlar (en az iki)")
+
+class CalendarDay(BaseModel):
+    """Takvimde tek bir gün ve o gün etkin olan notlar"""
+    day: date = Field(..., description="Gün (istenen saat dilimine göre)", example="2025-09-12")
+    notes: List[NoteCalendarItem] = Field(..., description="O gün etkin olan notlar (başlangıca göre sıralı)")
@@ -1,7 +1,14 @@
 from .auth_queries import GetCurrentUserQuery, GetAuthStatusQuery
-from .note_queries import GetNotesQuery, GetNoteQuery
+from .note_queries import (
+    GetNotesQuery, GetNoteQuery, LookupNotesQuery, GetNoteChangesQuery, GetAIJobQuery, SearchNotesQuery,
+    GetTagFacetsQuery, AutocompleteTagsQuery,
+    GetNotesInRangeQuery, GetActiveNotesQuery, GetDuplicateNotesQuery
+)
 
 __all__ = [
     "GetCurrentUserQuery", "GetAuthStatusQuery",
-    "GetNotesQuery", "GetNoteQuery"
+    "GetNotesQuery", "GetNoteQuery", "LookupNotesQuery",
+    "GetNoteChangesQuery", "GetAIJobQuery", "SearchNotesQuery",
+    "GetTagFacetsQuery", "AutocompleteTagsQuery",
+    "GetNotesInRangeQuery", "GetActiveNotesQuery", "GetDuplicateNotesQuery"
 ]
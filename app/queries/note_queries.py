@@ -1,13 +1,80 @@
 from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
 from uuid import UUID
 
 @dataclass
 class GetNotesQuery:
     """Notları getirme sorgusu"""
     user_id: str
+    limit: Optional[int] = None
+    page_token: Optional[str] = None
+    view: str = "full"
+    fields: Optional[List[str]] = None
+    tags: Optional[List[str]] = None
 
 @dataclass
 class GetNoteQuery:
     """Tek not getirme sorgusu"""
     note_id: UUID
     user_id: str
+
+@dataclass
+class LookupNotesQuery:
+    """ID listesiyle not getirme sorgusu"""
+    note_ids: List[UUID]
+    user_id: str
+
+@dataclass
+class GetNoteChangesQuery:
+    """Delta sync sorgusu"""
+    user_id: str
+    since: Optional[str] = None
+    limit: int = 100
+
+@dataclass
+class GetAIJobQuery:
+    """AI analiz işi durumu sorgusu"""
+    note_id: UUID
+    job_id: UUID
+    user_id: str
+
+@dataclass
+class SearchNotesQuery:
+    """Tam metin arama sorgusu"""
+    user_id: str
+    q: str
+    limit: int = 20
+
+@dataclass
+class GetTagFacetsQuery:
+    """Etiket sayaçları sorgusu"""
+    user_id: str
+    limit: Optional[int] = None
+
+@dataclass
+class AutocompleteTagsQuery:
+    """Etiket otomatik tamamlama sorgusu"""
+    user_id: str
+    prefix: str
+    limit: int = 10
+
+@dataclass
+class GetNotesInRangeQuery:
+    """Tarih aralığıyla çakışan notlar (takvim) sorgusu"""
+    user_id: str
+    start: datetime
+    end: datetime
+    tz: str = "UTC"
+
+@dataclass
+class GetDuplicateNotesQuery:
+    """Yakın kopya not kümeleri sorgusu"""
+    user_id: str
+    limit: Optional[int] = None
+
+@dataclass
+class GetActiveNotesQuery:
+    """Belirli bir anda etkin olan notlar sorgusu"""
+    user_id: str
+    at: Optional[datetime] = None
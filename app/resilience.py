@@ -0,0 +1,183 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+class UpstreamUnavailableError(Exception):
+    """Dış servis şu an çağrılamıyor; retry_after saniye sonra tekrar denenebilir"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class CircuitOpenError(UpstreamUnavailableError):
+    """Devre kesici açık; istek servise gönderilmeden reddedildi"""
+    pass
+
+class RateLimitExceededError(UpstreamUnavailableError):
+    """İstemci tarafı kota max_wait içinde istek hakkı veremedi"""
+    pass
+
+class TokenBucket:
+    """
+    Uyarlanabilir token bucket
+
+    Saniyede rate token dolar, en fazla capacity token birikir. Token
+    yoksa istek, hakkı gelene kadar bekletilir; bekleme max_wait'i
+    aşacaksa hemen reddedilir. Servis 429 döndürdüğünde (throttled) hız
+    yarıya iner, başarılı isteklerle (recovered) yapılandırılan hıza
+    kademeli olarak geri döner.
+    """
+
+    def __init__(self, rate: float, capacity: float, min_rate: Optional[float] = None):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate if min_rate is not None else rate / 10
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self.granted = 0
+        self.delayed = 0
+        self.rejected = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, max_wait: float) -> bool:
+        """Bir istek hakkı al; max_wait içinde alınamayacaksa False döndür"""
+        self._refill()
+        wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+        if wait > max_wait:
+            self.rejected += 1
+            return False
+        # Token önceden ayrılır; bekleyen istekler sırayla negatif bakiyeyi kapatır
+        self._tokens -= 1
+        self.granted += 1
+        if wait > 0:
+            self.delayed += 1
+            await asyncio.sleep(wait)
+        return True
+
+    def throttled(self, retry_after: Optional[float] = None) -> None:
+        """Servis 429 döndürdü; hızı düşür ve Retry-After süresince yeni hak verme"""
+        self._refill()
+        self.rate = max(self.min_rate, self.rate / 2)
+        if retry_after:
+            self._tokens = min(self._tokens, -retry_after * self.rate)
+
+    def recovered(self) -> None:
+        """Başarılı istek; hızı yapılandırılan değere doğru artır"""
+        if self.rate < self.max_rate:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def stats(self) -> Dict[str, Any]:
+        self._refill()
+        return {
+            "rate_per_second": round(self.rate, 3),
+            "max_rate_per_second": self.max_rate,
+            "capacity": self.capacity,
+            "available_tokens": round(self._tokens, 3),
+            "granted": self.granted,
+            "delayed": self.delayed,
+            "rejected": self.rejected
+        }
+
+class CircuitBreaker:
+    """
+    Devre kesici
+
+    Art arda failure_threshold hata sonrası açılır ve reset_timeout
+    boyunca istekleri servise göndermeden reddeder. Süre dolunca tek bir
+    deneme isteğine izin verilir (half_open); başarılı olursa devre
+    kapanır, başarısız olursa yeniden açılır.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened = 0
+        self.short_circuited = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def retry_after(self) -> float:
+        """Devrenin tekrar deneme kabul etmesine kalan süre"""
+        if self.state == self.CLOSED:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        """İstek servise gönderilebilir mi"""
+        if self.state == self.OPEN and self.retry_after() == 0:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        self.short_circuited += 1
+        return False
+
+    def release(self) -> None:
+        """allow() ile izin alınan istek sonuçlanmadan bırakıldı (iptal, kota reddi)"""
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.opened += 1
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout_seconds": self.reset_timeout,
+            "retry_after_seconds": round(self.retry_after(), 3),
+            "opened": self.opened,
+            "short_circuited": self.short_circuited
+        }
+
+def backoff_delay(attempt: int, base: float, cap: float, retry_after: Optional[float] = None) -> float:
+    """
+    Tekrar denemeden önce beklenecek süre
+
+    Servis Retry-After bildirdiyse o süreye küçük bir jitter eklenir;
+    bildirmediyse full jitter'lı üstel bekleme kullanılır (attempt 0'dan başlar).
+    """
+    if retry_after is not None:
+        return retry_after + random.uniform(0, base)
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After başlığını (saniye veya HTTP tarihi) saniyeye çevir"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,18 @@
+from typing import Dict, Optional
+from fastapi import Response
+from pydantic import BaseModel
+
+def model_response(model: BaseModel, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Doğrulanmış response modelini doğrudan JSON byte'larına çevirip döndür
+
+    FastAPI, endpoint bir Response döndürdüğünde response_model doğrulamasını,
+    jsonable_encoder'ı ve stdlib json.dumps'ı atlar. Model controller'da bir kez
+    oluşturulur ve pydantic-core'un Rust serializer'ı ile tek geçişte encode edilir.
+    """
+    return Response(
+        content=model.model_dump_json(),
+        media_type="application/json",
+        status_code=status_code,
+        headers=headers
+    )
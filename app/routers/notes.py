@@ -1,23 +1,167 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from datetime import datetime
+from typing import List, Literal, Optional
 from uuid import UUID
 from app.models.note_models import (
-    NoteCreateRequest, NoteUpdateRequest, NoteResponse, AIAnalysisResponse
+    NoteCreateRequest, NoteUpdateRequest, NoteResponse, AIAnalysisResponse, AIJobResponse,
+    NoteBatchRequest, NoteBatchResult, NoteLookupRequest, NoteLookupResult,
+    NoteBulkAnalysisRequest,
+    NoteChangesResponse, NoteSearchResult, TagFacet, NoteCalendarItem, CalendarDay,
+    NoteCreateResponse, DuplicateCluster
 )
-from app.models.base import StandardResponse
+from app.models.base import StandardResponse, PaginatedResponse
 from app.controllers.note_controller import NoteController
 from app.auth import get_current_user_id
 
 router = APIRouter(prefix="/notes", tags=["notes"])
 note_controller = NoteController()
 
-@router.get("/", response_model=StandardResponse[List[NoteResponse]])
-async def get_notes(user_id: str = Depends(get_current_user_id)):
-    """Kullanıcının tüm notlarını getir"""
-    return await note_controller.get_notes(user_id)
+@router.get("/", response_model=PaginatedResponse[List[NoteResponse]])
+async def get_notes(
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Sayfa başına not sayısı (verilmezse tüm notlar)"),
+    page_token: Optional[str] = Query(None, description="Önceki yanıttaki nextPageToken değeri"),
+    view: Literal["full", "summary"] = Query("full", description="summary: içerik yerine kısa özet döner"),
+    fields: Optional[str] = Query(None, description="Virgülle ayrılmış alan listesi (ör. id,title,tags)"),
+    tag: Optional[List[str]] = Query(None, description="Etiket filtresi; birden fazla verilirse herhangi birini taşıyan notlar döner"),
+    if_none_match: Optional[str] = Header(None),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Kullanıcının notlarını getir
+    
+    - **limit**: Sayfa boyutu (opsiyonel, 1-100 arası)
+    - **page_token**: Sonraki sayfa için önceki yanıttaki `nextPageToken` (opsiyonel)
+    - **view**: `full` (varsayılan) veya `summary` (id, title, snippet, tags, pinned, tarihler)
+    - **fields**: Sadece istenen alanları döndür; verildiğinde `view` yok sayılır
+    - **tag**: Etikete göre filtrele (tekrarlanabilir, en fazla 30; ör. `?tag=work&tag=todo`)
+    
+    Notlar önce sabitlenmişler, sonra oluşturulma tarihine göre yeniden eskiye sıralanır.
+    Yanıt `ETag` header'ı içerir; `If-None-Match` ile gönderilirse ve liste değişmediyse 304 döner.
+    """
+    return await note_controller.get_notes(
+        user_id, limit=limit, page_token=page_token, if_none_match=if_none_match,
+        view=view, fields=fields, tags=tag
+    )
+
+@router.get("/changes", response_model=StandardResponse[NoteChangesResponse])
+async def get_note_changes(
+    since: Optional[str] = Query(None, description="Önceki senkronizasyondan dönen cursor (verilmezse tüm notlar)"),
+    limit: int = Query(100, ge=1, le=500, description="Tek yanıtta dönecek en fazla değişiklik"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Son senkronizasyondan bu yana değişen notları getir
+    
+    - **since**: Önceki yanıttaki `cursor` (opsiyonel)
+    - **limit**: Sayfa boyutu (1-500 arası)
+    
+    Silinen notlar `deleted: true` ile tombstone olarak döner. `has_more` true ise
+    dönen cursor ile tekrar çağırın.
+    """
+    return await note_controller.get_note_changes(user_id, since=since, limit=limit)
+
+@router.get("/search", response_model=StandardResponse[List[NoteSearchResult]])
+async def search_notes(
+    q: str = Query(..., min_length=1, max_length=200, description="Aranacak kelimeler"),
+    limit: int = Query(20, ge=1, le=100, description="En fazla sonuç sayısı"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Notlarda tam metin arama
+    
+    - **q**: Başlık, içerik ve etiketlerde aranacak kelimeler (Türkçe büyük/küçük harf duyarsız)
+    - **limit**: En fazla sonuç sayısı (1-100 arası)
+    
+    Sonuçlar BM25 skoruna göre sıralanır; başlık ve etiket eşleşmeleri içerikten
+    daha yüksek puan alır. En az 3 harfli kelimeler ek almış hallerini de bulur
+    (ör. "toplantı" -> "toplantıda"). Silinmiş notlar aranmaz.
+    """
+    return await note_controller.search_notes(user_id, q, limit=limit)
+
+@router.get("/tags", response_model=StandardResponse[List[TagFacet]])
+async def get_tag_facets(
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="En fazla etiket sayısı (verilmezse tümü)"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Kullanıcının etiketlerini not sayılarıyla getir
+    
+    - **limit**: En fazla etiket sayısı (opsiyonel)
+    
+    Etiketler taşıdıkları (silinmemiş) not sayısına göre azalan sırada döner.
+    """
+    return await note_controller.get_tag_facets(user_id, limit=limit)
+
+@router.get("/tags/autocomplete", response_model=StandardResponse[List[TagFacet]])
+async def autocomplete_tags(
+    prefix: str = Query(..., min_length=1, max_length=100, description="Etiketin başı"),
+    limit: int = Query(10, ge=1, le=50, description="En fazla öneri sayısı"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Etiket giriş alanı için otomatik tamamlama
+    
+    - **prefix**: Etiketin yazılan kısmı (Türkçe büyük/küçük harf duyarsız)
+    - **limit**: En fazla öneri sayısı (1-50 arası)
+    
+    Öneriler kullanım sayısına göre azalan sırada döner.
+    """
+    return await note_controller.autocomplete_tags(user_id, prefix, limit=limit)
+
+@router.get("/range", response_model=StandardResponse[List[CalendarDay]])
+async def get_notes_in_range(
+    start: datetime = Query(..., alias="from", description="Aralığın başlangıcı (ör. 2025-09-08T00:00:00)"),
+    end: datetime = Query(..., alias="to", description="Aralığın sonu (dahil)"),
+    tz: str = Query("UTC", description="Günlerin belirleneceği IANA saat dilimi (ör. Europe/Istanbul)"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Takvim görünümü: aralıkta etkin olan notları güne göre gruplanmış getir
+    
+    - **from** / **to**: Aralık (en fazla 366 gün); saat dilimi verilmezse `tz` kabul edilir
+    - **tz**: Günlerin belirleneceği saat dilimi (varsayılan UTC)
+    
+    Bir not `start_date`/`end_date` aralığı sorguyla çakışıyorsa etkindir; sadece tek
+    tarihi olan not o ana ait sayılır. Birden fazla güne yayılan not her gününde listelenir.
+    """
+    return await note_controller.get_calendar(user_id, start, end, tz=tz)
+
+@router.get("/active", response_model=StandardResponse[List[NoteCalendarItem]])
+async def get_active_notes(
+    at: Optional[datetime] = Query(None, description="Sorgulanan an (verilmezse şimdi; saat dilimi verilmezse UTC)"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Belirli bir anda etkin olan notları getir
+    
+    - **at**: Sorgulanan an (opsiyonel)
+    
+    Notlar başlangıç tarihine göre sıralı döner.
+    """
+    return await note_controller.get_active_notes(user_id, at=at)
+
+@router.get("/duplicates", response_model=StandardResponse[List[DuplicateCluster]])
+async def get_duplicate_notes(
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="En fazla küme sayısı (verilmezse tümü)"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Birbirinin yakın kopyası olan notları kümeler halinde getir
+    
+    - **limit**: En fazla küme sayısı (opsiyonel)
+    
+    Başlık ve içeriğin SimHash imzaları en fazla 3 bit farklı olan notlar aynı
+    kümeye düşer. Kümeler büyükten küçüğe sıralanır.
+    """
+    return await note_controller.get_duplicates(user_id, limit=limit)
 
-@router.post("/", response_model=StandardResponse[NoteResponse], status_code=status.HTTP_201_CREATED)
-async def create_note(note: NoteCreateRequest, user_id: str = Depends(get_current_user_id)):
+@router.post("/", response_model=StandardResponse[NoteCreateResponse], status_code=status.HTTP_201_CREATED)
+async def create_note(
+    note: NoteCreateRequest,
+    response: Response,
+    check_duplicates: bool = Query(False, description="true ise yeni notun yakın kopyaları possible_duplicates alanında döner"),
+    user_id: str = Depends(get_current_user_id)
+):
     """
     Yeni not oluştur
     
@@ -27,18 +171,79 @@ async def create_note(note: NoteCreateRequest, user_id: str = Depends(get_curren
     - **end_date**: Notun/geçerliliğin bitiş zamanı (opsiyonel)
     - **pinned**: Not sabitlenmiş mi? (varsayılan: false)
     - **tags**: Not etiketleri (opsiyonel)
+    - **check_duplicates**: Yakın kopya kontrolü (query parametresi, varsayılan: false)
+    
+    Kullanıcı kimlik doğrulaması gerektirir.
+    """
+    return await note_controller.create_note(note, user_id, response=response, check_duplicates=check_duplicates)
+
+@router.post("/lookup", response_model=StandardResponse[List[NoteLookupResult]])
+async def lookup_notes(lookup: NoteLookupRequest, user_id: str = Depends(get_current_user_id)):
+    """
+    Birden fazla notu ID listesiyle getir
+    
+    - **ids**: Not ID'leri (1-100 arası)
     
+    Sonuçlar istek sırasıyla döner; bulunamayan, silinmiş veya başka kullanıcıya ait
+    notlar `found: false` ile işaretlenir.
     Kullanıcı kimlik doğrulaması gerektirir.
     """
-    return await note_controller.create_note(note, user_id)
+    return await note_controller.lookup_notes(lookup, user_id)
+
+@router.post("/batch", response_model=StandardResponse[List[NoteBatchResult]])
+async def batch_notes(batch: NoteBatchRequest, user_id: str = Depends(get_current_user_id)):
+    """
+    Toplu not işlemleri (offline düzenlemelerin senkronizasyonu)
+    
+    - **operations**: Sırayla uygulanacak operasyonlar (en fazla 1000)
+        - **op**: `create`, `update`, `delete` veya `restore`
+        - **noteId**: Hedef not (create dışında zorunlu)
+        - **note**: Oluşturulacak not (create için)
+        - **changes**: Güncellenecek alanlar (update için)
+    
+    Her operasyon için ayrı sonuç döner; bir operasyonun başarısız olması diğerlerini etkilemez.
+    Okumadan sonra başka bir istemci tarafından değiştirilen notların operasyonları
+    `NOTE_CONFLICT` ile döner ve yazılmaz.
+    Kullanıcı kimlik doğrulaması gerektirir.
+    """
+    return await note_controller.batch_notes(batch, user_id)
+
+@router.post(
+    "/ai/bulk",
+    responses={200: {"content": {"application/x-ndjson": {}}, "description": "Her satırı bir NoteBulkAnalysisResult olan akış"}}
+)
+async def bulk_analyze_notes(request: NoteBulkAnalysisRequest, user_id: str = Depends(get_current_user_id)):
+    """
+    Birden fazla notu Gemini AI ile analiz et
+    
+    - **ids**: Analiz edilecek notlar (verilmezse henüz analiz edilmemiş tüm notlar)
+    - Kısa notlar tek istekte birlikte analiz edilir, eşzamanlı istek sayısı sınırlıdır
+    - Sonuçlar tamamlandıkça NDJSON satırları olarak akar
+    - Sonuçlar notlara toplu yazılır; sonraki /ai çağrıları cache'ten döner
+    """
+    return await note_controller.bulk_analyze_notes(request, user_id)
 
 @router.get("/{note_id}", response_model=StandardResponse[NoteResponse])
-async def get_note(note_id: UUID, user_id: str = Depends(get_current_user_id)):
-    """Belirli bir notu getir"""
-    return await note_controller.get_note(note_id, user_id)
+async def get_note(
+    note_id: UUID,
+    if_none_match: Optional[str] = Header(None),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Belirli bir notu getir
+    
+    Yanıt `ETag` header'ı içerir; `If-None-Match` ile gönderilirse ve not değişmediyse 304 döner.
+    """
+    return await note_controller.get_note(note_id, user_id, if_none_match=if_none_match)
 
 @router.put("/{note_id}", response_model=StandardResponse[NoteResponse])
-async def update_note(note_id: UUID, note_update: NoteUpdateRequest, user_id: str = Depends(get_current_user_id)):
+async def update_note(
+    note_id: UUID,
+    note_update: NoteUpdateRequest,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    user_id: str = Depends(get_current_user_id)
+):
     """
     Notu güncelle
     
@@ -51,22 +256,33 @@ async def update_note(note_id: UUID, note_update: NoteUpdateRequest, user_id: st
     - **tags**: Yeni etiketler (opsiyonel)
     
     En az bir alan güncellenmelidir.
+    `If-Match` header'ı ile notun ETag'i gönderilirse güncelleme sadece not
+    değişmemişse yapılır, aksi halde 412 döner.
     Kullanıcı kimlik doğrulaması gerektirir.
     """
-    return await note_controller.update_note(note_id, note_update, user_id)
+    return await note_controller.update_note(note_id, note_update, user_id, if_match=if_match, response=response)
 
 @router.delete("/{note_id}", response_model=StandardResponse[None])
-async def delete_note(note_id: UUID, user_id: str = Depends(get_current_user_id)):
-    """Notu sil (soft delete)"""
-    return await note_controller.delete_note(note_id, user_id)
+async def delete_note(
+    note_id: UUID,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Notu sil (soft delete)
+    
+    `If-Match` header'ı verilirse silme sadece ETag eşleşiyorsa yapılır, aksi halde 412 döner.
+    """
+    return await note_controller.delete_note(note_id, user_id, if_match=if_match, response=response)
 
 @router.patch("/{note_id}/restore", response_model=StandardResponse[NoteResponse])
-async def restore_note(note_id: UUID, user_id: str = Depends(get_current_user_id)):
+async def restore_note(note_id: UUID, response: Response, user_id: str = Depends(get_current_user_id)):
     """Silinmiş notu geri yükle"""
-    return await note_controller.restore_note(note_id, user_id)
+    return await note_controller.restore_note(note_id, user_id, response=response)
 
 @router.get("/{note_id}/ai", response_model=StandardResponse[AIAnalysisResponse])
-async def analyze_note_with_ai(note_id: UUID, user_id: str = Depends(get_current_user_id)):
+async def analyze_note_with_ai(note_id: UUID, response: Response, user_id: str = Depends(get_current_user_id)):
     """
     Notu Gemini AI ile analiz et
     
@@ -74,5 +290,43 @@ async def analyze_note_with_ai(note_id: UUID, user_id: str = Depends(get_current
     - Kullanıcı kimlik doğrulaması gerektirir
     - Not Firebase'den alınır ve Gemini AI'ya gönderilir
     - AI analiz sonucu döndürülür
+    - Gemini geçici olarak çağrılamıyorsa 503 ve Retry-After döner
+    """
+    return await note_controller.analyze_note_with_ai(note_id, user_id, response=response)
+
+@router.get(
+    "/{note_id}/ai/stream",
+    responses={200: {"content": {"text/event-stream": {}}, "description": "delta, field, result ve error olayları"}}
+)
+async def stream_note_analysis(note_id: UUID, user_id: str = Depends(get_current_user_id)):
+    """
+    Notu Gemini AI ile analiz et ve sonucu Server-Sent Events olarak akıt
+    
+    - **delta**: Gemini'dan gelen ham metin parçası
+    - **field**: Tamamlanan analiz alanı (note_type, importance_level, ...)
+    - **result**: Tam AIAnalysisResponse
+    - Not değişmediyse önceki analiz Gemini çağrılmadan akıtılır
+    """
+    return await note_controller.stream_note_analysis(note_id, user_id)
+
+@router.post("/{note_id}/ai/jobs", response_model=StandardResponse[AIJobResponse])
+async def create_ai_job(note_id: UUID, response: Response, user_id: str = Depends(get_current_user_id)):
+    """
+    Not için asenkron AI analiz işi oluştur
+    
+    - **note_id**: Analiz edilecek notun ID'si
+    - İş kuyruğa alınır ve hemen job_id döner (202)
+    - Aynı notun aynı sürümü için devam eden iş varsa o işin ID'si döner
+    - Kuyruk doluysa 503 döner
+    """
+    return await note_controller.create_ai_job(note_id, user_id, response)
+
+@router.get("/{note_id}/ai/jobs/{job_id}", response_model=StandardResponse[AIJobResponse])
+async def get_ai_job(note_id: UUID, job_id: UUID, user_id: str = Depends(get_current_user_id)):
+    """
+    AI analiz işinin durumunu getir
+    
+    - **status**: queued, running, succeeded veya failed
+    - Tamamlanan işlerde analiz sonucu result alanında döner
     """
-    return await note_controller.analyze_note_with_ai(note_id, user_id)
+    return await note_controller.get_ai_job(note_id, job_id, user_id)
@@ -0,0 +1,264 @@
+import asyncio
+import bisect
+import heapq
+import math
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from app.config import settings
+from app.duplicates import DuplicateIndex, simhash
+from app.intervals import IntervalIndex, timestamp
+from app.tags import TagIndex
+from app.text import tokenize
+
+# BM25 parametreleri
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Alan ağırlıkları; başlık ve etiket eşleşmeleri içerikten daha değerlidir
+FIELD_WEIGHTS = {"title": 3.0, "tags": 2.0, "content": 1.0}
+
+# Sorgu terimi başka bir terimin öneki olarak eşleştiğinde (ör. "toplantı" -> "toplantıda") skor çarpanı
+PREFIX_MATCH_WEIGHT = 0.5
+# Önek eşleşmesi için en kısa sorgu terimi ve terim başına en fazla genişleme
+PREFIX_MIN_LENGTH = 3
+PREFIX_MAX_EXPANSIONS = 50
+
+# Arama ve takvim sonuçlarında dönen not alanları (NoteCalendarItem)
+SUMMARY_FIELDS = ("id", "title", "snippet", "start_date", "end_date", "pinned", "deleted", "tags", "created_at", "updated_at")
+
+class UserSearchIndex:
+    """
+    Tek kullanıcının notları üzerinde ters indeks
+
+    Her terim için notlara göre alan ağırlıklı terim frekansı tutulur;
+    sorgular BM25 ile puanlanır. Etiket sayaçları ve otomatik tamamlama
+    trie'si (tags), tarih aralığı indeksi (intervals) ve yakın kopya
+    indeksi (duplicates) aynı notlardan beslenir. Silinmiş notlar
+    indekste tutulmaz.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, float]] = {}
+        self.doc_terms: Dict[str, Dict[str, float]] = {}
+        self.doc_lengths: Dict[str, float] = {}
+        self.summaries: Dict[str, dict] = {}
+        # Silinen notların updated_at'i (kalıcı silmede None); eski sürümün geri eklenmesini önler
+        self.deleted: Dict[str, Optional[datetime]] = {}
+        self.total_length = 0.0
+        self.tags = TagIndex()
+        self.intervals = IntervalIndex()
+        self.duplicates = DuplicateIndex()
+        # Önek araması için sıralı terim listesi; yeni terimler ilk önek aramasında
+        # topluca eklenir, postings'i boşalan terimler sayıları artınca temizlenir
+        self.terms: List[str] = []
+        self._new_terms: List[str] = []
+        self._stale_terms = 0
+        # Delta sync durumu
+        self.cursor: Optional[str] = None
+        self.synced_at: Optional[float] = None
+        self.lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self.doc_terms)
+
+    def add(self, note: dict) -> None:
+        """Notu indekse ekle veya güncelle; silinmişse indeksten çıkar"""
+        note_id = note["id"]
+        if note_id in self.deleted:
+            current_updated_at = self.deleted[note_id]
+        else:
+            current_updated_at = (self.summaries.get(note_id) or {}).get("updated_at")
+        if _is_older(note.get("updated_at"), current_updated_at, note_id in self.deleted):
+            # Delta sync'ten gelen eski sürüm, yazma yolundan gelen yeni sürümü ezmez
+            return
+        self._remove(note_id)
+        if note.get("deleted", False):
+            self.deleted[note_id] = note.get("updated_at")
+            return
+        self.deleted.pop(note_id, None)
+
+        weighted: Dict[str, float] = {}
+        fields = {"title": note.get("title") or "", "content": note.get("content") or "", "tags": " ".join(note.get("tags") or [])}
+        for field, text in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            for token in tokenize(text):
+                weighted[token] = weighted.get(token, 0.0) + weight
+
+        for term, frequency in weighted.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                self._new_terms.append(term)
+            postings[note_id] = frequency
+        length = sum(weighted.values())
+        self.doc_terms[note_id] = weighted
+        self.doc_lengths[note_id] = length
+        self.total_length += length
+        self.summaries[note_id] = {field: note.get(field) for field in SUMMARY_FIELDS}
+        self.tags.add(note.get("tags") or [])
+        self.intervals.add(note_id, note.get("start_date"), note.get("end_date"))
+        # İmzası olmayan eski notlar için imza burada hesaplanır
+        signature = note["simhash"] if "simhash" in note else simhash(fields["title"], fields["content"])
+        self.duplicates.add(note_id, signature)
+
+    def purge(self, note_id: str) -> None:
+        """Kalıcı olarak silinen notu çıkar; sonradan gelen eski sürümler yok sayılır"""
+        self._remove(note_id)
+        self.deleted[note_id] = None
+
+    def _remove(self, note_id: str) -> None:
+        weighted = self.doc_terms.pop(note_id, None)
+        if weighted is None:
+            return
+        for term in weighted:
+            postings = self.postings[term]
+            del postings[note_id]
+            if not postings:
+                del self.postings[term]
+                self._stale_terms += 1
+        self.total_length -= self.doc_lengths.pop(note_id)
+        self.tags.remove(self.summaries.pop(note_id).get("tags") or [])
+        self.intervals.remove(note_id)
+        self.duplicates.remove(note_id)
+
+    def _expand(self, term: str) -> Iterable[Tuple[str, float]]:
+        """Sorgu terimini indeksteki tam ve önek eşleşmelerine genişlet"""
+        if term in self.postings:
+            yield term, 1.0
+        if len(term) < PREFIX_MIN_LENGTH:
+            return
+        terms = self._sorted_terms()
+        expansions = 0
+        previous = term
+        for candidate in terms[bisect.bisect_right(terms, term):]:
+            if not candidate.startswith(term) or expansions >= PREFIX_MAX_EXPANSIONS:
+                break
+            # Silinip yeniden eklenen terimler listede iki kez bulunabilir
+            if candidate == previous or candidate not in self.postings:
+                continue
+            previous = candidate
+            expansions += 1
+            yield candidate, PREFIX_MATCH_WEIGHT
+
+    def _sorted_terms(self) -> List[str]:
+        """Bekleyen yeni terimleri sıralı listeye kat; boşalan terimler çoğaldıysa listeyi temizle"""
+        if self._stale_terms > len(self.postings):
+            self.terms = sorted(self.postings)
+            self._new_terms, self._stale_terms = [], 0
+        elif self._new_terms:
+            # Sıralı liste + sıralı ek: Timsort bunu doğrusal zamanda birleştirir
+            self._new_terms.sort()
+            self.terms.extend(self._new_terms)
+            self.terms.sort()
+            self._new_terms = []
+        return self.terms
+
+    def search(self, query: str, limit: int) -> List[Tuple[dict, float]]:
+        """
+        Sorguyu BM25 ile puanla
+
+        Returns:
+            Skora göre azalan (not özeti, skor) listesi
+        """
+        document_count = len(self.doc_terms)
+        if not document_count:
+            return []
+        average_length = self.total_length / document_count
+
+        # norm = k1 * (1 - b + b * dl / avgdl) = base + slope * dl
+        base = BM25_K1 * (1 - BM25_B)
+        slope = BM25_K1 * BM25_B / average_length
+        doc_lengths = self.doc_lengths
+        scores: Dict[str, float] = {}
+        for query_term in dict.fromkeys(tokenize(query)):
+            for term, weight in self._expand(query_term):
+                postings = self.postings[term]
+                idf = math.log(1 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                factor = weight * idf * (BM25_K1 + 1)
+                for note_id, frequency in postings.items():
+                    scores[note_id] = scores.get(note_id, 0.0) + factor * frequency / (frequency + base + slope * doc_lengths[note_id])
+
+        best = heapq.nlargest(limit, scores, key=scores.__getitem__)
+        return [(self.summaries[note_id], round(scores[note_id], 4)) for note_id in best]
+
+    def in_range(self, start: datetime, end: datetime) -> List[dict]:
+        """[start, end] aralığında etkin olan notların özetlerini başlangıca göre sıralı döndür"""
+        note_ids = self.intervals.overlapping(timestamp(start), timestamp(end))
+        return [self.summaries[note_id] for note_id in note_ids]
+
+    def needs_sync(self) -> bool:
+        """İndeks hiç yüklenmediyse veya son delta sync'in üzerinden yenileme süresi geçtiyse True"""
+        return self.synced_at is None or time.monotonic() - self.synced_at > settings.SEARCH_INDEX_REFRESH_INTERVAL
+
+class SearchIndex:
+    """
+    Kullanıcı başına ters indeksler
+
+    İndeks kullanıcının ilk aramasında delta sync ile yüklenir, sonra
+    Database'in yazma yollarından artımlı olarak güncellenir. En fazla
+    max_users kullanıcının indeksi tutulur; en uzun süre aranmayan
+    kullanıcının indeksi atılır.
+    """
+
+    def __init__(self, max_users: int):
+        self.max_users = max_users
+        self._users: "OrderedDict[str, UserSearchIndex]" = OrderedDict()
+        self.queries = 0
+        self.evictions = 0
+
+    def get(self, user_id: str) -> UserSearchIndex:
+        """Kullanıcının indeksini getir; yoksa boş indeks oluştur"""
+        index = self._users.get(user_id)
+        if index is None:
+            index = self._users[user_id] = UserSearchIndex()
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._users.move_to_end(user_id)
+        return index
+
+    def upsert(self, user_id: str, note: dict) -> None:
+        """Yazılan notu, kullanıcının indeksi yüklüyse indekse uygula"""
+        index = self._users.get(user_id)
+        if index is not None:
+            index.add(note)
+
+    def purge(self, user_id: str, note_id: str) -> None:
+        """Kalıcı olarak silinen notu, kullanıcının indeksi yüklüyse çıkar"""
+        index = self._users.get(user_id)
+        if index is not None:
+            index.purge(note_id)
+
+    def search(self, user_id: str, query: str, limit: int) -> List[Tuple[dict, float]]:
+        self.queries += 1
+        return self.get(user_id).search(query, limit)
+
+    def clear(self) -> None:
+        self._users.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "users": len(self._users),
+            "max_users": self.max_users,
+            "documents": sum(len(index) for index in self._users.values()),
+            "terms": sum(len(index.postings) for index in self._users.values()),
+            "tags": sum(len(index.tags) for index in self._users.values()),
+            "intervals": sum(len(index.intervals) for index in self._users.values()),
+            "signatures": sum(len(index.duplicates) for index in self._users.values()),
+            "queries": self.queries,
+            "evictions": self.evictions
+        }
+
+def _is_older(updated_at: Any, current_updated_at: Any, deleted: bool) -> bool:
+    """Gelen sürüm indekstekinden eski mi; kalıcı silinen nota (None) her sürüm eskidir"""
+    if deleted and current_updated_at is None:
+        return True
+    if not isinstance(updated_at, datetime) or not isinstance(current_updated_at, datetime):
+        return False
+    return updated_at < current_updated_at
+
+# Global arama indeksi
+search_index = SearchIndex(max_users=settings.SEARCH_INDEX_MAX_USERS)
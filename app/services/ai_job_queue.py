@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from uuid import uuid4
+from app.config import settings
+from app.services.analysis_service import analysis_service
+
+# Bitmiş işlerin arka planda temizlenme aralığının üst sınırı (saniye)
+PRUNE_INTERVAL = 60
+
+class AIJobQueueFullError(Exception):
+    """Kuyruk dolu; yeni analiz işi kabul edilmiyor"""
+    pass
+
+class AIJobQueue:
+    """
+    Asenkron AI analiz iş kuyruğu
+
+    İşler sınırlı bir asyncio.Queue'ya alınır ve sabit sayıda worker
+    tarafından GeminiService'e karşı işlenir. Aynı notun aynı sürümü
+    (aynı analiz anahtarı) için kuyrukta ya da çalışmakta olan bir iş
+    varsa yeni iş açılmaz, mevcut işin ID'si döner (single-flight).
+    Cache'te sonucu olan notlar için iş kuyruğa girmeden tamamlanmış
+    olarak oluşturulur. Biten işler job_ttl saniye boyunca sorgulanabilir;
+    süresi dolanlar okumalarda ve arka planda periyodik olarak silinir.
+    """
+
+    def __init__(self, workers: int, max_queue: int, job_ttl: float):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.job_ttl = job_ttl
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._inflight: Dict[Tuple[str, str, str], str] = {}
+        # Bitmiş işler bitiş sırasıyla (süre sonu, iş ID'si); TTL sabit olduğu için süre sonuna göre de sıralıdır
+        self._expiries: Deque[Tuple[float, str]] = deque()
+        self.running = 0
+        self.submitted = 0
+        self.coalesced = 0
+        self.cache_hits = 0
+        self.rejected = 0
+        self.succeeded = 0
+        self.failed = 0
+
+    async def start(self) -> None:
+        """Worker'ları başlat (uygulama açılışında çağrılır)"""
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._pruner()))
+
+    async def stop(self) -> None:
+        """
+        Worker'ları durdur (uygulama kapanışında çağrılır)
+
+        Kuyrukta bekleyen ve çalışan işler başarısız olarak işaretlenir;
+        single-flight kayıtları temizlenir, böylece yeniden başlatılan
+        kuyrukta aynı not için yeni iş açılabilir.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        for job in self._jobs.values():
+            if job["status"] in ("queued", "running"):
+                job.pop("_inflight_key", None)
+                self._finish(job, None, "AI analiz kuyruğu durduruldu")
+        self._inflight.clear()
+
+    async def submit(self, note: Dict[str, Any], user_id: str) -> Tuple[Dict[str, Any], bool]:
+        """
+        Not için analiz işi oluştur
+
+        Returns:
+            (iş, yeni iş mi); aynı sürüm için çalışan iş varsa o iş döner
+
+        Raises:
+            AIJobQueueFullError: Kuyruk max_queue'ya ulaştıysa
+        """
+        # Lifespan dışında (script, test) kullanıldığında worker'ları ilk işte başlat
+        await self.start()
+        self._prune()
+
+        analysis_key, cached = analysis_service.cached_analysis(note)
+        inflight_key = (user_id, note["id"], analysis_key)
+        job_id = self._inflight.get(inflight_key)
+        if job_id is not None:
+            self.coalesced += 1
+            return self._public(self._jobs[job_id]), False
+
+        job = {
+            "job_id": str(uuid4()),
+            "note_id": note["id"],
+            "user_id": user_id,
+            "status": "queued",
+            "result": None,
+            "error": None,
+            "created_at": datetime.utcnow(),
+            "finished_at": None
+        }
+        if cached is not None:
+            self.cache_hits += 1
+            self._finish(job, cached, None)
+            self._jobs[job["job_id"]] = job
+            return self._public(job), True
+
+        try:
+            self._queue.put_nowait((job, note))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise AIJobQueueFullError("AI analiz kuyruğu dolu")
+        self._jobs[job["job_id"]] = job
+        self._inflight[inflight_key] = job["job_id"]
+        job["_inflight_key"] = inflight_key
+        self.submitted += 1
+        return self._public(job), True
+
+    def get(self, job_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """İşi getir (sadece sahibi)"""
+        self._prune()
+        job = self._jobs.get(job_id)
+        if job is None or job["user_id"] != user_id:
+            return None
+        return self._public(job)
+
+    @staticmethod
+    def _public(job: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in job.items() if not k.startswith("_")}
+
+    async def _worker(self) -> None:
+        while True:
+            job, note = await self._queue.get()
+            job["status"] = "running"
+            self.running += 1
+            try:
+                result = await analysis_service.analyze(note, job["user_id"])
+                self._finish(job, result, None)
+            except Exception as e:
+                logging.error(f"AI analiz işi başarısız ({job['job_id']}): {e}")
+                self._finish(job, None, str(e))
+            finally:
+                self.running -= 1
+                self._inflight.pop(job.pop("_inflight_key", None), None)
+                self._queue.task_done()
+
+    async def _pruner(self) -> None:
+        """Süresi dolan bitmiş işleri (sorgulanmasalar da) düzenli olarak sil"""
+        while True:
+            await asyncio.sleep(max(0.01, min(self.job_ttl, PRUNE_INTERVAL)))
+            self._prune()
+
+    def _finish(self, job: Dict[str, Any], result: Optional[Dict[str, Any]], error: Optional[str]) -> None:
+        job["status"] = "failed" if error else "succeeded"
+        job["result"] = result
+        job["error"] = error
+        job["finished_at"] = datetime.utcnow()
+        self._expiries.append((time.monotonic() + self.job_ttl, job["job_id"]))
+        if error:
+            self.failed += 1
+        else:
+            self.succeeded += 1
+
+    def _prune(self) -> None:
+        """Saklama süresi dolan bitmiş işleri sil (sadece süresi dolanlar gezilir)"""
+        now = time.monotonic()
+        expiries = self._expiries
+        while expiries and expiries[0][0] < now:
+            self._jobs.pop(expiries.popleft()[1], None)
+
+    def stats(self) -> Dict[str, Any]:
+        self._prune()
+        return {
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "inflight": len(self._inflight),
+            "tracked_jobs": len(self._jobs),
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "cache_hits": self.cache_hits,
+            "rejected": self.rejected,
+            "succeeded": self.succeeded,
+            "failed": self.failed
+        }
+
+# Singleton instance
+ai_job_queue = AIJobQueue(
+    workers=settings.AI_JOB_WORKERS,
+    max_queue=settings.AI_JOB_MAX_QUEUE,
+    job_ttl=settings.AI_JOB_TTL
+)
@@ -0,0 +1,333 @@
+import asyncio
+import logging
+import math
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from app.cache import ai_analysis_cache
+from app.config import settings
+from app.database import db
+from app.resilience import UpstreamUnavailableError
+from app.services.gemini_service import gemini_service, AnalysisStreamParser
+
+class AIAnalysisError(Exception):
+    """Gemini analizi başarısız oldu"""
+    pass
+
+class AIUnavailableError(AIAnalysisError):
+    """Gemini geçici olarak çağrılamıyor (devre açık veya kota dolu)"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        # Retry-After başlığı için tam saniye
+        self.retry_after = max(1, math.ceil(retry_after))
+
+def note_prompt_data(note: Dict[str, Any]) -> Dict[str, Any]:
+    """Notun AI prompt'una giren alanlarını hazırla"""
+    return {
+        "title": note.get("title", "Başlık yok"),
+        "content": note.get("content", "İçerik yok"),
+        "tags": note.get("tags", []),
+        "pinned": note.get("pinned", False),
+        "start_date": note.get("start_date").isoformat() if note.get("start_date") else None,
+        "end_date": note.get("end_date").isoformat() if note.get("end_date") else None
+    }
+
+class AnalysisService:
+    """
+    Cache'li not analizi
+
+    Sonuçlar prompt girdilerinin hash'iyle (GeminiService.analysis_key)
+    önce bellekte, sonra not dokümanında aranır; ikisinde de yoksa
+    Gemini çağrılır ve sonuç her iki katmana yazılır.
+    """
+
+    def cached_analysis(self, note: Dict[str, Any], structured: Optional[bool] = None) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Notun analiz anahtarını ve varsa cache'teki sonucunu döndür
+
+        Toplu ve akış analizleri düz metin, /ai ise GEMINI_STRUCTURED_OUTPUT
+        modunda üretilir; iki modun sonuçları aynı alanları taşıdığından
+        notun güncel haliyle herhangi bir modda üretilmiş sonuç isabet sayılır.
+
+        Args:
+            structured: Sonucu üretecek yanıt modu (bkz. GeminiService.analysis_key);
+                döndürülen anahtar bu modun anahtarıdır
+        """
+        if structured is None:
+            structured = settings.GEMINI_STRUCTURED_OUTPUT
+        prompt_data = note_prompt_data(note)
+        analysis_key = gemini_service.analysis_key(prompt_data, structured)
+        other_key = gemini_service.analysis_key(prompt_data, not structured)
+        for key in (analysis_key, other_key):
+            analysis_data = ai_analysis_cache.get(key)
+            if analysis_data is not None:
+                return analysis_key, analysis_data
+        stored = note.get("ai_analysis") or {}
+        if stored.get("key") in (analysis_key, other_key):
+            analysis_data = stored["result"]
+            ai_analysis_cache.set(stored["key"], analysis_data)
+            return analysis_key, analysis_data
+        return analysis_key, None
+
+    async def analyze(self, note: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+        """
+        Notun analizini getir; cache'te yoksa Gemini ile üret
+
+        Raises:
+            AIUnavailableError: Gemini geçici olarak çağrılamıyorsa
+            AIAnalysisError: Gemini beklenen sonucu döndürmezse
+        """
+        analysis_key, analysis_data = self.cached_analysis(note)
+        if analysis_data is not None:
+            return analysis_data
+
+        ai_result = await gemini_service.generate_content(await self._prompt_data(note))
+        if not ai_result["success"]:
+            if ai_result.get("retry_after") is not None:
+                raise AIUnavailableError(ai_result["error"], ai_result["retry_after"])
+            raise AIAnalysisError(ai_result.get("error", "Bilinmeyen hata"))
+
+        analysis_data = ai_result["analysis"]
+        ai_analysis_cache.set(analysis_key, analysis_data)
+        try:
+            await db.save_ai_analysis(note["id"], user_id, analysis_key, analysis_data)
+        except Exception as e:
+            # Kalıcı kayıt başarısız olsa da analiz sonucu döndürülür
+            logging.error(f"AI analizi nota kaydedilemedi: {e}")
+        return analysis_data
+
+    async def _prompt_data(self, note: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Notun Gemini'ya gönderilecek verisini hazırla
+        
+        İçeriği AI_CHUNK_MAX_TOKENS'ı aşan notlar bölümlere ayrılır ve
+        bölümler en fazla AI_CHUNK_CONCURRENCY istekle paralel özetlenir
+        (map); içerik bu özetlerle değiştirilir ve analiz tek istekte
+        yapılır (reduce). Bölüm özetleri kendi anahtarlarıyla cache'lenir;
+        uzun notun bir bölümü düzenlendiğinde sadece o bölüm yeniden özetlenir.
+        
+        Raises:
+            AIUnavailableError: Gemini geçici olarak çağrılamıyorsa
+            AIAnalysisError: Bir bölüm özetlenemezse
+        """
+        data = note_prompt_data(note)
+        chunks = gemini_service.split_content(data["content"] or "")
+        if len(chunks) <= 1:
+            return data
+        
+        semaphore = asyncio.Semaphore(settings.AI_CHUNK_CONCURRENCY)
+        
+        async def summarize(chunk):
+            async with semaphore:
+                return await self._chunk_summary(chunk)
+        
+        tasks = [asyncio.create_task(summarize(chunk)) for chunk in chunks]
+        try:
+            summaries = await asyncio.gather(*tasks)
+        finally:
+            # Bir bölüm başarısız olursa diğer bölümlerin istekleri iptal edilir
+            for task in tasks:
+                task.cancel()
+        return {**data, "content": gemini_service.summaries_content(summaries)}
+    
+    async def _chunk_summary(self, chunk: str) -> str:
+        """Bölüm özetini cache'ten getir; yoksa Gemini ile üret"""
+        chunk_key = gemini_service.chunk_key(chunk)
+        summary = ai_analysis_cache.get(chunk_key)
+        if summary is not None:
+            return summary
+        
+        ai_result = await gemini_service.summarize_chunk(chunk)
+        if not ai_result["success"]:
+            if ai_result.get("retry_after") is not None:
+                raise AIUnavailableError(ai_result["error"], ai_result["retry_after"])
+            raise AIAnalysisError(f"Not bölümü özetlenemedi: {ai_result.get('error', 'Bilinmeyen hata')}")
+        summary = ai_result["text"]
+        ai_analysis_cache.set(chunk_key, summary)
+        return summary
+    
+    async def analyze_stream(self, note: Dict[str, Any], user_id: str) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Not analizini akış olarak üret
+
+        Yields:
+            ("delta", metin parçası), ("field", (alan, değer)) ve en sonda
+            ("result", analiz). Cache'te sonuç varsa Gemini çağrılmaz ve
+            alanlar hemen üretilir.
+
+        Raises:
+            AIUnavailableError: Gemini geçici olarak çağrılamıyorsa
+            AIAnalysisError: Gemini akışı başarısız olursa
+        """
+        # Akış her zaman düz metin prompt'uyla yapılır
+        analysis_key, analysis_data = self.cached_analysis(note, structured=False)
+        if analysis_data is None:
+            parser = AnalysisStreamParser()
+            chunks = []
+            try:
+                # Uzun notlarda önce bölüm özetleri alınır, sadece birleştirme adımı akar
+                prompt_data = await self._prompt_data(note)
+                async for text in gemini_service.stream_content(prompt_data):
+                    chunks.append(text)
+                    yield "delta", text
+                    for field in parser.feed(text):
+                        yield "field", field
+            except UpstreamUnavailableError as e:
+                raise AIUnavailableError(str(e), e.retry_after)
+            except AIAnalysisError:
+                raise
+            except Exception as e:
+                raise AIAnalysisError(f"Gemini API çağrısı başarısız: {str(e)}")
+            for field in parser.finish():
+                yield "field", field
+            if not chunks:
+                raise AIAnalysisError("Gemini'dan beklenen formatta response alınamadı")
+
+            # Son sonuç tam metin üzerinden, senkron endpoint ile aynı parser'la üretilir
+            analysis_data = gemini_service.parse_analysis_response("".join(chunks))
+            ai_analysis_cache.set(analysis_key, analysis_data)
+            try:
+                await db.save_ai_analysis(note["id"], user_id, analysis_key, analysis_data)
+            except Exception as e:
+                logging.error(f"AI analizi nota kaydedilemedi: {e}")
+        else:
+            for name in ("note_type", "importance_level", "category", "suggestions", "suggested_tags"):
+                if name in analysis_data:
+                    yield "field", (name, analysis_data[name])
+        yield "result", analysis_data
+
+    async def analyze_bulk(self, notes: List[Dict[str, Any]], user_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Birden fazla notu analiz et ve sonuçları tamamlandıkça üret
+
+        Cache'te sonucu olan notlar hemen döner. Kalan kısa notlar
+        AI_BULK_PACK_SIZE'lık gruplar halinde tek prompt'ta, uzun notlar tek
+        başına analiz edilir; aynı anda en fazla AI_BULK_CONCURRENCY Gemini
+        isteği çalışır. Sonuçlar AI_BULK_WRITE_BATCH'lik WriteBatch'lerle
+        notlara yazılır.
+
+        Yields:
+            {"note_id", "isSuccess", "errorCode", "message", "cached", "data"}
+        """
+        pending = []
+        for note in notes:
+            analysis_key, analysis_data = self.cached_analysis(note)
+            if analysis_data is not None:
+                yield _bulk_result(note, analysis_data, None, cached=True)
+            else:
+                pending.append((note, analysis_key))
+
+        semaphore = asyncio.Semaphore(settings.AI_BULK_CONCURRENCY)
+
+        async def run(group):
+            async with semaphore:
+                return await self._analyze_group(group)
+
+        tasks = [asyncio.create_task(run(group)) for group in _pack_notes(pending)]
+        to_save = []
+        try:
+            for finished in asyncio.as_completed(tasks):
+                for note, analysis_key, analysis_data, error in await finished:
+                    if analysis_data is not None:
+                        ai_analysis_cache.set(analysis_key, analysis_data)
+                        to_save.append((note["id"], analysis_key, analysis_data))
+                    yield _bulk_result(note, analysis_data, error, cached=False)
+                if len(to_save) >= settings.AI_BULK_WRITE_BATCH:
+                    await self._save_bulk(user_id, to_save)
+                    to_save = []
+        finally:
+            # İstemci bağlantıyı kapattıysa bekleyen Gemini istekleri iptal edilir
+            for task in tasks:
+                task.cancel()
+            if to_save:
+                await self._save_bulk(user_id, to_save)
+
+    async def _analyze_group(self, group: List[Tuple[Dict[str, Any], str]]) -> List[Tuple[Dict[str, Any], str, Optional[Dict[str, Any]], Optional[str]]]:
+        """
+        Bir grup notu analiz et; (not, anahtar, analiz, hata) listesi döndür
+
+        Toplu prompt düz metin formatında yanıt ister; bu yanıttan gelen
+        analizler düz metin modunun anahtarıyla döner.
+        """
+        analyses: List[Optional[Dict[str, Any]]] = [None] * len(group)
+        keys = [analysis_key for _, analysis_key in group]
+        error = None
+        try:
+            if len(group) > 1:
+                ai_result = await gemini_service.generate_bulk_content([note_prompt_data(note) for note, _ in group])
+                if ai_result["success"]:
+                    analyses = ai_result["analyses"]
+                    for index, (note, _) in enumerate(group):
+                        if analyses[index] is not None:
+                            keys[index] = gemini_service.analysis_key(note_prompt_data(note), structured=False)
+                else:
+                    error = ai_result.get("error", "Bilinmeyen hata")
+            # Tek notluk gruplar ve toplu yanıtta eksik kalan notlar tek tek analiz edilir
+            if error is None:
+                for index, (note, _) in enumerate(group):
+                    if analyses[index] is not None:
+                        continue
+                    ai_result = await gemini_service.generate_content(await self._prompt_data(note))
+                    if ai_result["success"]:
+                        analyses[index] = ai_result["analysis"]
+                    else:
+                        error = ai_result.get("error", "Bilinmeyen hata")
+        except Exception as e:
+            error = str(e)
+        return [
+            (note, keys[index], analyses[index], None if analyses[index] is not None else error or "Bilinmeyen hata")
+            for index, (note, _) in enumerate(group)
+        ]
+
+    async def _save_bulk(self, user_id: str, to_save: List[Tuple[str, str, Dict[str, Any]]]) -> None:
+        try:
+            await db.save_ai_analyses(user_id, to_save)
+        except Exception as e:
+            # Kalıcı kayıt başarısız olsa da sonuçlar bellekteki cache'te kalır
+            logging.error(f"Toplu AI analizi kaydedilemedi: {e}")
+
+def _pack_notes(pending: List[Tuple[Dict[str, Any], str]]) -> List[List[Tuple[Dict[str, Any], str]]]:
+    """
+    Notları Gemini isteklerine böl
+
+    İçeriği AI_BULK_PACK_MAX_CHARS'tan kısa notlar, toplam içerik
+    AI_BULK_PROMPT_MAX_CHARS'ı ve not sayısı AI_BULK_PACK_SIZE'ı
+    aşmayacak şekilde aynı gruba konur; uzun notlar tek başına gönderilir.
+    """
+    groups = []
+    current: List[Tuple[Dict[str, Any], str]] = []
+    current_chars = 0
+    for note, analysis_key in pending:
+        length = len(note.get("title") or "") + len(note.get("content") or "")
+        if length > settings.AI_BULK_PACK_MAX_CHARS:
+            groups.append([(note, analysis_key)])
+            continue
+        if current and (len(current) >= settings.AI_BULK_PACK_SIZE or current_chars + length > settings.AI_BULK_PROMPT_MAX_CHARS):
+            groups.append(current)
+            current, current_chars = [], 0
+        current.append((note, analysis_key))
+        current_chars += length
+    if current:
+        groups.append(current)
+    return groups
+
+def _bulk_result(note: Dict[str, Any], analysis_data: Optional[Dict[str, Any]], error: Optional[str], cached: bool) -> Dict[str, Any]:
+    if analysis_data is None:
+        return {
+            "note_id": note["id"],
+            "isSuccess": False,
+            "errorCode": "AI_ANALYSIS_ERROR",
+            "message": f"AI analizi başarısız: {error}",
+            "cached": False,
+            "data": None
+        }
+    return {
+        "note_id": note["id"],
+        "isSuccess": True,
+        "errorCode": None,
+        "message": None,
+        "cached": cached,
+        "data": analysis_data
+    }
+
+# Singleton instance
+analysis_service = AnalysisService()
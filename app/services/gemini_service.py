@@ -1,8 +1,102 @@
-import requests
+import asyncio
+import hashlib
+import httpx
 import json
 import re
-from typing import Dict, Any, List
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+# Pydantic, Python 3.12 öncesinde TypeAdapter için typing_extensions.TypedDict istiyor
+from typing_extensions import TypedDict
+from pydantic import TypeAdapter, ValidationError
 from app.config import settings
+from app.resilience import (
+    CircuitBreaker, CircuitOpenError, RateLimitExceededError, TokenBucket,
+    UpstreamUnavailableError, backoff_delay, parse_retry_after
+)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    # httpx[http2] kurulu değilse HTTP/1.1 keep-alive ile devam edilir
+    HTTP2_AVAILABLE = False
+
+# Tekrar denenen HTTP durumları: kota aşımı ve geçici sunucu hataları
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class StructuredAnalysis(TypedDict):
+    """Structured output modunda Gemini'dan istenen alanlar (AIAnalysisResponse'un raw_analysis hariç alanları)"""
+    note_type: str
+    importance_level: str
+    category: str
+    suggestions: List[str]
+    suggested_tags: List[str]
+
+# Yanıtı JSON parse + doğrulama olarak tek geçişte işleyen, bir kez oluşturulan adapter
+ANALYSIS_ADAPTER = TypeAdapter(StructuredAnalysis)
+
+def _gemini_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Pydantic JSON schema'sını Gemini responseSchema (OpenAPI alt kümesi) formatına çevir"""
+    converted: Dict[str, Any] = {"type": schema["type"].upper()}
+    if "properties" in schema:
+        converted["properties"] = {name: _gemini_schema(prop) for name, prop in schema["properties"].items()}
+        converted["propertyOrdering"] = list(schema["properties"])
+    if "items" in schema:
+        converted["items"] = _gemini_schema(schema["items"])
+    if "required" in schema:
+        converted["required"] = schema["required"]
+    return converted
+
+ANALYSIS_RESPONSE_SCHEMA = _gemini_schema(ANALYSIS_ADAPTER.json_schema())
+
+# Düz metin yanıtındaki alan satırları; "- Not Türü:", "* **Kategori:**" gibi varyasyonları da yakalar
+_ANALYSIS_LINE = re.compile(
+    r'^[ \t]*(?:[-*•][ \t]*)?(?:\*\*)?(Not Türü|Önem Seviyesi|Kategori|Öneriler|Etiket Önerileri)(?:\*\*)?[ \t]*:(?:\*\*)?[ \t]*([^\n]*)',
+    re.MULTILINE
+)
+# Öneriler bloğundaki madde satırları (*, -, • veya 1. / 1))
+_BULLET_LINE = re.compile(r'^[ \t]*(?:[*•-]|\d+[.)])[ \t]+([^\n]+)', re.MULTILINE)
+
+# Structured yanıtı saran ```json ... ``` işaretleri
+_JSON_FENCE = re.compile(r'^\s*```(?:json)?|```\s*$')
+
+_ANALYSIS_FIELDS = {
+    "Not Türü": "note_type",
+    "Önem Seviyesi": "importance_level",
+    "Kategori": "category",
+    "Öneriler": "suggestions",
+    "Etiket Önerileri": "suggested_tags"
+}
+
+def _split_suggestions(text: str) -> List[str]:
+    """Öneriler bloğunu maddelere ayır; madde işareti yoksa satır içi metni tek öneri say"""
+    suggestions = [item.strip() for item in _BULLET_LINE.findall(text) if item.strip()]
+    if not suggestions and text.strip():
+        suggestions = [text.strip().splitlines()[0].strip()]
+    return suggestions
+
+# Token sayısı countTokens çağrısı yapılmadan karakter sayısından kabaca tahmin edilir
+_CHARS_PER_TOKEN = 3
+# Paragraf hash'i bu sayıya bölünebiliyorsa bölüm orada biter (içeriğe bağlı sınır)
+_CHUNK_BOUNDARY_MODULUS = 4
+
+def _split_paragraphs(content: str, max_chars: int) -> List[str]:
+    """İçeriği paragraflara böl; max_chars'tan uzun paragrafları satırlara, gerekirse sabit uzunlukta parçalara ayır"""
+    pieces = []
+    for paragraph in re.split(r'\n[ \t]*\n', content):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+            continue
+        for line in paragraph.splitlines():
+            line = line.strip()
+            pieces.extend(line[start:start + max_chars] for start in range(0, len(line), max_chars))
+    return pieces
+
+def _split_tags(text: str) -> List[str]:
+    """Virgülle ayrılmış etiketleri ayır"""
+    return [tag.strip().strip("#") for tag in text.strip().strip("[]").split(',') if tag.strip().strip("#")]
 
 class GeminiService:
     """Gemini AI API ile etkileşim için service sınıfı"""
@@ -10,8 +104,59 @@ class GeminiService:
     def __init__(self):
         self.api_key = settings.GEMINI_API_KEY
         self.base_url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent"
-        
-    def generate_content(self, note_data: Dict[str, Any]) -> Dict[str, Any]:
+        self.stream_url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:streamGenerateContent?alt=sse"
+        # Uygulama açılışında oluşturulan, tüm isteklerin paylaştığı bağlantı havuzu
+        self._client: Optional[httpx.AsyncClient] = None
+        # Gemini kotasına göre istemci tarafı hız sınırı ve servis sağlıksızken hızlı hata
+        self.rate_limiter = TokenBucket(settings.GEMINI_RATE_LIMIT_RPS, settings.GEMINI_RATE_LIMIT_BURST)
+        self.circuit_breaker = CircuitBreaker(settings.GEMINI_CIRCUIT_FAILURE_THRESHOLD, settings.GEMINI_CIRCUIT_RESET_TIMEOUT)
+        # Deneme sonuçlarına göre sayaçlar
+        self.counters = {
+            "success": 0,
+            "client_error": 0,
+            "throttled": 0,
+            "server_error": 0,
+            "timeout": 0,
+            "network_error": 0,
+            "retried": 0
+        }
+    
+    async def start(self) -> None:
+        """Paylaşılan async HTTP client'ı oluştur (uygulama açılışında çağrılır)"""
+        if self._client is not None:
+            return
+        self._client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(
+                connect=settings.GEMINI_CONNECT_TIMEOUT,
+                read=settings.GEMINI_READ_TIMEOUT,
+                write=settings.GEMINI_CONNECT_TIMEOUT,
+                pool=settings.GEMINI_CONNECT_TIMEOUT
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.GEMINI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.GEMINI_MAX_CONNECTIONS,
+                keepalive_expiry=settings.GEMINI_KEEPALIVE_EXPIRY
+            ),
+            headers={
+                'Content-Type': 'application/json',
+                'X-goog-api-key': self.api_key
+            }
+        )
+    
+    async def close(self) -> None:
+        """Bağlantı havuzunu kapat (uygulama kapanışında çağrılır)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            raise RuntimeError("Gemini HTTP client başlatılmadı")
+        return self._client
+    
+    async def generate_content(self, note_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Not verilerini Gemini AI'ya göndererek analiz sonucu alır
         
@@ -24,9 +169,189 @@ class GeminiService:
         if not self.api_key:
             raise ValueError("Gemini API key bulunamadı. Lütfen .env dosyasında GEMINI_API_KEY'i tanımlayın.")
         
+        # Lifespan dışında (script, test) kullanıldığında client'ı ilk çağrıda oluştur
+        await self.start()
+        
+        if settings.GEMINI_STRUCTURED_OUTPUT:
+            # JSON yanıtı responseSchema ile iste ve adapter ile doğrula
+            result = await self._generate(
+                self._create_structured_analysis_prompt(note_data),
+                generation_config={
+                    "responseMimeType": "application/json",
+                    "responseSchema": ANALYSIS_RESPONSE_SCHEMA
+                }
+            )
+            if not result["success"]:
+                return result
+            try:
+                analysis = self.parse_structured_response(result["text"])
+            except ValidationError as e:
+                return {
+                    "success": False,
+                    "error": f"Gemini yanıtı beklenen şemaya uymuyor: {e.error_count()} hata",
+                    "raw_response": result["raw_response"]
+                }
+            return {
+                "success": True,
+                "analysis": analysis,
+                "raw_response": result["raw_response"]
+            }
+        
         # Not verilerini analiz etmek için prompt hazırla
         prompt = self._create_analysis_prompt(note_data)
         
+        result = await self._generate(prompt)
+        if not result["success"]:
+            return result
+        
+        # Response'u parse et
+        return {
+            "success": True,
+            "analysis": self.parse_analysis_response(result["text"]),
+            "raw_response": result["raw_response"]
+        }
+    
+    async def stream_content(self, note_data: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        Not analizini streamGenerateContent ile parça parça alır
+        
+        Args:
+            note_data: Not verilerini içeren dictionary
+            
+        Yields:
+            Gemini'dan geldikçe yanıt metninin parçaları
+            
+        Raises:
+            httpx.HTTPError: API çağrısı başarısız olursa
+        """
+        if not self.api_key:
+            raise ValueError("Gemini API key bulunamadı. Lütfen .env dosyasında GEMINI_API_KEY'i tanımlayın.")
+        
+        await self.start()
+        
+        prompt = self._create_analysis_prompt(note_data)
+        payload = {"contents": [{"parts": [{"text": prompt}]}]}
+        
+        # Tekrar deneme sadece yanıt gövdesi akmaya başlamadan önce yapılır
+        response = await self._send(self.stream_url, payload, stream=True)
+        try:
+            response.raise_for_status()
+            # alt=sse ile her "data:" satırı bir GenerateContentResponse parçasıdır
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                chunk = json.loads(line[len("data:"):])
+                for candidate in chunk.get("candidates", [])[:1]:
+                    for part in candidate.get("content", {}).get("parts", []):
+                        if part.get("text"):
+                            yield part["text"]
+        finally:
+            await response.aclose()
+    
+    def split_content(self, content: str) -> List[str]:
+        """
+        Uzun not içeriğini en fazla AI_CHUNK_MAX_TOKENS'lık bölümlere ayırır
+        
+        Bölümler paragraf sınırlarında biter. Bir bölüm, en az çeyrek dolu
+        olduğunda son paragrafının hash'ine göre (içeriğe bağlı) kapanır;
+        böylece bir paragraf düzenlendiğinde sadece o bölüm değişir, sonraki
+        bölüm sınırları kaymaz ve onların cache'teki özetleri kullanılır.
+        
+        Returns:
+            İçerik sınırı aşmıyorsa tek elemanlı liste
+        """
+        max_chars = settings.AI_CHUNK_MAX_TOKENS * _CHARS_PER_TOKEN
+        if len(content) <= max_chars:
+            return [content]
+        
+        chunks: List[str] = []
+        current: List[str] = []
+        size = 0
+        for piece in _split_paragraphs(content, max_chars):
+            if current and size + len(piece) > max_chars:
+                chunks.append("\n\n".join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += len(piece) + 2
+            if size >= max_chars // 4 and hashlib.sha256(piece.encode()).digest()[0] % _CHUNK_BOUNDARY_MODULUS == 0:
+                chunks.append("\n\n".join(current))
+                current, size = [], 0
+        if current:
+            chunks.append("\n\n".join(current))
+        return chunks
+    
+    def chunk_key(self, chunk: str) -> str:
+        """Bölüm özetinin cache anahtarı; sadece bölüm metnine ve prompt şablonuna bağlıdır"""
+        prompt = self._create_chunk_prompt(chunk)
+        return hashlib.sha256(f"{self.base_url}\n{prompt}".encode()).hexdigest()
+    
+    async def summarize_chunk(self, chunk: str) -> Dict[str, Any]:
+        """
+        Uzun notun bir bölümünü özetler (map adımı)
+        
+        Returns:
+            success True ise text bölüm özetini içerir
+        """
+        if not self.api_key:
+            raise ValueError("Gemini API key bulunamadı. Lütfen .env dosyasında GEMINI_API_KEY'i tanımlayın.")
+        
+        await self.start()
+        return await self._generate(self._create_chunk_prompt(chunk))
+    
+    def summaries_content(self, summaries: List[str]) -> str:
+        """Bölüm özetlerini, analiz prompt'unda not içeriğinin yerine geçecek metne çevirir (reduce adımı)"""
+        sections = "\n".join(
+            f"[Bölüm {index}/{len(summaries)}]\n{summary.strip()}"
+            for index, summary in enumerate(summaries, 1)
+        )
+        return f"Uzun not; içerik bölüm bölüm özetlenmiştir.\n{sections}"
+    
+    async def generate_bulk_content(self, notes_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Birden fazla notu tek istekte analiz eder
+        
+        Args:
+            notes_data: Not verilerini içeren dictionary listesi
+            
+        Returns:
+            success True ise analyses, notes_data ile aynı sırada parse edilmiş
+            analizleri içerir; yanıtta bulunamayan veya hiçbir alan satırı
+            içermeyen (bozuk) bloklar için eleman None'dır
+        """
+        if not self.api_key:
+            raise ValueError("Gemini API key bulunamadı. Lütfen .env dosyasında GEMINI_API_KEY'i tanımlayın.")
+        
+        await self.start()
+        
+        prompt = self._create_bulk_analysis_prompt(notes_data)
+        result = await self._generate(prompt)
+        if not result["success"]:
+            return result
+        
+        # Yanıtı "=== NOT n ===" başlıklarından bölerek her notu ayrı parse et
+        sections = re.split(r'===\s*NOT\s+(\d+)\s*===', result["text"])
+        blocks = {int(number): text.strip() for number, text in zip(sections[1::2], sections[2::2])}
+        analyses = [
+            self.parse_analysis_response(blocks[index]) if _ANALYSIS_LINE.search(blocks.get(index, "")) else None
+            for index in range(1, len(notes_data) + 1)
+        ]
+        return {
+            "success": True,
+            "analyses": analyses,
+            "raw_response": result["raw_response"]
+        }
+    
+    async def _generate(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Prompt'u Gemini'ya gönderir ve yanıt metnini döndürür
+        
+        Args:
+            prompt: Gönderilecek prompt
+            generation_config: Opsiyonel generationConfig (ör. structured output)
+        
+        Returns:
+            success True ise text ve raw_response, değilse error içerir
+        """
         # Gemini API'ye gönderilecek payload
         payload = {
             "contents": [
@@ -39,21 +364,12 @@ class GeminiService:
                 }
             ]
         }
-        
-        # Headers
-        headers = {
-            'Content-Type': 'application/json',
-            'X-goog-api-key': self.api_key
-        }
+        if generation_config:
+            payload["generationConfig"] = generation_config
         
         try:
-            # API çağrısı yap
-            response = requests.post(
-                self.base_url,
-                headers=headers,
-                data=json.dumps(payload),
-                timeout=30
-            )
+            # API çağrısı yap; bağlantı havuzdan alınır, event loop bloklanmaz
+            response = await self._send(self.base_url, payload)
             
             # Response'u kontrol et
             response.raise_for_status()
@@ -67,12 +383,9 @@ class GeminiService:
                 if 'content' in candidate and 'parts' in candidate['content']:
                     parts = candidate['content']['parts']
                     if len(parts) > 0 and 'text' in parts[0]:
-                        analysis_text = parts[0]['text']
-                        # Response'u parse et
-                        parsed_analysis = self._parse_analysis_response(analysis_text)
                         return {
                             "success": True,
-                            "analysis": parsed_analysis,
+                            "text": parts[0]['text'],
                             "raw_response": result
                         }
             
@@ -82,7 +395,14 @@ class GeminiService:
                 "raw_response": result
             }
             
-        except requests.exceptions.RequestException as e:
+        except UpstreamUnavailableError as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "raw_response": None,
+                "retry_after": e.retry_after
+            }
+        except httpx.HTTPError as e:
             return {
                 "success": False,
                 "error": f"Gemini API çağrısı başarısız: {str(e)}",
@@ -101,16 +421,109 @@ class GeminiService:
                 "raw_response": None
             }
     
-    def _create_analysis_prompt(self, note_data: Dict[str, Any]) -> str:
+    async def _send(self, url: str, payload: Dict[str, Any], stream: bool = False) -> httpx.Response:
         """
-        Not verilerini analiz etmek için Gemini'ya gönderilecek prompt'u oluşturur
+        İsteği hız sınırı, tekrar deneme ve devre kesici üzerinden gönderir
+        
+        429, 5xx, zaman aşımı ve bağlantı hataları en fazla
+        GEMINI_MAX_RETRIES kez, Retry-After'a (yoksa jitter'lı üstel
+        beklemeye) uyularak tekrar denenir. Toplam bekleme
+        GEMINI_RETRY_BUDGET saniyeyi aşacaksa son yanıt/hata döndürülür.
         
         Args:
-            note_data: Not verilerini içeren dictionary
-            
+            url: İstek adresi
+            payload: JSON gövde
+            stream: True ise gövde okunmadan döner; çağıran aclose() etmelidir
+        
         Returns:
-            Hazırlanmış prompt string'i
+            Tekrar denenmeyen son HTTP yanıtı
+        
+        Raises:
+            CircuitOpenError: Devre açıksa, istek gönderilmeden
+            RateLimitExceededError: İstek hakkı GEMINI_RATE_LIMIT_MAX_WAIT içinde alınamazsa
+            httpx.TransportError: Tekrar denemeler tükendiğinde son bağlantı hatası
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.GEMINI_RETRY_BUDGET
+        content = json.dumps(payload)
+        attempt = 0
+        while True:
+            if not self.circuit_breaker.allow():
+                raise CircuitOpenError(
+                    "Gemini geçici olarak devre dışı: art arda hatalar nedeniyle istekler durduruldu",
+                    self.circuit_breaker.retry_after()
+                )
+            try:
+                if not await self.rate_limiter.acquire(max_wait=settings.GEMINI_RATE_LIMIT_MAX_WAIT):
+                    raise RateLimitExceededError("Gemini istek kotası dolu", settings.GEMINI_RATE_LIMIT_MAX_WAIT)
+                response = await self.client.send(self.client.build_request("POST", url, content=content), stream=stream)
+            except httpx.TransportError as e:
+                self.counters["timeout" if isinstance(e, httpx.TimeoutException) else "network_error"] += 1
+                self.circuit_breaker.record_failure()
+                delay = backoff_delay(attempt, settings.GEMINI_RETRY_BASE_DELAY, settings.GEMINI_RETRY_MAX_DELAY)
+                if attempt >= settings.GEMINI_MAX_RETRIES or loop.time() + delay > deadline:
+                    raise
+            except BaseException:
+                # Kota reddi veya iptal; deneme isteği sonuçlanmadı sayılır
+                self.circuit_breaker.release()
+                raise
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    # 429 dışındaki 4xx istemci hatasıdır; servis sağlığını etkilemez
+                    self.counters["success" if response.is_success else "client_error"] += 1
+                    self.circuit_breaker.record_success()
+                    self.rate_limiter.recovered()
+                    return response
+                
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if response.status_code == 429:
+                    self.counters["throttled"] += 1
+                    self.rate_limiter.throttled(retry_after)
+                else:
+                    self.counters["server_error"] += 1
+                self.circuit_breaker.record_failure()
+                delay = backoff_delay(attempt, settings.GEMINI_RETRY_BASE_DELAY, settings.GEMINI_RETRY_MAX_DELAY, retry_after)
+                if attempt >= settings.GEMINI_MAX_RETRIES or loop.time() + delay > deadline:
+                    return response
+                await response.aclose()
+            
+            attempt += 1
+            self.counters["retried"] += 1
+            await asyncio.sleep(delay)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": dict(self.counters),
+            "rate_limiter": self.rate_limiter.stats(),
+            "circuit_breaker": self.circuit_breaker.stats()
+        }
+    
+    def analysis_key(self, note_data: Dict[str, Any], structured: Optional[bool] = None) -> str:
         """
+        Analiz sonucunun cache anahtarını üret
+        
+        Anahtar, model adresi, yanıt modu ve o modda gerçekten gönderilen
+        prompt üzerinden hesaplanır; structured modda responseSchema da
+        anahtara girer. Prompt'a giren alanlardan (başlık, içerik, etiketler,
+        sabitlenme, tarihler) biri, prompt şablonu, mod veya şema değişirse
+        anahtar da değişir.
+        
+        Args:
+            structured: Yanıt modu; verilmezse GEMINI_STRUCTURED_OUTPUT
+                (generate_content'in kullandığı mod)
+        """
+        if structured is None:
+            structured = settings.GEMINI_STRUCTURED_OUTPUT
+        if structured:
+            mode = f"structured\n{json.dumps(ANALYSIS_RESPONSE_SCHEMA, sort_keys=True)}"
+            prompt = self._create_structured_analysis_prompt(note_data)
+        else:
+            mode = "text"
+            prompt = self._create_analysis_prompt(note_data)
+        return hashlib.sha256(f"{self.base_url}\n{mode}\n{prompt}".encode()).hexdigest()
+    
+    def _format_note_data(self, note_data: Dict[str, Any]) -> str:
+        """Not verilerini prompt'a eklenecek metin bloğuna çevirir"""
         # Not verilerini string'e çevir
         note_title = note_data.get('title', 'Başlık yok')
         note_content = note_data.get('content', 'İçerik yok')
@@ -134,14 +547,23 @@ class GeminiService:
         # Sabitlenme durumu
         pinned_info = "Sabitlenmiş not" if note_pinned else "Normal not"
         
+        return f"Başlık: {note_title}\nİçerik: {note_content}\n{pinned_info}\n{date_info}{tags_info}"
+    
+    def _create_analysis_prompt(self, note_data: Dict[str, Any]) -> str:
+        """
+        Not verilerini analiz etmek için Gemini'ya gönderilecek prompt'u oluşturur
+        
+        Args:
+            note_data: Not verilerini içeren dictionary
+            
+        Returns:
+            Hazırlanmış prompt string'i
+        """
         prompt = f"""
 Sen bir not analiz uzmanısın. Aşağıdaki not verilerini analiz et ve her zaman aynı formatta yanıt ver.
 
 NOT VERİLERİ:
-Başlık: {note_title}
-İçerik: {note_content}
-{pinned_info}
-{date_info}{tags_info}
+{self._format_note_data(note_data)}
 
 LÜTFEN AŞAĞIDAKİ FORMATTA YANIT VER (Her zaman aynı formatı kullan):
 
@@ -157,9 +579,111 @@ ANALİZ SONUCU:
         
         return prompt.strip()
     
-    def _parse_analysis_response(self, analysis_text: str) -> Dict[str, Any]:
+    def _create_chunk_prompt(self, chunk: str) -> str:
+        """
+        Uzun notun bir bölümünü özetlemek için prompt'u oluşturur
+        
+        Bölümün sırası ve notun diğer alanları prompt'a girmez; bölüm metni
+        değişmedikçe cache anahtarı da değişmez.
+        """
+        prompt = f"""
+Sen bir not analiz uzmanısın. Aşağıdaki metin uzun bir notun bir bölümüdür.
+Bölümü en fazla 5 kısa madde ile özetle. Görevleri, tarihleri, kişileri ve önemli kararları koru.
+Sadece maddeleri yaz, başka açıklama ekleme.
+
+BÖLÜM:
+{chunk}
+"""
+        
+        return prompt.strip()
+    
+    def _create_structured_analysis_prompt(self, note_data: Dict[str, Any]) -> str:
+        """
+        Structured output modunda gönderilecek prompt'u oluşturur
+        
+        Yanıtın biçimi responseSchema ile zorlandığı için prompt sadece
+        alanların anlamını tarif eder.
+        
+        Args:
+            note_data: Not verilerini içeren dictionary
+            
+        Returns:
+            Hazırlanmış prompt string'i
+        """
+        prompt = f"""
+Sen bir not analiz uzmanısın. Aşağıdaki not verilerini analiz et.
+
+NOT VERİLERİ:
+{self._format_note_data(note_data)}
+
+Yanıtı aşağıdaki alanlarla JSON olarak ver:
+- note_type: Notun türü (Kişisel, İş, Alışveriş, Hatırlatma, vs.)
+- importance_level: Önem seviyesi (Düşük, Orta veya Yüksek)
+- category: Notun ait olduğu kategori
+- suggestions: Not için 2-3 kısa öneri
+- suggested_tags: Mevcut etiketlere ek olarak önerilen etiketler
+
+Kısa ve öz yanıtlar ver.
+"""
+        
+        return prompt.strip()
+    
+    def parse_structured_response(self, response_text: str) -> Dict[str, Any]:
+        """
+        Structured output modundaki JSON yanıtı doğrular
+        
+        Raises:
+            ValidationError: Yanıt şemaya uymuyorsa
+        """
+        # Bazı yanıtlar JSON'u markdown kod bloğuna sarar
+        json_text = _JSON_FENCE.sub("", response_text).strip()
+        analysis = dict(ANALYSIS_ADAPTER.validate_json(json_text))
+        analysis["raw_analysis"] = response_text
+        return analysis
+    
+    def _create_bulk_analysis_prompt(self, notes_data: List[Dict[str, Any]]) -> str:
+        """
+        Birden fazla notu tek istekte analiz etmek için numaralı prompt oluşturur
+        
+        Args:
+            notes_data: Not verilerini içeren dictionary listesi
+            
+        Returns:
+            Hazırlanmış prompt string'i
+        """
+        notes_info = "\n".join(
+            f"=== NOT {index} ===\n{self._format_note_data(note_data)}"
+            for index, note_data in enumerate(notes_data, start=1)
+        )
+        
+        prompt = f"""
+Sen bir not analiz uzmanısın. Aşağıdaki {len(notes_data)} notu birbirinden bağımsız olarak analiz et ve her not için aynı formatta yanıt ver.
+
+NOT VERİLERİ:
+{notes_info}
+
+LÜTFEN HER NOT İÇİN, NOT NUMARASIYLA BAŞLAYARAK AŞAĞIDAKİ FORMATTA YANIT VER (Hiçbir notu atlama):
+
+=== NOT [numara] ===
+ANALİZ SONUCU:
+- Not Türü: [Notun türünü belirle: Kişisel, İş, Alışveriş, Hatırlatma, vs.]
+- Önem Seviyesi: [Düşük/Orta/Yüksek]
+- Kategori: [Notun hangi kategoriye ait olduğunu belirle]
+- Öneriler: [Not için 2-3 kısa öneri]
+- Etiket Önerileri: [Mevcut etiketlere ek olarak önerilen etiketler]
+
+ÖNEMLİ: Her zaman yukarıdaki formatı kullan ve kısa, öz yanıtlar ver. Analiz sonucunu JSON formatında değil, düz metin olarak ver.
+"""
+        
+        return prompt.strip()
+    
+    def parse_analysis_response(self, analysis_text: str) -> Dict[str, Any]:
         """
-        Gemini AI'dan gelen analiz response'unu parse eder
+        Gemini AI'dan gelen düz metin analiz response'unu parse eder
+        
+        Metin tek bir derlenmiş regex ile bir kez taranır; her alan ilk
+        geçtiği satırdan okunur. Öneriler bloğu bir sonraki alan satırına
+        kadar sürer.
         
         Args:
             analysis_text: Gemini'dan gelen ham analiz metni
@@ -178,35 +702,22 @@ ANALİZ SONUCU:
                 "raw_analysis": analysis_text
             }
             
-            # Not Türü
-            note_type_match = re.search(r'- Not Türü:\s*(.+)', analysis_text)
-            if note_type_match:
-                parsed_data["note_type"] = note_type_match.group(1).strip()
-            
-            # Önem Seviyesi
-            importance_match = re.search(r'- Önem Seviyesi:\s*(.+)', analysis_text)
-            if importance_match:
-                parsed_data["importance_level"] = importance_match.group(1).strip()
-            
-            # Kategori
-            category_match = re.search(r'- Kategori:\s*(.+)', analysis_text)
-            if category_match:
-                parsed_data["category"] = category_match.group(1).strip()
-            
-            # Öneriler
-            suggestions_match = re.search(r'- Öneriler:\s*(.+?)(?=- Etiket Önerileri:|$)', analysis_text, re.DOTALL)
-            if suggestions_match:
-                suggestions_text = suggestions_match.group(1).strip()
-                # Bullet point'leri ayır
-                suggestions = re.findall(r'\*\s*(.+)', suggestions_text)
-                parsed_data["suggestions"] = [s.strip() for s in suggestions if s.strip()]
-            
-            # Etiket Önerileri
-            tags_match = re.search(r'- Etiket Önerileri:\s*(.+)', analysis_text)
-            if tags_match:
-                tags_text = tags_match.group(1).strip()
-                # Virgülle ayrılmış etiketleri ayır
-                parsed_data["suggested_tags"] = [tag.strip() for tag in tags_text.split(',') if tag.strip()]
+            matches = list(_ANALYSIS_LINE.finditer(analysis_text))
+            seen = set()
+            for index, match in enumerate(matches):
+                field = _ANALYSIS_FIELDS[match.group(1)]
+                if field in seen:
+                    continue
+                seen.add(field)
+                if field == "suggestions":
+                    end = matches[index + 1].start() if index + 1 < len(matches) else len(analysis_text)
+                    parsed_data["suggestions"] = _split_suggestions(analysis_text[match.start(2):end])
+                elif field == "suggested_tags":
+                    parsed_data["suggested_tags"] = _split_tags(match.group(2))
+                else:
+                    value = match.group(2).strip("* \t\r")
+                    if value:
+                        parsed_data[field] = value
             
             return parsed_data
             
@@ -222,5 +733,71 @@ ANALİZ SONUCU:
                 "parse_error": str(e)
             }
 
+class AnalysisStreamParser:
+    """
+    Akış halinde gelen analiz metnini satır satır parse eder
+    
+    feed() her parçada tamamlanan satırlardan çıkan alanları döndürür;
+    satırlar parse_analysis_response ile aynı regex ve kurallarla okunur.
+    Öneriler bloğu bir sonraki alan satırı geldiğinde veya akış bittiğinde
+    tamamlanır. Her alan yalnızca ilk geçtiği yerde üretilir.
+    """
+    
+    def __init__(self):
+        self._buffer = ""
+        self._suggestions: Optional[List[str]] = None
+        self._emitted = set()
+    
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """Yeni metin parçasını ekle, tamamlanan alanları döndür"""
+        self._buffer += text
+        *lines, self._buffer = self._buffer.split("\n")
+        fields = []
+        for line in lines:
+            fields.extend(self._parse_line(line))
+        return fields
+    
+    def finish(self) -> List[Tuple[str, Any]]:
+        """Akış bitti; kalan satırı ve açık öneriler bloğunu tamamla"""
+        fields = self._parse_line(self._buffer)
+        self._buffer = ""
+        if self._suggestions is not None:
+            fields.extend(self._close_suggestions())
+        return fields
+    
+    def _parse_line(self, line: str) -> List[Tuple[str, Any]]:
+        fields = []
+        match = _ANALYSIS_LINE.match(line)
+        if self._suggestions is not None:
+            if match is None:
+                self._suggestions.append(line)
+                return fields
+            fields.extend(self._close_suggestions())
+        if match is None:
+            return fields
+        
+        field = _ANALYSIS_FIELDS[match.group(1)]
+        if field in self._emitted:
+            return fields
+        if field == "suggestions":
+            self._emitted.add(field)
+            self._suggestions = [match.group(2)]
+        elif field == "suggested_tags":
+            fields.append(self._emit(field, _split_tags(match.group(2))))
+        else:
+            value = match.group(2).strip("* \t\r")
+            if value:
+                fields.append(self._emit(field, value))
+        return fields
+    
+    def _close_suggestions(self) -> List[Tuple[str, Any]]:
+        suggestions = _split_suggestions("\n".join(self._suggestions))
+        self._suggestions = None
+        return [("suggestions", suggestions)]
+    
+    def _emit(self, name: str, value: Any) -> Tuple[str, Any]:
+        self._emitted.add(name)
+        return name, value
+
 # Singleton instance
 gemini_service = GeminiService()
@@ -0,0 +1,321 @@
+import asyncio
+import heapq
+import logging
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, AsyncIterable, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from app.config import settings
+from app.intervals import timestamp
+
+# Hatırlatma türleri
+REMINDER_START = "start"
+REMINDER_DUE_SOON = "due_soon"
+
+# Hatırlatma anahtarı: (kullanıcı, not, tür)
+ReminderKey = Tuple[str, str, str]
+ReminderSink = Callable[[Dict[str, Any]], Awaitable[None]]
+# (user_id, note_id) -> notun Firestore'daki güncel hali; not yoksa veya başkasına aitse None
+ReminderVerifier = Callable[[str, str], Awaitable[Optional[dict]]]
+
+# Geçersizleşen heap kayıtları bu sayının ve canlı kayıt sayısının üzerine çıkınca heap sıkıştırılır
+COMPACT_MIN_STALE = 1024
+
+class QueueReminderSink:
+    """
+    Tetiklenen hatırlatmaları sınırlı bir asyncio.Queue'ya koyan sink
+
+    Push bildirim servisinin yerel karşılığıdır; kuyruk doluysa
+    hatırlatma düşürülür ve sayılır.
+    """
+
+    def __init__(self, max_queue: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.delivered = 0
+        self.dropped = 0
+
+    async def __call__(self, reminder: Dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(reminder)
+            self.delivered += 1
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self.queue.qsize(),
+            "max_queue": self.queue.maxsize,
+            "delivered": self.delivered,
+            "dropped": self.dropped
+        }
+
+class ReminderScheduler:
+    """
+    Not tarihleri için process içi hatırlatma zamanlayıcısı
+
+    Her not için start_date geldiğinde "start", end_date'ten
+    due_soon_lead saniye önce "due_soon" hatırlatması tetiklenir.
+    Bekleyen hatırlatmalar (zaman, sıra, anahtar) kayıtlarından oluşan bir
+    min-heap'te, anahtarın geçerli sırası bir dict'te tutulur; hatırlatma
+    başına bellek sabittir. Not değiştiğinde eski kayıt heap'ten
+    silinmez, sırası geçersiz sayılır (lazy deletion); geçersiz kayıtlar
+    canlılardan çok olunca heap yeniden kurulur.
+
+    Yaklaşan hatırlatmalar açılışta ve periyodik olarak Firestore'dan
+    yüklenir, arada Database'in yazma yollarından güncel tutulur. Tek bir
+    worker sıradaki hatırlatmanın zamanına kadar uyur; daha erken bir
+    hatırlatma eklenince uyandırılır.
+
+    Zamanlayıcının tek sahibi olmalıdır: birden fazla instance'ta sadece
+    biri enabled=True ile çalışır, diğerlerinde yazma yolları no-op'tur.
+    Başka instance'lardaki yazmalar sahibin bellekteki planına yansımaz;
+    bu yüzden verify verilmişse her hatırlatma tetiklenmeden önce not
+    Firestore'dan okunur, silinmiş veya tarihi değişmiş notun hatırlatması
+    gönderilmez (tarih değiştiyse yeniden planlanır).
+    """
+
+    def __init__(
+        self,
+        due_soon_lead: float,
+        sink: ReminderSink,
+        enabled: bool = True,
+        verify: Optional[ReminderVerifier] = None
+    ):
+        self.due_soon_lead = due_soon_lead
+        self.sink = sink
+        self.enabled = enabled
+        self.verify = verify
+        self._heap: List[Tuple[float, int, ReminderKey]] = []
+        self._pending: Dict[ReminderKey, int] = {}
+        self._seq = 0
+        self._stale = 0
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        # Yükleme sürerken yazma yollarından gelen notlar; yüklemedeki eski sürümleri bunları ezmez
+        self._loading = False
+        self._touched: Set[Tuple[str, str]] = set()
+        self.fired = 0
+        self.failed = 0
+        self.skipped = 0
+        self.compactions = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def start(self) -> None:
+        """Worker'ı başlat (uygulama açılışında çağrılır)"""
+        if self._task is not None or not self.enabled:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._worker())
+
+    async def stop(self) -> None:
+        """Worker'ı durdur (uygulama kapanışında çağrılır)"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self._wakeup = None
+
+    async def load(self, notes: AsyncIterable[dict]) -> int:
+        """
+        Yaklaşan hatırlatmaları toplu yükle
+
+        Zamanı geçmiş hatırlatmalar atlanır (önceki process'te tetiklenmiş
+        olabilirler). Yükleme sırasında yazma yolundan güncellenen notların
+        yüklemedeki sürümleri yok sayılır. Periyodik yeniden yüklemede zaten
+        planlı hatırlatmalar aynı zamanla yeniden planlanır; tekrar tetiklenmez.
+
+        Returns:
+            Yüklenen not sayısı
+        """
+        if not self.enabled:
+            return 0
+        self._loading = True
+        count = 0
+        try:
+            async for note in notes:
+                if (note.get("user_id"), note.get("id")) in self._touched:
+                    continue
+                self._schedule_note(note["user_id"], note, catch_up=False)
+                count += 1
+        finally:
+            self._loading = False
+            self._touched = set()
+        return count
+
+    def upsert(self, user_id: str, note: dict) -> None:
+        """Yazılan notun hatırlatmalarını yeniden planla; silinmişse iptal et"""
+        if not self.enabled:
+            return
+        if self._loading:
+            self._touched.add((user_id, note["id"]))
+        self._schedule_note(user_id, note, catch_up=True)
+
+    def cancel(self, user_id: str, note_id: str) -> None:
+        """Kalıcı olarak silinen notun hatırlatmalarını iptal et"""
+        if not self.enabled:
+            return
+        if self._loading:
+            self._touched.add((user_id, note_id))
+        for kind in (REMINDER_START, REMINDER_DUE_SOON):
+            self._unschedule((user_id, note_id, kind))
+
+    def _schedule_note(self, user_id: str, note: dict, catch_up: bool) -> None:
+        note_id = note["id"]
+        if note.get("deleted", False):
+            self.cancel(user_id, note_id)
+            return
+
+        now = time.time()
+        start_at = timestamp(note.get("start_date"))
+        end_at = timestamp(note.get("end_date"))
+        due_at = end_at - self.due_soon_lead if end_at is not None else None
+        if catch_up and due_at is not None and due_at < now < end_at:
+            # Bitişe lead süresinden az kalmış yeni/güncellenen not hemen hatırlatılır
+            due_at = now
+
+        user_id, note_id = sys.intern(user_id), sys.intern(note_id)
+        for kind, fire_at in ((REMINDER_START, start_at), (REMINDER_DUE_SOON, due_at)):
+            key = (user_id, note_id, kind)
+            if fire_at is None or fire_at < now:
+                self._unschedule(key)
+            else:
+                self._schedule(key, fire_at)
+
+    def _schedule(self, key: ReminderKey, fire_at: float) -> None:
+        if key in self._pending:
+            self._stale += 1
+        self._seq += 1
+        self._pending[key] = self._seq
+        heapq.heappush(self._heap, (fire_at, self._seq, key))
+        if self._wakeup is not None and self._heap[0][1] == self._seq:
+            # Yeni kayıt en erken hatırlatma oldu; worker'ın uyku süresi değişti
+            self._wakeup.set()
+        self._maybe_compact()
+
+    def _unschedule(self, key: ReminderKey) -> None:
+        if self._pending.pop(key, None) is not None:
+            self._stale += 1
+            self._maybe_compact()
+
+    def _maybe_compact(self) -> None:
+        if self._stale > max(COMPACT_MIN_STALE, len(self._pending)):
+            pending = self._pending
+            self._heap = [entry for entry in self._heap if pending.get(entry[2]) == entry[1]]
+            heapq.heapify(self._heap)
+            self._stale = 0
+            self.compactions += 1
+
+    def _pop_due(self, now: float) -> List[Tuple[float, ReminderKey]]:
+        """Zamanı gelen geçerli hatırlatmaları heap'ten çıkar"""
+        heap, pending = self._heap, self._pending
+        due = []
+        while heap and heap[0][0] <= now:
+            fire_at, seq, key = heapq.heappop(heap)
+            if pending.get(key) != seq:
+                self._stale -= 1
+                continue
+            del pending[key]
+            due.append((fire_at, key))
+        return due
+
+    async def _still_due(self, user_id: str, note_id: str, kind: str, fire_at: float) -> bool:
+        """
+        Hatırlatmanın not Firestore'daki haliyle hâlâ geçerli olup olmadığını kontrol et
+
+        Not silinmişse hatırlatmaları iptal edilir; ilgili tarih değişmişse
+        not güncel haliyle yeniden planlanır. Doğrulama yapılamazsa
+        hatırlatma gönderilir (kaçırmak, bayat göndermekten daha kötüdür).
+        """
+        if self.verify is None:
+            return True
+        try:
+            note = await self.verify(user_id, note_id)
+        except Exception as e:
+            logging.error(f"Hatırlatma doğrulanamadı ({note_id}, {kind}): {e}")
+            return True
+        if note is None or note.get("deleted", False):
+            self.cancel(user_id, note_id)
+            return False
+        if kind == REMINDER_START:
+            start_at = timestamp(note.get("start_date"))
+            valid = start_at is not None and abs(start_at - fire_at) < 1
+        else:
+            # Yakalama (catch-up) hatırlatması lead süresi içinde herhangi bir anda tetiklenmiş olabilir
+            end_at = timestamp(note.get("end_date"))
+            valid = end_at is not None and end_at - self.due_soon_lead - 1 < fire_at <= end_at
+        if not valid:
+            self._schedule_note(user_id, note, catch_up=False)
+        return valid
+
+    async def fire_due(self, now: Optional[float] = None) -> int:
+        """
+        Zamanı gelen hatırlatmaları (doğrulandıktan sonra) sink'e gönder
+
+        Returns:
+            Tetiklenen hatırlatma sayısı
+        """
+        due = self._pop_due(time.time() if now is None else now)
+        fired = 0
+        for fire_at, (user_id, note_id, kind) in due:
+            if not await self._still_due(user_id, note_id, kind, fire_at):
+                self.skipped += 1
+                continue
+            fired += 1
+            reminder = {
+                "user_id": user_id,
+                "note_id": note_id,
+                "kind": kind,
+                "fire_at": datetime.fromtimestamp(fire_at, timezone.utc)
+            }
+            try:
+                await self.sink(reminder)
+                self.fired += 1
+            except Exception as e:
+                self.failed += 1
+                logging.error(f"Hatırlatma gönderilemedi ({note_id}, {kind}): {e}")
+        return fired
+
+    def _next_delay(self) -> Optional[float]:
+        """Sıradaki geçerli hatırlatmaya kalan süre; bekleyen yoksa None"""
+        heap, pending = self._heap, self._pending
+        while heap and pending.get(heap[0][2]) != heap[0][1]:
+            heapq.heappop(heap)
+            self._stale -= 1
+        if not heap:
+            return None
+        return max(0.0, heap[0][0] - time.time())
+
+    async def _worker(self) -> None:
+        while True:
+            self._wakeup.clear()
+            delay = self._next_delay()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            await self.fire_due()
+
+    def stats(self) -> Dict[str, Any]:
+        delay = self._next_delay()
+        return {
+            "enabled": self.enabled,
+            "pending": len(self._pending),
+            "heap_size": len(self._heap),
+            "next_in_seconds": round(delay, 3) if delay is not None else None,
+            "fired": self.fired,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "compactions": self.compactions,
+            "sink": self.sink.stats() if hasattr(self.sink, "stats") else None
+        }
+
+# Singleton instance
+reminder_sink = QueueReminderSink(max_queue=settings.REMINDER_SINK_MAX_QUEUE)
+reminder_scheduler = ReminderScheduler(
+    due_soon_lead=settings.REMINDER_DUE_SOON_LEAD,
+    sink=reminder_sink,
+    enabled=settings.REMINDER_SCHEDULER_ENABLED
+)
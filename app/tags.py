@@ -0,0 +1,81 @@
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.text import fold
+
+class _TrieNode:
+    __slots__ = ("children", "tags")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        # Bu düğümde biten etiketlerin yazıldığı halleri ve not sayıları
+        self.tags: Dict[str, int] = {}
+
+class TagIndex:
+    """
+    Tek kullanıcının etiket sayaçları ve otomatik tamamlama trie'si
+
+    Her etiket için kaç notta geçtiği tutulur; sayaçlar not eklenip
+    çıkarıldıkça artımlı güncellenir. Trie, etiketlerin Türkçe küçük harfe
+    katlanmış hali üzerine kuruludur; önek araması büyük/küçük harf
+    duyarsızdır, sonuçlar etiketin yazıldığı haliyle döner.
+    """
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {}
+        self._root = _TrieNode()
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def add(self, tags: Iterable[str]) -> None:
+        """Bir notun etiketlerini say"""
+        for tag in set(tags):
+            count = self.counts.get(tag, 0) + 1
+            self.counts[tag] = count
+            node = self._root
+            for char in fold(tag):
+                node = node.children.setdefault(char, _TrieNode())
+            node.tags[tag] = count
+
+    def remove(self, tags: Iterable[str]) -> None:
+        """Bir notun etiketlerini sayaçlardan düş"""
+        for tag in set(tags):
+            count = self.counts.get(tag, 0) - 1
+            if count < 0:
+                continue
+            path = [self._root]
+            for char in fold(tag):
+                path.append(path[-1].children[char])
+            if count:
+                self.counts[tag] = count
+                path[-1].tags[tag] = count
+                continue
+            del self.counts[tag]
+            del path[-1].tags[tag]
+            # Boşalan dalları buda
+            for depth in range(len(path) - 1, 0, -1):
+                node = path[depth]
+                if node.tags or node.children:
+                    break
+                del path[depth - 1].children[fold(tag)[depth - 1]]
+
+    def facets(self, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Etiketleri not sayısına göre azalan sırada döndür"""
+        items = sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))
+        return items[:limit] if limit else items
+
+    def complete(self, prefix: str, limit: int) -> List[Tuple[str, int]]:
+        """Öneki taşıyan etiketleri not sayısına göre azalan sırada döndür"""
+        node = self._root
+        for char in fold(prefix):
+            node = node.children.get(char)
+            if node is None:
+                return []
+
+        matches: List[Tuple[str, int]] = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            matches.extend(current.tags.items())
+            stack.extend(current.children.values())
+        return heapq.nsmallest(limit, matches, key=lambda item: (-item[1], item[0]))
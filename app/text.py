@@ -0,0 +1,15 @@
+import re
+import unicodedata
+from typing import List
+
+# Türkçe büyük/küçük harf eşlemesi: I -> ı, İ -> i; düzeltme işaretleri düşürülür
+_TURKISH_FOLD = str.maketrans({"I": "ı", "İ": "i", "â": "a", "Â": "a", "î": "i", "Î": "i", "û": "u", "Û": "u"})
+_TOKEN = re.compile(r"\w+")
+
+def fold(text: str) -> str:
+    """Metni Türkçe kurallarına göre küçük harfe çevir"""
+    return unicodedata.normalize("NFC", text).translate(_TURKISH_FOLD).lower()
+
+def tokenize(text: str) -> List[str]:
+    """Metni küçük harfli kelime token'larına ayır"""
+    return _TOKEN.findall(fold(text))
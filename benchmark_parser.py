@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Gemini Analiz Parser Benchmark'ı
+Kayıtlı yanıt corpus'u üzerinde eski çok geçişli regex parser'ını,
+yeni tek geçişli parser'ı ve structured output doğrulamasını karşılaştırır.
+"""
+
+import json
+import re
+import time
+from pathlib import Path
+
+from app.services.gemini_service import gemini_service
+
+ROUNDS = 2000
+CORPUS_PATH = Path(__file__).parent / "test_data" / "gemini_analysis_corpus.json"
+
+def legacy_parse(analysis_text: str) -> dict:
+    """Eski parser: her alan için ayrı, derlenmemiş re.search geçişi"""
+    parsed_data = {
+        "note_type": "Belirsiz",
+        "importance_level": "Orta",
+        "category": "Genel",
+        "suggestions": [],
+        "suggested_tags": [],
+        "raw_analysis": analysis_text
+    }
+    note_type_match = re.search(r'- Not Türü:\s*(.+)', analysis_text)
+    if note_type_match:
+        parsed_data["note_type"] = note_type_match.group(1).strip()
+    importance_match = re.search(r'- Önem Seviyesi:\s*(.+)', analysis_text)
+    if importance_match:
+        parsed_data["importance_level"] = importance_match.group(1).strip()
+    category_match = re.search(r'- Kategori:\s*(.+)', analysis_text)
+    if category_match:
+        parsed_data["category"] = category_match.group(1).strip()
+    suggestions_match = re.search(r'- Öneriler:\s*(.+?)(?=- Etiket Önerileri:|$)', analysis_text, re.DOTALL)
+    if suggestions_match:
+        suggestions = re.findall(r'\*\s*(.+)', suggestions_match.group(1).strip())
+        parsed_data["suggestions"] = [s.strip() for s in suggestions if s.strip()]
+    tags_match = re.search(r'- Etiket Önerileri:\s*(.+)', analysis_text)
+    if tags_match:
+        parsed_data["suggested_tags"] = [tag.strip() for tag in tags_match.group(1).strip().split(',') if tag.strip()]
+    return parsed_data
+
+def accuracy(parse, cases) -> int:
+    """Beklenen alanlarla birebir eşleşen yanıt sayısı"""
+    correct = 0
+    for case in cases:
+        parsed = parse(case["response"])
+        parsed.pop("raw_analysis", None)
+        correct += parsed == case["expected"]
+    return correct
+
+def measure(parse, responses) -> float:
+    """Yanıt başına ortalama süreyi mikro saniye olarak döndür"""
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for response in responses:
+            parse(response)
+    return (time.perf_counter() - start) / (ROUNDS * len(responses)) * 1e6
+
+def main():
+    """Ana benchmark fonksiyonu"""
+    print("🚀 Gemini Analiz Parser Benchmark'ı")
+    print("=" * 60)
+
+    corpus = json.loads(CORPUS_PATH.read_text(encoding="utf-8"))
+    text_cases = corpus["text"]
+    structured_cases = [case for case in corpus["structured"] if case["expected"] is not None]
+
+    print(f"\n📋 Düz metin corpus'u ({len(text_cases)} yanıt)")
+    print(f"   Eski parser : {measure(legacy_parse, [c['response'] for c in text_cases]):7.2f} µs/yanıt, "
+          f"{accuracy(legacy_parse, text_cases)}/{len(text_cases)} doğru")
+    print(f"   Yeni parser : {measure(gemini_service.parse_analysis_response, [c['response'] for c in text_cases]):7.2f} µs/yanıt, "
+          f"{accuracy(gemini_service.parse_analysis_response, text_cases)}/{len(text_cases)} doğru")
+
+    print(f"\n📋 Structured output corpus'u ({len(structured_cases)} yanıt)")
+    print(f"   TypeAdapter : {measure(gemini_service.parse_structured_response, [c['response'] for c in structured_cases]):7.2f} µs/yanıt, "
+          f"{accuracy(gemini_service.parse_structured_response, structured_cases)}/{len(structured_cases)} doğru")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Hatırlatma Zamanlayıcısı Benchmark'ı
+Bir milyon bekleyen hatırlatmayla yükleme süresini, hatırlatma başına
+belleği, not güncelleme/iptal maliyetini ve tetikleme hızını ölçer.
+"""
+
+import asyncio
+import gc
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from app.services.reminder_scheduler import ReminderScheduler, QueueReminderSink
+
+NOTES = 500_000  # Her notun start ve due_soon hatırlatması: 1M bekleyen hatırlatma
+USERS = 10_000
+UPDATES = 100_000
+MEMORY_SAMPLE = 200_000
+
+def make_notes(count: int):
+    """Önümüzdeki 30 güne yayılmış start_date/end_date'li notlar üret"""
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    users = [str(uuid4()) for _ in range(USERS)]
+    for _ in range(count):
+        start = now + timedelta(seconds=rng.uniform(3600, 30 * 86400))
+        yield {
+            "id": str(uuid4()),
+            "user_id": rng.choice(users),
+            "start_date": start,
+            "end_date": start + timedelta(hours=rng.uniform(1, 48)),
+            "deleted": False
+        }
+
+async def notes_stream(notes):
+    for note in notes:
+        yield note
+
+async def run():
+    sink = QueueReminderSink(max_queue=2 * NOTES)
+    scheduler = ReminderScheduler(due_soon_lead=3600, sink=sink)
+    notes = list(make_notes(NOTES))
+    gc.collect()
+
+    start = time.perf_counter()
+    await scheduler.load(notes_stream(notes))
+    load = time.perf_counter() - start
+    pending = len(scheduler)
+
+    print(f"\n📋 {pending:,} bekleyen hatırlatma ({NOTES:,} not, {USERS:,} kullanıcı)")
+    print(f"   Yükleme             : {load * 1000:8.1f} ms ({load / pending * 1e6:.2f} µs/hatırlatma)")
+
+    # tracemalloc yüklemeyi yavaşlattığı için bellek ayrı bir örneklemle ölçülür
+    for count in (MEMORY_SAMPLE // 10, MEMORY_SAMPLE):
+        sample_scheduler = ReminderScheduler(due_soon_lead=3600, sink=sink)
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        await sample_scheduler.load(notes_stream(notes[:count]))
+        memory = tracemalloc.get_traced_memory()[0] - baseline
+        tracemalloc.stop()
+        print(f"   Bellek ({len(sample_scheduler):>9,})  : {memory / 2**20:8.1f} MiB ({memory / len(sample_scheduler):.0f} byte/hatırlatma)")
+        del sample_scheduler
+
+    rng = random.Random(7)
+    sample = rng.sample(notes, UPDATES)
+    start = time.perf_counter()
+    for note in sample:
+        scheduler.upsert(note["user_id"], {**note, "start_date": note["start_date"] + timedelta(minutes=30)})
+    update = (time.perf_counter() - start) / UPDATES * 1e6
+    print(f"   Not güncelleme      : {update:8.2f} µs/not (heap: {len(scheduler._heap):,}, sıkıştırma: {scheduler.compactions})")
+
+    start = time.perf_counter()
+    for note in sample[:UPDATES // 2]:
+        scheduler.cancel(note["user_id"], note["id"])
+    cancel = (time.perf_counter() - start) / (UPDATES // 2) * 1e6
+    print(f"   İptal               : {cancel:8.2f} µs/not")
+
+    start = time.perf_counter()
+    delay = scheduler._next_delay()
+    peek = (time.perf_counter() - start) * 1e6
+    print(f"   Sıradaki hatırlatma : {peek:8.2f} µs ({delay:.0f} sn sonra)")
+
+    # Bir günlük hatırlatmaları tek seferde tetikle
+    start = time.perf_counter()
+    fired = await scheduler.fire_due(time.time() + 86400)
+    elapsed = time.perf_counter() - start
+    print(f"   Tetikleme           : {elapsed / max(fired, 1) * 1e6:8.2f} µs/hatırlatma ({fired:,} hatırlatma)")
+
+def main():
+    """Ana benchmark fonksiyonu"""
+    print("🚀 Hatırlatma Zamanlayıcısı Benchmark'ı")
+    print("=" * 60)
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tam Metin Arama Benchmark'ı
+Kullanıcı başına ters indeksin yüklenme süresini, artımlı güncelleme
+maliyetini ve sorgu gecikmesini (BM25 + önek genişletme) ölçer.
+"""
+
+import random
+import time
+from datetime import datetime
+from typing import List
+from uuid import uuid4
+
+from app.search import UserSearchIndex
+
+ROUNDS = 1000
+VOCABULARY_SIZE = 20000
+WORDS = (
+    "toplantı proje bütçe sprint market alışveriş süt ekmek yumurta tatil deniz otel bilet "
+    "rapor sunum müşteri fatura ödeme kira doktor randevu ilaç spor koşu kitap film dizi "
+    "doğum günü hediye araba servis sigorta vergi banka kredi kart okul ödev sınav ders "
+    "İstanbul Ankara İzmir ışık ılık çiçek öğrenci ürün şirket çalışma görev plan hedef"
+).split()
+SUFFIXES = ("", "", "", "da", "dan", "ı", "ya", "lar", "ları", "nın")
+QUERIES = ["toplantı", "market süt", "İSTANBUL", "proje bütçe raporu", "doktor randevusu", "yok_böyle_bir_kelime"]
+
+def make_notes(count: int, words_per_note: int) -> List[dict]:
+    """Zipf dağılımlı kelimelerden not dict'leri üret (gerçek metinlerdeki gibi az sayıda sık, çok sayıda seyrek kelime)"""
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    filler = [f"kelime{i}" for i in range(VOCABULARY_SIZE)]
+    vocabulary = filler[:50] + WORDS + filler[50:]
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+
+    def text(length):
+        return " ".join(word + rng.choice(SUFFIXES) for word in rng.choices(vocabulary, weights, k=length))
+
+    return [
+        {
+            "id": str(uuid4()),
+            "title": text(4),
+            "content": text(words_per_note),
+            "snippet": None,
+            "tags": [rng.choice(WORDS) for _ in range(2)],
+            "pinned": False,
+            "deleted": False,
+            "created_at": now,
+            "updated_at": now
+        }
+        for _ in range(count)
+    ]
+
+def main():
+    """Ana benchmark fonksiyonu"""
+    print("🚀 Tam Metin Arama Benchmark'ı")
+    print("=" * 60)
+
+    for count, words in [(1000, 50), (5000, 100), (20000, 100)]:
+        notes = make_notes(count, words)
+        index = UserSearchIndex()
+
+        start = time.perf_counter()
+        for note in notes:
+            index.add(note)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for note in notes[:ROUNDS]:
+            index.add({**note, "title": note["title"] + " güncellendi"})
+        update = (time.perf_counter() - start) / min(ROUNDS, count) * 1e6
+
+        print(f"\n📋 {count} not, not başına ~{words} kelime ({len(index.postings)} terim)")
+        print(f"   İndeks yükleme      : {build * 1000:8.1f} ms")
+        print(f"   Artımlı güncelleme  : {update:8.1f} µs/not")
+        # İlk önek araması bekleyen terimleri sıralı listeye katar; ölçüme dahil edilmez
+        index.search("x" * 3, limit=1)
+        for query in QUERIES:
+            start = time.perf_counter()
+            for _ in range(ROUNDS // 10):
+                results = index.search(query, limit=20)
+            elapsed = (time.perf_counter() - start) / (ROUNDS // 10) * 1e6
+            print(f"   Sorgu {query!r:24}: {elapsed:8.1f} µs ({len(results)} sonuç)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Not Listesi Serialization Benchmark'ı
+GET /api/v1/notes/ yanıtının not başına encode maliyetini eski yol
+(FastAPI response_model doğrulaması + jsonable/json.dumps) ile yeni yol
+(model bir kez oluşturulur + pydantic-core ile tek geçişte JSON) arasında karşılaştırır.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import List
+from uuid import uuid4
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.models.base import StandardResponse, PaginatedResponse
+from app.models.note_models import NoteResponse
+from app.responses import model_response
+from app.controllers.note_controller import NoteListResponse
+
+ROUNDS = 20
+
+def make_notes(count: int, content_length: int) -> List[dict]:
+    """Firestore'dan okunmuş gibi not dict'leri üret"""
+    now = datetime.utcnow()
+    return [
+        {
+            "id": str(uuid4()),
+            "user_id": "user123",
+            "title": f"Not {i}",
+            "content": "Süt, ekmek, yumurta alınacak. " * (content_length // 30),
+            "snippet": "Süt, ekmek, yumurta alınacak.",
+            "start_date": now,
+            "end_date": now + timedelta(days=1),
+            "pinned": i % 5 == 0,
+            "deleted": False,
+            "tags": ["work", "todo"],
+            "created_at": now,
+            "updated_at": now
+        }
+        for i in range(count)
+    ]
+
+def legacy_encode(notes: List[dict], field) -> bytes:
+    """Eski yol: controller ham dict'lerle response kurar, FastAPI doğrular ve encode eder"""
+    content = StandardResponse(
+        isSuccess=True,
+        errorCode=None,
+        message="Notlar başarıyla getirildi",
+        data=notes
+    )
+    serialized = asyncio.run(serialize_response(field=field, response_content=content))
+    return JSONResponse(content=serialized).body
+
+def fast_encode(notes: List[dict]) -> bytes:
+    """Yeni yol: model bir kez oluşturulur, doğrudan JSON byte'larına çevrilir"""
+    return model_response(NoteListResponse(
+        isSuccess=True,
+        errorCode=None,
+        message="Notlar başarıyla getirildi",
+        data=notes,
+        nextPageToken=None
+    )).body
+
+def measure(func, *args) -> float:
+    """ROUNDS tekrarın en iyi süresini saniye olarak döndür"""
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    """Ana benchmark fonksiyonu"""
+    print("🚀 Not Listesi Serialization Benchmark'ı")
+    print("=" * 60)
+
+    field = create_response_field(name="response", type_=PaginatedResponse[List[NoteResponse]])
+
+    for count, content_length in [(100, 200), (1000, 200), (1000, 5000)]:
+        notes = make_notes(count, content_length)
+        legacy = measure(legacy_encode, notes, field)
+        fast = measure(fast_encode, notes)
+        print(f"\n📋 {count} not, ~{content_length} karakter içerik")
+        print(f"   Eski yol : {legacy / count * 1e6:8.2f} µs/not")
+        print(f"   Yeni yol : {fast / count * 1e6:8.2f} µs/not")
+        print(f"   Hızlanma : {legacy / fast:8.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Ortak test fixture'ları
+Bellek içi not indeksine dayanan endpoint testleri (arama, etiketler,
+takvim, yakın kopyalar) için not üreticisi ve Firestore'suz test istemcisi.
+İstemcinin indeksi yüklediği notlar test modülündeki notes fixture'ıyla verilir.
+"""
+
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.auth import get_current_user_id
+from app.database import db
+from app.main import app
+from app.search import search_index
+
+USER_ID = "user-1"
+NOW = datetime(2025, 1, 15, 10, 30)
+
+
+def _make_note(note_id, title="Not", content="", **fields):
+    return {
+        "id": note_id, "user_id": USER_ID, "title": title, "content": content, "snippet": content[:160],
+        "start_date": None, "end_date": None, "tags": [], "pinned": False, "deleted": False,
+        "created_at": NOW, "updated_at": NOW, **fields
+    }
+
+
+@pytest.fixture
+def make_note():
+    """Firestore'dan okunmuş gibi not dokümanı üreten fonksiyon"""
+    return _make_note
+
+
+@pytest.fixture
+def notes():
+    """İndeksin yükleneceği notlar; test modülleri bu fixture'ı ezer"""
+    return []
+
+
+@pytest.fixture
+def index_reads():
+    """İndeks yüklenirken yapılan delta sync okumalarının cursor'ları"""
+    return []
+
+
+@pytest.fixture
+def client(monkeypatch, notes, index_reads):
+    """Notları Firestore yerine notes fixture'ından okuyan, user-1 olarak kimliği doğrulanmış istemci"""
+    async def get_note_changes(user_id, since=None, limit=100, warm_cache=True):
+        index_reads.append(since)
+        return notes, "cursor-1", False
+
+    monkeypatch.setattr(db, "db", object())
+    monkeypatch.setattr(db, "get_note_changes", get_note_changes)
+    app.dependency_overrides[get_current_user_id] = lambda: USER_ID
+    search_index.clear()
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    search_index.clear()
@@ -0,0 +1,253 @@
+"""
+AI analiz servisi testleri
+Toplu analizde notların gruplanmasını ve eksik/bozuk yanıtlarda tek not
+analizine dönülmesini, toplu, akış ve tekil analiz yollarının cache'i
+(bellek ve not dokümanı) ortak kullandığını sahte Gemini transport'u ile doğrular.
+"""
+
+import json
+import re
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.cache import ai_analysis_cache
+from app.config import settings
+from app.database import db
+from app.resilience import TokenBucket
+from app.services.analysis_service import _pack_notes, analysis_service, note_prompt_data
+from app.services.gemini_service import gemini_service
+
+ANALYSIS_TEXT = "- Not Türü: Alışveriş\n- Önem Seviyesi: Düşük\n- Kategori: Ev\n- Öneriler:\n  * Liste yap\n- Etiket Önerileri: market"
+STRUCTURED_TEXT = json.dumps({
+    "note_type": "Alışveriş", "importance_level": "Düşük", "category": "Ev",
+    "suggestions": ["Liste yap"], "suggested_tags": ["market"]
+}, ensure_ascii=False)
+
+
+def bulk_text(numbers):
+    return "\n".join(f"=== NOT {number} ===\nANALİZ SONUCU:\n{ANALYSIS_TEXT}" for number in numbers)
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    """
+    Gemini'a giden prompt'ları kaydeden sahte transport
+
+    Toplu prompt'lara varsayılan olarak her not için bir blok döner;
+    testler bulk_reply ile yanıtı, bulk_status ve stream_status ile HTTP
+    durumunu değiştirebilir.
+    """
+    fake = SimpleNamespace(prompts=[], bulk_reply=None, bulk_status=200, stream_status=200)
+
+    def handler(request):
+        body = json.loads(request.content)
+        prompt = body["contents"][0]["parts"][0]["text"]
+        fake.prompts.append(prompt)
+        if "streamGenerateContent" in request.url.path:
+            if fake.stream_status != 200:
+                return httpx.Response(fake.stream_status)
+            lines = "".join(
+                f"data: {json.dumps({'candidates': [{'content': {'parts': [{'text': line + chr(10)}]}}]})}\n\n"
+                for line in ANALYSIS_TEXT.split("\n")
+            )
+            return httpx.Response(200, text=lines, headers={"Content-Type": "text/event-stream"})
+        if "generationConfig" in body:
+            text = STRUCTURED_TEXT
+        elif re.search(r"=== NOT \d+ ===", prompt):
+            if fake.bulk_status != 200:
+                return httpx.Response(fake.bulk_status)
+            numbers = [int(number) for number in re.findall(r"=== NOT (\d+) ===", prompt)]
+            text = fake.bulk_reply if fake.bulk_reply is not None else bulk_text(numbers)
+        else:
+            text = ANALYSIS_TEXT
+        return httpx.Response(200, json={"candidates": [{"content": {"parts": [{"text": text}]}}]})
+
+    monkeypatch.setattr(gemini_service, "api_key", "test-key")
+    monkeypatch.setattr(gemini_service, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(gemini_service, "rate_limiter", TokenBucket(rate=1000, capacity=1000))
+    ai_analysis_cache.clear()
+    yield fake
+    ai_analysis_cache.clear()
+
+
+@pytest.fixture
+def notes(make_note):
+    return [
+        make_note("123e4567-e89b-12d3-a456-426614174000", "Alışveriş", "Süt, ekmek"),
+        make_note("123e4567-e89b-12d3-a456-426614174001", "Market", "Yumurta, peynir")
+    ]
+
+
+@pytest.fixture
+def saved(monkeypatch, notes):
+    """Not okumalarını notes fixture'ından yapan, analiz kayıtlarını notlara yazan sahte veritabanı"""
+    by_id = {note["id"]: note for note in notes}
+    writes = []
+
+    async def get_note_by_id(note_id, user_id):
+        note = by_id.get(note_id)
+        return dict(note) if note is not None else None
+
+    async def get_notes_by_ids(note_ids, user_id):
+        return [await get_note_by_id(note_id, user_id) for note_id in note_ids]
+
+    async def get_user_notes(user_id, *args, **kwargs):
+        return [dict(note) for note in notes]
+
+    async def save_ai_analysis(note_id, user_id, key, analysis):
+        by_id[note_id]["ai_analysis"] = {"key": key, "result": analysis}
+        writes.append(note_id)
+        return True
+
+    async def save_ai_analyses(user_id, analyses):
+        for note_id, key, analysis in analyses:
+            await save_ai_analysis(note_id, user_id, key, analysis)
+        return len(analyses)
+
+    monkeypatch.setattr(db, "get_note_by_id", get_note_by_id)
+    monkeypatch.setattr(db, "get_notes_by_ids", get_notes_by_ids)
+    monkeypatch.setattr(db, "get_user_notes", get_user_notes)
+    monkeypatch.setattr(db, "save_ai_analysis", save_ai_analysis)
+    monkeypatch.setattr(db, "save_ai_analyses", save_ai_analyses)
+    return writes
+
+
+def sse(client, note_id):
+    """Akış endpoint'inin olaylarını (olay adı, veri) listesi olarak döndür"""
+    response = client.get(f"/api/v1/notes/{note_id}/ai/stream")
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        name, data = block.split("\n", 1)
+        events.append((name[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def bulk(client, **payload):
+    response = client.post("/api/v1/notes/ai/bulk", json=payload)
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_bulk_results_serve_later_ai_calls(client, gemini, saved, notes, monkeypatch):
+    monkeypatch.setattr(settings, "GEMINI_STRUCTURED_OUTPUT", True)
+
+    results = bulk(client, ids=[note["id"] for note in notes])
+    assert [(result["isSuccess"], result["cached"]) for result in results] == [(True, False)] * 2
+    # Kısa notlar tek düz metin prompt'unda analiz edilir
+    assert len(gemini.prompts) == 1
+    assert sorted(saved) == sorted(note["id"] for note in notes)
+
+    for clear_memory in (False, True):
+        # İkinci turda sonuç not dokümanındaki kayıttan gelir
+        if clear_memory:
+            ai_analysis_cache.clear()
+        for note in notes:
+            body = client.get(f"/api/v1/notes/{note['id']}/ai").json()
+            assert body["isSuccess"] and body["data"]["note_type"] == "Alışveriş"
+    assert bulk(client) == []
+    assert len(gemini.prompts) == 1
+    assert len(saved) == 2
+
+
+def test_pack_notes_respects_size_and_char_limits(make_note, monkeypatch):
+    monkeypatch.setattr(settings, "AI_BULK_PACK_SIZE", 3)
+    monkeypatch.setattr(settings, "AI_BULK_PACK_MAX_CHARS", 20)
+    monkeypatch.setattr(settings, "AI_BULK_PROMPT_MAX_CHARS", 25)
+    pending = [
+        (make_note("a", "a", "x" * 5), "key-a"),
+        (make_note("b", "b", "x" * 5), "key-b"),
+        (make_note("c", "c", "x" * 5), "key-c"),
+        (make_note("uzun", "uzun", "x" * 50), "key-uzun"),
+        (make_note("d", "d", "x" * 15), "key-d"),
+        (make_note("e", "e", "x" * 15), "key-e")
+    ]
+
+    groups = [[note["id"] for note, _ in group] for group in _pack_notes(pending)]
+    # Uzun not tek başına gider; not sayısı ve toplam karakter sınırı grubu kapatır
+    assert groups == [["uzun"], ["a", "b", "c"], ["d"], ["e"]]
+
+
+@pytest.mark.parametrize("reply", [
+    bulk_text([1]),
+    bulk_text([1]) + "\n=== NOT 2 ===\nbozuk satır",
+    bulk_text([1]) + "\n=== NOT x ===\n" + ANALYSIS_TEXT
+], ids=["missing", "malformed", "unnumbered"])
+def test_partial_bulk_reply_falls_back_per_note(client, gemini, saved, notes, monkeypatch, reply):
+    monkeypatch.setattr(settings, "GEMINI_STRUCTURED_OUTPUT", True)
+    gemini.bulk_reply = reply
+
+    results = bulk(client, ids=[note["id"] for note in notes])
+    assert [result["isSuccess"] for result in results] == [True, True]
+    # Yanıtta geçerli bloğu olmayan not tek not prompt'uyla (structured modda) yeniden istenir
+    assert len(gemini.prompts) == 2
+    assert '"note_type"' not in gemini.prompts[0] and "note_type:" in gemini.prompts[1]
+    assert {result["data"]["note_type"] for result in results} == {"Alışveriş"}
+    assert sorted(saved) == sorted(note["id"] for note in notes)
+
+
+def test_failed_bulk_request_reports_every_note(client, gemini, saved, notes):
+    gemini.bulk_status = 400
+    missing_id = "123e4567-e89b-12d3-a456-426614174099"
+
+    results = bulk(client, ids=[missing_id] + [note["id"] for note in notes])
+    assert [(result["note_id"], result["errorCode"]) for result in results] == [
+        (missing_id, "NOTE_NOT_FOUND"),
+        (notes[0]["id"], "AI_ANALYSIS_ERROR"),
+        (notes[1]["id"], "AI_ANALYSIS_ERROR")
+    ]
+    # Grup isteği başarısız olunca notlar tek tek tekrar gönderilmez
+    assert len(gemini.prompts) == 1
+    assert saved == []
+
+
+def test_stream_emits_deltas_fields_then_result(client, gemini, saved, notes):
+    events = sse(client, notes[0]["id"])
+    names = [name for name, _ in events]
+    assert names[0] == "delta" and names[-1] == "result"
+    assert "".join(data["text"] for name, data in events if name == "delta").strip() == ANALYSIS_TEXT
+    fields = {data["field"]: data["value"] for name, data in events if name == "field"}
+    assert fields["note_type"] == "Alışveriş" and fields["suggested_tags"] == ["market"]
+    assert events[-1][1]["note_type"] == "Alışveriş"
+    assert saved == [notes[0]["id"]]
+
+
+def test_stream_cache_hit_skips_gemini(client, gemini, saved, notes, monkeypatch):
+    monkeypatch.setattr(settings, "GEMINI_STRUCTURED_OUTPUT", True)
+    # /ai'nin structured sonucu akışta da kullanılır
+    assert client.get(f"/api/v1/notes/{notes[0]['id']}/ai").json()["isSuccess"]
+    ai_analysis_cache.clear()
+
+    events = sse(client, notes[0]["id"])
+    assert [name for name, _ in events] == ["field"] * 5 + ["result"]
+    assert events[-1][1]["category"] == "Ev"
+    assert len(gemini.prompts) == 1
+    assert len(saved) == 1
+
+
+def test_stream_failure_ends_with_error_event(client, gemini, saved, notes):
+    gemini.stream_status = 400
+
+    events = sse(client, notes[0]["id"])
+    assert [name for name, _ in events] == ["error"]
+    assert events[0][1]["errorCode"] == "AI_ANALYSIS_ERROR"
+    assert saved == []
+
+
+def test_persisted_analysis_is_used_until_content_changes(gemini, make_note):
+    note = make_note("123e4567-e89b-12d3-a456-426614174000", "Alışveriş", "Süt, ekmek")
+    key = gemini_service.analysis_key(note_prompt_data(note), structured=False)
+    result = {"note_type": "Alışveriş"}
+
+    # Başka bir anahtarla kaydedilmiş analiz kullanılmaz
+    assert analysis_service.cached_analysis({**note, "ai_analysis": {"key": "eski", "result": result}})[1] is None
+
+    stored = {**note, "ai_analysis": {"key": key, "result": result}}
+    assert analysis_service.cached_analysis(stored)[1] == result
+    # Not dokümanından okunan sonuç bellekteki cache'e de yazılır
+    assert ai_analysis_cache.get(key) == result
+
+    edited = {**stored, "content": "Süt, ekmek, yumurta"}
+    assert analysis_service.cached_analysis(edited)[1] is None
+    assert gemini.prompts == []
@@ -0,0 +1,106 @@
+"""
+AI analiz iş kuyruğu testleri
+Aynı notun aynı sürümü için tek iş açılmasını (single-flight), biten
+işlerin süresi dolunca silinmesini ve kapanışta bekleyen işlerin temizlenmesini doğrular.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.services.ai_job_queue import AIJobQueue
+from app.services.analysis_service import analysis_service
+
+USER_ID = "user-1"
+NOTE = {"id": "123e4567-e89b-12d3-a456-426614174000", "title": "Alışveriş", "content": "Süt, ekmek", "tags": [], "pinned": False}
+ANALYSIS = {"note_type": "Alışveriş", "importance_level": "Düşük", "category": "Ev", "suggestions": [], "suggested_tags": []}
+
+
+@pytest.fixture
+def gate(monkeypatch):
+    """Analizleri event set edilene kadar bekleten sahte analyze"""
+    release = asyncio.Event()
+    calls = []
+
+    async def analyze(note, user_id):
+        calls.append(note["id"])
+        await release.wait()
+        return ANALYSIS
+
+    monkeypatch.setattr(analysis_service, "analyze", analyze)
+    monkeypatch.setattr(analysis_service, "cached_analysis", lambda note: ("key-" + note["content"], None))
+    return release, calls
+
+
+async def wait_for(job_id, queue):
+    while queue.get(job_id, USER_ID)["status"] in ("queued", "running"):
+        await asyncio.sleep(0)
+    return queue.get(job_id, USER_ID)
+
+
+def test_same_note_version_is_single_flight(gate):
+    release, calls = gate
+
+    async def run():
+        queue = AIJobQueue(workers=2, max_queue=10, job_ttl=60)
+        first, created = await queue.submit(NOTE, USER_ID)
+        second, coalesced_created = await queue.submit(NOTE, USER_ID)
+        # Notun yeni sürümü ayrı bir iştir
+        edited, _ = await queue.submit({**NOTE, "content": "Süt, ekmek, yumurta"}, USER_ID)
+        await asyncio.sleep(0)
+        release.set()
+        finished = await wait_for(first["job_id"], queue)
+        await wait_for(edited["job_id"], queue)
+        stats = queue.stats()
+        await queue.stop()
+        return first, created, second, coalesced_created, edited, finished, stats
+
+    first, created, second, coalesced_created, edited, finished, stats = asyncio.run(run())
+    assert created and not coalesced_created
+    assert second["job_id"] == first["job_id"] != edited["job_id"]
+    assert finished["status"] == "succeeded" and finished["result"] == ANALYSIS
+    assert len(calls) == 2
+    assert (stats["coalesced"], stats["inflight"]) == (1, 0)
+
+
+def test_finished_jobs_expire_on_read_and_in_background(gate):
+    release, _ = gate
+    release.set()
+
+    async def run():
+        queue = AIJobQueue(workers=1, max_queue=10, job_ttl=0.05)
+        job, _ = await queue.submit(NOTE, USER_ID)
+        assert (await wait_for(job["job_id"], queue))["status"] == "succeeded"
+        await asyncio.sleep(0.1)
+        expired_on_read = queue.get(job["job_id"], USER_ID) is None
+
+        # Hiç sorgulanmayan iş de arka planda silinir
+        other, _ = await queue.submit({**NOTE, "id": "other"}, USER_ID)
+        deadline = time.monotonic() + 2
+        while other["job_id"] in queue._jobs and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        pruned_in_background = other["job_id"] not in queue._jobs
+        await queue.stop()
+        return expired_on_read, pruned_in_background
+
+    assert asyncio.run(run()) == (True, True)
+
+
+def test_stop_fails_pending_jobs_and_clears_inflight(gate):
+    async def run():
+        queue = AIJobQueue(workers=1, max_queue=10, job_ttl=60)
+        job, _ = await queue.submit(NOTE, USER_ID)
+        await asyncio.sleep(0)
+        await queue.stop()
+        stopped = queue.get(job["job_id"], USER_ID)
+        inflight = queue.stats()["inflight"]
+        # Yeniden başlatılan kuyrukta aynı sürüm için yeni iş açılır
+        again, created = await queue.submit(NOTE, USER_ID)
+        await queue.stop()
+        return job, stopped, inflight, again, created
+
+    job, stopped, inflight, again, created = asyncio.run(run())
+    assert stopped["status"] == "failed"
+    assert inflight == 0
+    assert created and again["job_id"] != job["job_id"]
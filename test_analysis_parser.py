@@ -0,0 +1,63 @@
+"""
+Gemini analiz yanıtı parser testleri
+test_data/gemini_analysis_corpus.json'daki kayıtlı yanıtların beklenen
+alanlara parse edildiğini doğrular.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+import app.services.gemini_service as gemini_module
+from app.services.gemini_service import gemini_service, AnalysisStreamParser
+
+CORPUS = json.loads((Path(__file__).parent / "test_data" / "gemini_analysis_corpus.json").read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize("case", CORPUS["text"], ids=lambda case: case["name"])
+def test_text_response_is_parsed(case):
+    parsed = gemini_service.parse_analysis_response(case["response"])
+    assert parsed.pop("raw_analysis") == case["response"]
+    assert parsed == case["expected"]
+
+
+@pytest.mark.parametrize("case", CORPUS["text"], ids=lambda case: case["name"])
+def test_stream_parser_matches_full_parse(case):
+    parser = AnalysisStreamParser()
+    fields = []
+    # Parçalar satır ortasından bölünür
+    for start in range(0, len(case["response"]), 7):
+        fields.extend(parser.feed(case["response"][start:start + 7]))
+    fields.extend(parser.finish())
+
+    for name, value in fields:
+        assert case["expected"][name] == value
+    assert len({name for name, _ in fields}) == len(fields)
+
+
+@pytest.mark.parametrize("case", CORPUS["structured"], ids=lambda case: case["name"])
+def test_structured_response_is_validated(case):
+    if case["expected"] is None:
+        with pytest.raises(ValidationError):
+            gemini_service.parse_structured_response(case["response"])
+        return
+    parsed = gemini_service.parse_structured_response(case["response"])
+    assert parsed.pop("raw_analysis") == case["response"]
+    assert parsed == case["expected"]
+
+
+def test_analysis_key_covers_mode_and_schema(monkeypatch):
+    note = {"title": "Alışveriş", "content": "Süt, ekmek", "tags": [], "pinned": False}
+    text_key = gemini_service.analysis_key(note, structured=False)
+    structured_key = gemini_service.analysis_key(note, structured=True)
+    assert text_key != structured_key
+
+    monkeypatch.setattr(gemini_module.settings, "GEMINI_STRUCTURED_OUTPUT", True)
+    assert gemini_service.analysis_key(note) == structured_key
+
+    # Şema değişince structured sonuçlar geçersizleşir, düz metin sonuçları etkilenmez
+    monkeypatch.setattr(gemini_module, "ANALYSIS_RESPONSE_SCHEMA", {**gemini_module.ANALYSIS_RESPONSE_SCHEMA, "required": []})
+    assert gemini_service.analysis_key(note, structured=True) != structured_key
+    assert gemini_service.analysis_key(note, structured=False) == text_key
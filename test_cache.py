@@ -0,0 +1,151 @@
+"""
+Cache testleri
+Token cache'inin exp zamanına kadar tutmasını, geçersiz token'ları kısa
+süre negatif cache'lemesini, token doğrulamanın cache ile etkileşimini ve
+not cache'inin LRU/TTL/geçersiz kılma davranışını doğrular.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from google.auth import exceptions as google_auth_exceptions
+
+from app import database
+from app.cache import LRUCache, NoteCache, TokenCache, _estimate_size
+from app.database import ID_TOKEN_CERT_URL, ID_TOKEN_ISSUER_PREFIX, db
+
+USER = {"id": "user-1", "email": "user@example.com"}
+
+
+def test_token_cache_keeps_user_until_exp():
+    cache = TokenCache(max_entries=10, negative_ttl=30)
+    cache.put("valid", USER, time.time() + 60)
+    cache.put("expired", USER, time.time() - 1)
+
+    assert cache.get("valid") == (True, USER)
+    assert cache.get("expired") == (False, None)
+    assert cache.get("unknown") == (False, None)
+    # Süresi dolan kayıt okunurken düşürülür
+    assert cache.stats()["entries"] == 1
+
+
+def test_token_cache_negative_entries_expire():
+    cache = TokenCache(max_entries=10, negative_ttl=30)
+    cache.put_invalid("bad")
+    assert cache.get("bad") == (True, None)
+    assert cache.stats()["negative_hits"] == 1
+
+    cache.negative_ttl = 0
+    cache.put_invalid("bad")
+    assert cache.get("bad") == (False, None)
+
+
+def test_token_cache_evicts_least_recently_used():
+    cache = TokenCache(max_entries=2, negative_ttl=30)
+    expires_at = time.time() + 60
+    cache.put("a", USER, expires_at)
+    cache.put("b", USER, expires_at)
+    cache.get("a")
+    cache.put("c", USER, expires_at)
+
+    assert cache.get("b") == (False, None)
+    assert cache.get("a")[0] and cache.get("c")[0]
+    assert cache.stats()["evictions"] == 1
+
+
+@pytest.fixture
+def verifier(monkeypatch):
+    calls = []
+
+    def verify_firebase_token(token, request, audience=None):
+        calls.append(token)
+        # Sertifikalar arka planda yenilenen paylaşılan transport'tan okunur
+        assert request is db.cert_request
+        if token == "expired":
+            raise ValueError("Token expired, 1700000000 < 1700000100")
+        if token == "invalid":
+            raise ValueError("Could not verify token signature.")
+        if token == "unavailable":
+            raise google_auth_exceptions.TransportError("sertifikalar alınamadı")
+        issuer = "https://securetoken.google.com/başka-proje" if token == "foreign" else ID_TOKEN_ISSUER_PREFIX + audience
+        return {"sub": USER["id"], "iss": issuer, "email": USER["email"], "exp": time.time() + 60}
+
+    monkeypatch.delenv("FIREBASE_AUTH_EMULATOR_HOST", raising=False)
+    monkeypatch.setattr(database.google_id_token, "verify_firebase_token", verify_firebase_token)
+    monkeypatch.setattr(db, "token_cache", TokenCache(max_entries=10, negative_ttl=30))
+    return calls
+
+
+def test_verify_user_token_caches_valid_and_invalid_tokens(verifier):
+    async def run():
+        results = []
+        for token in ("valid", "valid", "expired", "expired", "invalid", "invalid", "foreign", "foreign"):
+            results.append(await db.verify_user_token(token))
+        return results
+
+    assert asyncio.run(run()) == [USER, USER, None, None, None, None, None, None]
+    # Her token imza kontrolünden bir kez geçer
+    assert verifier == ["valid", "expired", "invalid", "foreign"]
+
+
+def test_verify_user_token_does_not_cache_transient_errors(verifier):
+    async def run():
+        return [await db.verify_user_token("unavailable") for _ in range(2)]
+
+    assert asyncio.run(run()) == [None, None]
+    assert verifier == ["unavailable", "unavailable"]
+
+
+def test_refresh_signing_certs_bypasses_cache(monkeypatch):
+    requests = []
+
+    def cert_request(url, method="GET", headers=None):
+        requests.append((url, headers))
+        return SimpleNamespace(status=200 if len(requests) == 1 else 503)
+
+    monkeypatch.setattr(db, "cert_request", cert_request)
+    db.refresh_signing_certs()
+    assert requests == [(ID_TOKEN_CERT_URL, {"Cache-Control": "no-cache"})]
+    with pytest.raises(Exception):
+        db.refresh_signing_certs()
+
+
+def test_lru_cache_evicts_oldest_and_expires_entries():
+    cache = LRUCache(ttl=60, max_bytes=3 * _estimate_size("x" * 100))
+    for key in ("a", "b", "c"):
+        cache.set(key, "x" * 100)
+    cache.get("a")
+    cache.set("d", "x" * 100)
+    assert cache.get("b") is None and cache.get("a") is not None
+    assert cache.stats()["evictions"] == 1
+
+    cache.ttl = -1
+    cache.set("e", "x" * 100)
+    assert cache.get("e") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_note_cache_invalidates_lists_on_write():
+    cache = NoteCache(ttl=60, max_bytes=1024 * 1024)
+    note = {"id": "n1", "title": "Başlık"}
+    cache.put_list("user-1", ("page", 1), [note], None)
+    cache.put_list("user-2", ("page", 1), [note], None)
+    assert cache.get_note("user-1", "n1") == note
+
+    cache.invalidate_lists("user-1")
+    assert cache.get_list("user-1", ("page", 1)) is None
+    assert cache.get_list("user-2", ("page", 1)) == ([note], None)
+
+
+def test_note_cache_list_index_follows_evictions():
+    note = {"id": "n1", "content": "x" * 200}
+    cache = NoteCache(ttl=60, max_bytes=4 * _estimate_size(([note], None)))
+    for user in range(100):
+        cache.put_list(f"user-{user}", ("page", 1), [note], None, warm_notes=False)
+
+    # Atılan sayfaların kullanıcıları liste indeksinde birikmez
+    assert len(cache._list_keys) == cache.stats()["entries"] <= 4
+    assert cache.stats()["list_index_users"] == len(cache._list_keys)
+    assert cache.get_list("user-99", ("page", 1)) is not None
@@ -0,0 +1,73 @@
+"""
+Takvim (tarih aralığı) sorgusu testleri
+Interval indeksinin çakışma sonuçlarını kaba kuvvetle karşılaştırır,
+/notes/range ve /notes/active endpoint'lerini doğrular.
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.intervals import IntervalIndex
+
+NOW = datetime(2025, 9, 1, tzinfo=timezone.utc)
+
+
+def test_overlapping_matches_brute_force_under_updates():
+    rng = random.Random(7)
+    index = IntervalIndex()
+    intervals = {}
+    for step in range(3000):
+        note_id = f"n{rng.randrange(500)}"
+        if rng.random() < 0.2:
+            index.remove(note_id)
+            intervals.pop(note_id, None)
+        else:
+            start = rng.uniform(0, 1000)
+            end = start + rng.expovariate(1 / 20)
+            index.add(note_id, datetime.fromtimestamp(start, timezone.utc), datetime.fromtimestamp(end, timezone.utc))
+            intervals[note_id] = (start, end)
+
+        if step % 50 == 0:
+            low = rng.uniform(0, 1000)
+            high = low + rng.uniform(0, 50)
+            expected = {note_id for note_id, (start, end) in intervals.items() if start <= high and end >= low}
+            assert set(index.overlapping(low, high)) == expected
+
+
+def test_single_date_is_a_point_interval():
+    index = IntervalIndex()
+    index.add("a", None, NOW)
+    index.add("b", None, None)
+    assert index.overlapping(NOW.timestamp(), NOW.timestamp()) == ["a"]
+    assert len(index) == 1
+
+
+@pytest.fixture
+def notes(make_note):
+    return [
+        make_note("123e4567-e89b-12d3-a456-426614174000", start_date=NOW + timedelta(hours=9), end_date=NOW + timedelta(days=2, hours=17)),
+        make_note("123e4567-e89b-12d3-a456-426614174001", start_date=NOW + timedelta(days=1, hours=22)),
+        make_note("123e4567-e89b-12d3-a456-426614174002", start_date=NOW + timedelta(days=10), end_date=NOW + timedelta(days=11)),
+        make_note("123e4567-e89b-12d3-a456-426614174003", start_date=NOW, end_date=NOW + timedelta(days=5), deleted=True),
+        make_note("123e4567-e89b-12d3-a456-426614174004")
+    ]
+
+
+def test_range_grouped_by_day_in_timezone(client):
+    body = client.get("/api/v1/notes/range", params={
+        "from": "2025-09-01T00:00:00", "to": "2025-09-07T23:59:59", "tz": "Europe/Istanbul"
+    }).json()
+    assert body["isSuccess"]
+    # 22:00 UTC İstanbul'da ertesi güne düşer
+    days = {day["day"]: [note["id"][-1] for note in day["notes"]] for day in body["data"]}
+    assert days == {"2025-09-01": ["0"], "2025-09-02": ["0"], "2025-09-03": ["0", "1"]}
+
+
+def test_active_and_invalid_range(client):
+    body = client.get("/api/v1/notes/active", params={"at": "2025-09-02T12:00:00Z"}).json()
+    assert [note["id"][-1] for note in body["data"]] == ["0"]
+
+    body = client.get("/api/v1/notes/range", params={"from": "2025-09-07T00:00:00", "to": "2025-09-01T00:00:00"}).json()
+    assert body["errorCode"] == "INVALID_RANGE"
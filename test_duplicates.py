@@ -0,0 +1,85 @@
+"""
+Yakın kopya tespiti testleri
+SimHash imzalarını, LSH indeksinin eşleşme ve kümelemesini,
+not oluştururken kopya işaretlemeyi ve /notes/duplicates endpoint'ini doğrular.
+"""
+
+import pytest
+
+from app import database
+from app.database import db
+from app.duplicates import DuplicateIndex, distance, simhash, MAX_DISTANCE
+from app.search import search_index
+
+MEETING = (
+    "Sprint planlaması toplantısında bütçe raporu, müşteri sunumu ve yeni işe alımlar konuşuldu. "
+    "Ayşe sunum taslağını cuma gününe kadar hazırlayacak, Mehmet bütçe tablosunu güncelleyecek. "
+    "Bir sonraki toplantı salı sabahı saat onda yapılacak ve herkes ilerleme durumunu paylaşacak."
+)
+SHOPPING = "Süt, ekmek, yumurta, peynir, domates, zeytin ve kahve alınacak. Eczaneye de uğranacak."
+
+
+def test_simhash_is_stable_and_close_for_near_duplicates():
+    signature = simhash("Toplantı notları", MEETING)
+    assert signature == simhash("Toplantı notları", MEETING)
+    assert -2**63 <= signature < 2**63
+    assert distance(signature, simhash("Toplantı notları", MEETING + " Kahve")) <= MAX_DISTANCE
+    assert distance(signature, simhash("Alışveriş", SHOPPING)) > MAX_DISTANCE
+    assert simhash("", "  ...  ") is None
+
+
+def test_index_matches_clusters_and_removal():
+    index = DuplicateIndex()
+    index.add("a", simhash("Toplantı notları", MEETING))
+    index.add("b", simhash("Toplantı notları", MEETING + " Kahve"))
+    index.add("c", simhash("Toplantı notları", MEETING))
+    index.add("d", simhash("Alışveriş", SHOPPING))
+
+    assert set(index.matches(index.signatures["a"], exclude="a")) == {"b", "c"}
+    assert index.clusters() == [["a", "b", "c"]]
+
+    index.remove("a")
+    index.remove("c")
+    assert index.clusters() == []
+    assert len(index) == 2
+
+
+@pytest.fixture
+def notes(make_note):
+    # Eski notlarda simhash alanı yok; imza indeks yüklenirken hesaplanır
+    return [
+        make_note("123e4567-e89b-12d3-a456-426614174000", "Toplantı notları", MEETING),
+        make_note("123e4567-e89b-12d3-a456-426614174001", "Toplantı notları", MEETING + " Kahve"),
+        make_note("123e4567-e89b-12d3-a456-426614174002", "Alışveriş", SHOPPING)
+    ]
+
+
+@pytest.fixture
+def client(client, monkeypatch):
+    async def create_note(note_data, user_id):
+        note = database._build_note(note_data, user_id)
+        note["updated_at"] = note["created_at"]
+        search_index.upsert(user_id, note)
+        return note
+
+    monkeypatch.setattr(db, "create_note", create_note)
+    return client
+
+
+def test_duplicates_endpoint(client):
+    body = client.get("/api/v1/notes/duplicates").json()
+    assert body["isSuccess"]
+    assert [[note["id"][-1] for note in cluster["notes"]] for cluster in body["data"]] == [["0", "1"]]
+
+
+def test_create_flags_duplicates_only_when_asked(client):
+    payload = {"title": "Toplantı notları", "content": MEETING}
+
+    body = client.post("/api/v1/notes/", json=payload).json()
+    assert body["data"]["possible_duplicates"] == []
+
+    body = client.post("/api/v1/notes/", json=payload, params={"check_duplicates": True}).json()
+    assert body["isSuccess"]
+    assert sorted(body["data"]["possible_duplicates"]) == [
+        "123e4567-e89b-12d3-a456-426614174000", "123e4567-e89b-12d3-a456-426614174001"
+    ]
@@ -0,0 +1,84 @@
+"""
+Sınırlı thread pool testleri
+Kuyruk doluyken yeni işin hemen reddedilmesini, max_wait içinde
+başlayamayan işin iptal edilmesini ve token doğrulama pool'u doyduğunda
+kimlik doğrulamalı endpoint'lerin 503 döndürmesini doğrular.
+"""
+
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.cache import TokenCache
+from app.database import db
+from app.executor import BoundedExecutor, ExecutorSaturatedError
+from app.main import app
+
+
+async def occupy(executor, release):
+    """Tek worker'ı release set edilene kadar meşgul eden iş başlat"""
+    task = asyncio.create_task(executor.run(release.wait))
+    while executor.running == 0:
+        await asyncio.sleep(0.001)
+    return task
+
+
+def test_full_queue_rejects_immediately():
+    async def run():
+        executor = BoundedExecutor(name="test", workers=1, max_pending=1, max_wait=5)
+        release = threading.Event()
+        busy = await occupy(executor, release)
+        queued = asyncio.create_task(executor.run(lambda: "sırada"))
+        await asyncio.sleep(0)
+        try:
+            with pytest.raises(ExecutorSaturatedError):
+                await executor.run(lambda: "fazla")
+            stats = executor.stats()
+        finally:
+            release.set()
+        results = (await busy, await queued)
+        executor.shutdown()
+        return stats, results, executor.stats()
+
+    stats, results, final = asyncio.run(run())
+    assert (stats["queue_depth"], stats["running"], stats["rejected"]) == (1, 1, 1)
+    assert results == (True, "sırada")
+    assert (final["completed"], final["timed_out"]) == (2, 0)
+
+
+def test_job_that_cannot_start_within_max_wait_is_cancelled():
+    calls = []
+
+    async def run():
+        executor = BoundedExecutor(name="test", workers=1, max_pending=10, max_wait=0.05)
+        release = threading.Event()
+        busy = await occupy(executor, release)
+        try:
+            with pytest.raises(ExecutorSaturatedError):
+                await executor.run(calls.append, "geç")
+            stats = executor.stats()
+        finally:
+            release.set()
+        await busy
+        executor.shutdown()
+        return stats
+
+    stats = asyncio.run(run())
+    assert (stats["timed_out"], stats["queue_depth"], stats["rejected"]) == (1, 0, 0)
+    # İptal edilen iş sonradan da çalışmaz
+    assert calls == []
+
+
+def test_saturated_token_verification_returns_503(monkeypatch):
+    saturated = BoundedExecutor(name="test", workers=1, max_pending=0, max_wait=1)
+    monkeypatch.setattr(db, "auth_executor", saturated)
+    monkeypatch.setattr(db, "token_cache", TokenCache(max_entries=10, negative_ttl=30))
+
+    response = TestClient(app).get("/api/v1/notes/", headers={"Authorization": "Bearer token"})
+    saturated.shutdown()
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert saturated.stats()["rejected"] == 1
@@ -0,0 +1,90 @@
+"""
+Gemini istek dayanıklılık katmanı testleri
+429/5xx yanıtlarında tekrar denemeyi, devre kesicinin hızlı hata
+vermesini ve istemci tarafı hız sınırını doğrular.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.resilience import TokenBucket
+from app.services.gemini_service import GeminiService
+
+NOTE = {"title": "Alışveriş", "content": "Süt, ekmek", "tags": [], "pinned": False}
+ANALYSIS_TEXT = "- Not Türü: Alışveriş\n- Önem Seviyesi: Düşük\n- Kategori: Ev\n- Öneriler:\n  * Liste yap\n- Etiket Önerileri: market"
+
+
+def ok_response():
+    return httpx.Response(200, json={"candidates": [{"content": {"parts": [{"text": ANALYSIS_TEXT}]}}]})
+
+
+def make_service(handler):
+    service = GeminiService()
+    service.api_key = "test-key"
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return service
+
+
+@pytest.fixture(autouse=True)
+def fast_settings(monkeypatch):
+    monkeypatch.setattr(settings, "GEMINI_STRUCTURED_OUTPUT", False)
+    monkeypatch.setattr(settings, "GEMINI_RETRY_BASE_DELAY", 0.01)
+    monkeypatch.setattr(settings, "GEMINI_RETRY_MAX_DELAY", 0.05)
+    monkeypatch.setattr(settings, "GEMINI_MAX_RETRIES", 2)
+    monkeypatch.setattr(settings, "GEMINI_CIRCUIT_FAILURE_THRESHOLD", 3)
+
+
+def test_throttled_request_is_retried_after_retry_after():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return ok_response()
+
+    service = make_service(handler)
+    result = asyncio.run(service.generate_content(NOTE))
+
+    assert result["success"]
+    assert result["analysis"]["note_type"] == "Alışveriş"
+    assert len(calls) == 2
+    assert service.counters["throttled"] == 1
+    assert service.counters["retried"] == 1
+    assert service.circuit_breaker.state == "closed"
+
+
+def test_open_circuit_fails_fast_without_calling_gemini():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    service = make_service(handler)
+    first = asyncio.run(service.generate_content(NOTE))
+    assert not first["success"]
+    # İlk istek 1 + 2 tekrar denemeyle eşiğe ulaşıp devreyi açar
+    assert len(calls) == 3
+    assert service.circuit_breaker.state == "open"
+
+    second = asyncio.run(service.generate_content(NOTE))
+    assert not second["success"]
+    assert second["retry_after"] > 0
+    assert len(calls) == 3
+
+
+def test_token_bucket_rejects_when_wait_exceeds_max_wait():
+    async def run():
+        bucket = TokenBucket(rate=1, capacity=1)
+        assert await bucket.acquire(max_wait=0)
+        assert not await bucket.acquire(max_wait=0.5)
+        bucket.throttled()
+        return bucket
+
+    bucket = asyncio.run(run())
+    assert bucket.rejected == 1
+    assert bucket.rate == 0.5
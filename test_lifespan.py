@@ -0,0 +1,76 @@
+"""
+Uygulama yaşam döngüsü testleri
+Açılışta başlatılan arka plan görevlerinin ve paylaşılan kaynakların
+kapanışta durdurulduğunu doğrular.
+"""
+
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.database import db
+from app.executor import BoundedExecutor
+from app.main import app
+from app.services import gemini_service as gemini_module
+from app.services.gemini_service import gemini_service
+from app.services.reminder_scheduler import reminder_scheduler
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    # Kapanış pool'u kapatır; global executor diğer testler için korunur
+    monkeypatch.setattr(db, "auth_executor", BoundedExecutor(name="test", workers=1, max_pending=1, max_wait=1))
+    monkeypatch.setattr(reminder_scheduler, "enabled", False)
+    monkeypatch.setattr(settings, "GEMINI_STRUCTURED_OUTPUT", False)
+    monkeypatch.setattr(gemini_service, "api_key", "test-key")
+    monkeypatch.setattr(gemini_service, "_client", None)
+
+
+def wait_until(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_signing_certs_are_refreshed_until_shutdown(monkeypatch):
+    refreshes = []
+    monkeypatch.setattr(db, "refresh_signing_certs", lambda: refreshes.append(time.monotonic()))
+    monkeypatch.setattr(settings, "FIREBASE_CERT_REFRESH_INTERVAL", 0.01)
+
+    with TestClient(app):
+        # İlk yenileme açılışta yapılır, sonra aralıkla tekrarlanır
+        assert wait_until(lambda: len(refreshes) >= 2)
+    stopped_at = len(refreshes)
+    time.sleep(0.05)
+    assert len(refreshes) == stopped_at
+
+
+def test_gemini_client_is_shared_for_the_app_lifetime(monkeypatch):
+    monkeypatch.setattr(db, "refresh_signing_certs", lambda: None)
+    created, requests = [], []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"candidates": [{"content": {"parts": [{"text": "- Not Türü: İş"}]}}]})
+
+    class RecordingClient(httpx.AsyncClient):
+        def __init__(self, **kwargs):
+            super().__init__(**{**kwargs, "transport": httpx.MockTransport(handler)})
+            created.append(self)
+
+    monkeypatch.setattr(gemini_module.httpx, "AsyncClient", RecordingClient)
+
+    with TestClient(app) as client:
+        # Client açılışta oluşturulur ve sonraki tüm çağrılarda aynı havuz kullanılır
+        assert len(created) == 1 and gemini_service._client is created[0]
+        for _ in range(2):
+            result = client.portal.call(gemini_service.generate_content, {"title": "Toplantı", "content": "Bütçe"})
+            assert result["success"]
+        assert len(requests) == 2 and len(created) == 1
+        assert requests[0].headers["X-goog-api-key"] == "test-key"
+    assert created[0].is_closed
+    assert gemini_service._client is None
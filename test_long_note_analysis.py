@@ -0,0 +1,80 @@
+"""
+Uzun not (map-reduce) analiz testleri
+Bölüm sınırlarının düzenlemelerde kaymadığını ve sadece değişen bölümün
+yeniden özetlendiğini doğrular.
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.cache import ai_analysis_cache
+from app.config import settings
+from app.database import db
+from app.resilience import TokenBucket
+from app.services.analysis_service import analysis_service
+from app.services.gemini_service import gemini_service
+
+ANALYSIS_TEXT = "- Not Türü: Toplantı\n- Önem Seviyesi: Yüksek\n- Kategori: İş\n- Öneriler:\n  * Aksiyonları paylaş\n- Etiket Önerileri: toplantı"
+
+
+def long_content(edited=None):
+    paragraphs = [f"Paragraf {index}: " + f"gündem maddesi {index} üzerine konuşuldu. " * 8 for index in range(40)]
+    if edited is not None:
+        paragraphs[edited] += " Karar: ertelendi."
+    return "\n\n".join(paragraphs)
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    prompts = []
+
+    def handler(request):
+        prompt = json.loads(request.content)["contents"][0]["parts"][0]["text"]
+        prompts.append(prompt)
+        text = "- bölüm özeti" if "BÖLÜM:" in prompt else ANALYSIS_TEXT
+        return httpx.Response(200, json={"candidates": [{"content": {"parts": [{"text": text}]}}]})
+
+    async def save_ai_analysis(*args):
+        return True
+
+    monkeypatch.setattr(settings, "GEMINI_STRUCTURED_OUTPUT", False)
+    monkeypatch.setattr(settings, "AI_CHUNK_MAX_TOKENS", 300)
+    monkeypatch.setattr(gemini_service, "api_key", "test-key")
+    monkeypatch.setattr(gemini_service, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(gemini_service, "rate_limiter", TokenBucket(rate=1000, capacity=1000))
+    monkeypatch.setattr(db, "save_ai_analysis", save_ai_analysis)
+    ai_analysis_cache.clear()
+    yield prompts
+    ai_analysis_cache.clear()
+
+
+def test_short_content_is_not_split(gemini):
+    assert gemini_service.split_content("kısa not") == ["kısa not"]
+
+
+def test_edit_changes_only_one_chunk(gemini):
+    original = gemini_service.split_content(long_content())
+    edited = gemini_service.split_content(long_content(edited=20))
+
+    assert len(original) > 3
+    assert all(len(chunk) <= settings.AI_CHUNK_MAX_TOKENS * 3 for chunk in original)
+    assert len(set(edited) - set(original)) == 1
+
+
+def test_long_note_reanalysis_only_summarizes_changed_chunk(gemini):
+    note = {"id": "note-1", "title": "Toplantı notları", "content": long_content(), "tags": []}
+    chunk_count = len(gemini_service.split_content(note["content"]))
+
+    analysis = asyncio.run(analysis_service.analyze(note, "user-1"))
+    assert analysis["note_type"] == "Toplantı"
+    # Her bölüm için bir map, sonunda bir reduce isteği
+    assert len(gemini) == chunk_count + 1
+    assert "[Bölüm 1/" in gemini[-1]
+
+    gemini.clear()
+    edited = {**note, "content": long_content(edited=20)}
+    asyncio.run(analysis_service.analyze(edited, "user-1"))
+    assert len(gemini) == 2
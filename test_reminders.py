@@ -0,0 +1,133 @@
+"""
+Hatırlatma zamanlayıcısı testleri
+Planlama, not güncellemesi/silmesiyle yeniden planlama, açılış yüklemesi
+ve worker'ın zamanı gelen hatırlatmayı sink'e göndermesini doğrular.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from app.services.reminder_scheduler import (
+    ReminderScheduler, QueueReminderSink, REMINDER_START, REMINDER_DUE_SOON
+)
+
+USER_ID = "user-1"
+LEAD = 3600
+
+
+def make_note(note_id, start_date=None, end_date=None, deleted=False):
+    return {"id": note_id, "user_id": USER_ID, "start_date": start_date, "end_date": end_date, "deleted": deleted}
+
+
+def make_scheduler():
+    sink = QueueReminderSink(max_queue=100)
+    return ReminderScheduler(due_soon_lead=LEAD, sink=sink), sink
+
+
+def drain(sink):
+    reminders = []
+    while not sink.queue.empty():
+        reminder = sink.queue.get_nowait()
+        reminders.append((reminder["note_id"], reminder["kind"]))
+    return reminders
+
+
+def test_fires_in_time_order_and_follows_updates():
+    scheduler, sink = make_scheduler()
+    now = datetime.utcnow()
+    scheduler.upsert(USER_ID, make_note("a", start_date=now + timedelta(hours=3), end_date=now + timedelta(hours=5)))
+    scheduler.upsert(USER_ID, make_note("b", start_date=now + timedelta(hours=1)))
+    scheduler.upsert(USER_ID, make_note("c", start_date=now + timedelta(hours=2)))
+    assert len(scheduler) == 4
+
+    # b ertelenir, c silinir
+    scheduler.upsert(USER_ID, make_note("b", start_date=now + timedelta(hours=6)))
+    scheduler.upsert(USER_ID, make_note("c", start_date=now + timedelta(hours=2), deleted=True))
+    assert len(scheduler) == 3
+
+    fired = asyncio.run(scheduler.fire_due(time.time() + 10 * 3600))
+    assert fired == 3
+    assert drain(sink) == [("a", REMINDER_START), ("a", REMINDER_DUE_SOON), ("b", REMINDER_START)]
+    assert len(scheduler) == 0 and scheduler.stats()["next_in_seconds"] is None
+
+
+def test_due_soon_catch_up_only_on_writes():
+    scheduler, sink = make_scheduler()
+    note = make_note("a", end_date=datetime.utcnow() + timedelta(minutes=10))
+
+    async def notes():
+        yield note
+
+    # Açılış yüklemesi: lead süresi geçmiş hatırlatma önceki process'te tetiklenmiş olabilir
+    assert asyncio.run(scheduler.load(notes())) == 1
+    assert len(scheduler) == 0
+
+    # Yazma yolu: bitişe 10 dakika kalmış not hemen hatırlatılır
+    scheduler.upsert(USER_ID, note)
+    asyncio.run(scheduler.fire_due())
+    assert drain(sink) == [("a", REMINDER_DUE_SOON)]
+
+
+def test_cancel_and_compaction_keep_heap_bounded():
+    scheduler, _ = make_scheduler()
+    start = datetime.utcnow() + timedelta(days=1)
+    for round_ in range(3):
+        for i in range(1000):
+            scheduler.upsert(USER_ID, make_note(f"n{i}", start_date=start + timedelta(minutes=round_)))
+    for i in range(500):
+        scheduler.cancel(USER_ID, f"n{i}")
+
+    assert len(scheduler) == 500
+    assert scheduler.compactions > 0
+    assert len(scheduler._heap) <= 2 * len(scheduler) + 1024
+
+
+def test_worker_wakes_for_earlier_reminder():
+    async def run():
+        scheduler, sink = make_scheduler()
+        await scheduler.start()
+        scheduler.upsert(USER_ID, make_note("later", start_date=datetime.utcnow() + timedelta(hours=1)))
+        await asyncio.sleep(0)
+        scheduler.upsert(USER_ID, make_note("soon", start_date=datetime.utcnow() + timedelta(milliseconds=50)))
+        reminder = await asyncio.wait_for(sink.queue.get(), timeout=2)
+        await scheduler.stop()
+        return reminder
+
+    reminder = asyncio.run(run())
+    assert (reminder["note_id"], reminder["kind"]) == ("soon", REMINDER_START)
+
+
+def test_verify_skips_stale_reminders_and_reschedules():
+    scheduler, sink = make_scheduler()
+    now = datetime.utcnow()
+    start = now + timedelta(hours=1)
+    for note_id in ("kept", "deleted", "moved"):
+        scheduler.upsert(USER_ID, make_note(note_id, start_date=start))
+
+    # Başka bir instance'ta "deleted" silinmiş, "moved" ertelenmiş
+    stored = {
+        "kept": make_note("kept", start_date=start),
+        "deleted": make_note("deleted", start_date=start, deleted=True),
+        "moved": make_note("moved", start_date=start + timedelta(hours=3))
+    }
+
+    async def verify(user_id, note_id):
+        return stored.get(note_id)
+
+    scheduler.verify = verify
+    assert asyncio.run(scheduler.fire_due(time.time() + 2 * 3600)) == 1
+    assert drain(sink) == [("kept", REMINDER_START)]
+    assert scheduler.skipped == 2
+    # Ertelenen not yeni tarihine göre yeniden planlanır
+    assert len(scheduler) == 1
+    assert asyncio.run(scheduler.fire_due(time.time() + 4 * 3600)) == 1
+    assert drain(sink) == [("moved", REMINDER_START)]
+
+
+def test_disabled_scheduler_ignores_writes():
+    sink = QueueReminderSink(max_queue=10)
+    scheduler = ReminderScheduler(due_soon_lead=LEAD, sink=sink, enabled=False)
+    scheduler.upsert(USER_ID, make_note("a", start_date=datetime.utcnow() + timedelta(hours=1)))
+    asyncio.run(scheduler.start())
+    assert len(scheduler) == 0 and scheduler._task is None
@@ -0,0 +1,480 @@
+"""
+Not endpoint'lerinin Firestore RPC sayısı testleri
+Her mutasyonun tek okuma + tek yazma ile tamamlandığını, toplu işlemin
+tek okuma + tek commit ile yapıldığını ve çakışmanın operasyon bazında
+raporlandığını doğrular.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from firebase_admin import firestore_async
+from google.api_core import exceptions as gcp_exceptions
+
+from app import database
+from app.main import app
+from app.auth import get_current_user_id
+from app.database import db
+from app.etag import note_etag
+from app.search import search_index
+
+USER_ID = "user-1"
+NOTE_ID = "123e4567-e89b-12d3-a456-426614174000"
+
+
+class FakeSnapshot:
+    def __init__(self, doc_id, data, update_time):
+        self.id = doc_id
+        self._data = data
+        self.update_time = update_time
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+
+class FakeWriteResult:
+    def __init__(self, update_time):
+        self.update_time = update_time
+
+
+class FakeWriteOption:
+    def __init__(self, last_update_time):
+        self.last_update_time = last_update_time
+
+
+class FakeDocumentRef:
+    def __init__(self, store, doc_id):
+        self.store = store
+        self.id = doc_id
+
+    async def get(self, field_paths=None, transaction=None, timeout=None):
+        self.store.reads += 1
+        doc = self.store.docs.get(self.id)
+        if doc is None:
+            return FakeSnapshot(self.id, None, None)
+        data, update_time = doc
+        return FakeSnapshot(self.id, data, update_time)
+
+    async def set(self, data, timeout=None):
+        self.store.writes += 1
+        return FakeWriteResult(self.store.put(self.id, dict(data)))
+
+    async def update(self, changes, option=None, timeout=None):
+        self.store.writes += 1
+        doc = self.store.docs.get(self.id)
+        if doc is None:
+            raise gcp_exceptions.NotFound("not found")
+        data, update_time = doc
+        if option is not None and option.last_update_time != update_time:
+            raise gcp_exceptions.FailedPrecondition("stale")
+        return FakeWriteResult(self.store.put(self.id, {**data, **changes}))
+
+    async def delete(self, timeout=None):
+        self.store.writes += 1
+        self.store.docs.pop(self.id, None)
+
+
+class FakeQuery:
+    """Eşitlik filtresi, sıralama, start_after ve limit destekleyen sorgu"""
+
+    def __init__(self, store, filters=(), orders=(), cursor=None, count=None, fields=None):
+        self.store = store
+        self.filters = filters
+        self.orders = orders
+        self.cursor = cursor
+        self.count = count
+        self.fields = fields
+
+    def _copy(self, **changes):
+        state = {"filters": self.filters, "orders": self.orders, "cursor": self.cursor, "count": self.count, "fields": self.fields}
+        return FakeQuery(self.store, **{**state, **changes})
+
+    def where(self, field, op, value):
+        assert op == "=="
+        return self._copy(filters=self.filters + ((field, value),))
+
+    def order_by(self, field, direction="ASCENDING"):
+        return self._copy(orders=self.orders + ((field, direction == "DESCENDING"),))
+
+    def select(self, fields):
+        return self._copy(fields=fields)
+
+    def start_after(self, cursor):
+        return self._copy(cursor=cursor)
+
+    def limit(self, count):
+        return self._copy(count=count)
+
+    def _is_after(self, data):
+        for field, descending in self.orders:
+            value, bound = data[field], self.cursor[field]
+            if value != bound:
+                return value < bound if descending else value > bound
+        return False
+
+    async def stream(self, timeout=None):
+        self.store.reads += 1
+        docs = [
+            (doc_id, data, update_time) for doc_id, (data, update_time) in self.store.docs.items()
+            if all(data.get(field) == value for field, value in self.filters)
+        ]
+        for field, descending in reversed(self.orders):
+            docs.sort(key=lambda doc: doc[1][field], reverse=descending)
+        if self.cursor is not None:
+            docs = [doc for doc in docs if self._is_after(doc[1])]
+        for doc_id, data, update_time in docs[:self.count]:
+            if self.fields is not None:
+                data = {k: v for k, v in data.items() if k in self.fields}
+            yield FakeSnapshot(doc_id, data, update_time)
+
+
+class FakeCollection:
+    def __init__(self, store):
+        self.store = store
+
+    def document(self, doc_id):
+        return FakeDocumentRef(self.store, doc_id)
+
+    def where(self, field, op, value):
+        return FakeQuery(self.store).where(field, op, value)
+
+
+class FakeBatch:
+    """Yazmaları commit'te atomik uygulayan WriteBatch"""
+
+    def __init__(self, store):
+        self.store = store
+        self.writes = []
+
+    def set(self, ref, data):
+        self.writes.append((ref.id, data, None, True))
+
+    def update(self, ref, changes, option=None):
+        self.writes.append((ref.id, changes, option, False))
+
+    async def commit(self, timeout=None):
+        self.store.commits += 1
+        docs = dict(self.store.docs)
+        for doc_id, payload, option, is_set in self.writes:
+            if is_set:
+                continue
+            if doc_id not in docs:
+                raise gcp_exceptions.NotFound("not found")
+            if option is not None and option.last_update_time != docs[doc_id][1]:
+                raise gcp_exceptions.FailedPrecondition("stale")
+        results = []
+        for doc_id, payload, _, is_set in self.writes:
+            self.store.writes += 1
+            data = payload if is_set else {**self.store.docs[doc_id][0], **payload}
+            results.append(FakeWriteResult(self.store.put(doc_id, dict(data))))
+        return results
+
+
+class FakeFirestore:
+    """Sadece RPC sayımı için bellek içi Firestore"""
+
+    def __init__(self):
+        self.docs = {}
+        self.reads = 0
+        self.writes = 0
+        self.commits = 0
+
+    def put(self, doc_id, data):
+        update_time = datetime.now(timezone.utc)
+        # SERVER_TIMESTAMP gerçek Firestore'daki gibi commit zamanına çözülür
+        data = {k: update_time if v is firestore_async.SERVER_TIMESTAMP else v for k, v in data.items()}
+        self.docs[doc_id] = (data, update_time)
+        return update_time
+
+    def collection(self, name):
+        return FakeCollection(self)
+
+    def write_option(self, last_update_time):
+        return FakeWriteOption(last_update_time)
+
+    def batch(self):
+        return FakeBatch(self)
+
+    async def get_all(self, refs, field_paths=None, timeout=None):
+        for ref in refs:
+            snapshot = await ref.get()
+            if snapshot.exists and field_paths is not None:
+                snapshot._data = {k: v for k, v in snapshot._data.items() if k in field_paths}
+            yield snapshot
+
+    def reset_counts(self):
+        self.reads = 0
+        self.writes = 0
+
+
+@pytest.fixture
+def fake_store(monkeypatch):
+    store = FakeFirestore()
+    now = datetime.utcnow()
+    store.put(NOTE_ID, {
+        "id": NOTE_ID,
+        "user_id": USER_ID,
+        "title": "Başlık",
+        "content": "İçerik",
+        "start_date": None,
+        "end_date": None,
+        "pinned": False,
+        "deleted": False,
+        "tags": ["work"],
+        "created_at": now,
+        "updated_at": now
+    })
+    monkeypatch.setattr(db, "db", store)
+    db.cache.clear()
+    app.dependency_overrides[get_current_user_id] = lambda: USER_ID
+    yield store
+    app.dependency_overrides.clear()
+    db.cache.clear()
+
+
+@pytest.fixture
+def client(fake_store):
+    return TestClient(app)
+
+
+def test_update_note_is_one_read_one_write(client, fake_store):
+    response = client.put(f"/api/v1/notes/{NOTE_ID}", json={"title": "Yeni başlık"})
+    body = response.json()
+    assert body["isSuccess"] is True
+    assert body["data"]["title"] == "Yeni başlık"
+    assert (fake_store.reads, fake_store.writes) == (1, 1)
+
+
+def test_update_writes_server_timestamp(client, fake_store):
+    # Delta sync cursor'ı updated_at'e dayanır; uygulama sunucusunun saati yazılmaz
+    body = client.put(f"/api/v1/notes/{NOTE_ID}", json={"title": "Yeni başlık"}).json()
+    data, update_time = fake_store.docs[NOTE_ID]
+    assert data["updated_at"] == update_time
+    assert body["data"]["updated_at"] == update_time.replace(tzinfo=None).isoformat()
+
+
+def test_delete_note_is_one_read_one_write(client, fake_store):
+    response = client.delete(f"/api/v1/notes/{NOTE_ID}")
+    assert response.json()["isSuccess"] is True
+    assert (fake_store.reads, fake_store.writes) == (1, 1)
+
+
+def test_restore_note_is_one_read_one_write(client, fake_store):
+    client.delete(f"/api/v1/notes/{NOTE_ID}")
+    fake_store.reset_counts()
+    response = client.patch(f"/api/v1/notes/{NOTE_ID}/restore")
+    body = response.json()
+    assert body["isSuccess"] is True
+    assert body["data"]["deleted"] is False
+    assert (fake_store.reads, fake_store.writes) == (1, 1)
+
+
+def test_update_foreign_note_writes_nothing(client, fake_store):
+    app.dependency_overrides[get_current_user_id] = lambda: "someone-else"
+    response = client.put(f"/api/v1/notes/{NOTE_ID}", json={"title": "Yeni başlık"})
+    assert response.json()["errorCode"] == "NOTE_NOT_FOUND"
+    assert (fake_store.reads, fake_store.writes) == (1, 0)
+
+
+def test_concurrent_write_is_retried(fake_store):
+    original_update = FakeDocumentRef.update
+    calls = {"n": 0}
+
+    async def racing_update(self, changes, option=None, timeout=None):
+        # İlk yazmadan hemen önce başka bir istemci notu değiştirir
+        if calls["n"] == 0:
+            calls["n"] += 1
+            data, _ = self.store.docs[self.id]
+            self.store.put(self.id, {**data, "pinned": True})
+        return await original_update(self, changes, option=option, timeout=timeout)
+
+    FakeDocumentRef.update = racing_update
+    try:
+        note = asyncio.run(db.update_note(NOTE_ID, USER_ID, {"title": "Yeni başlık"}))
+    finally:
+        FakeDocumentRef.update = original_update
+
+    assert note["title"] == "Yeni başlık"
+    assert note["pinned"] is True
+    assert (fake_store.reads, fake_store.writes) == (2, 2)
+
+
+def test_conditional_get_returns_304_from_cache(client, fake_store):
+    etag = client.get(f"/api/v1/notes/{NOTE_ID}").headers["etag"]
+    fake_store.reset_counts()
+    response = client.get(f"/api/v1/notes/{NOTE_ID}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert (fake_store.reads, fake_store.writes) == (0, 0)
+
+
+def test_if_match_update_skips_read_when_cached(client, fake_store):
+    etag = client.get(f"/api/v1/notes/{NOTE_ID}").headers["etag"]
+    fake_store.reset_counts()
+    response = client.put(f"/api/v1/notes/{NOTE_ID}", json={"title": "Yeni başlık"}, headers={"If-Match": etag})
+    assert response.json()["isSuccess"] is True
+    assert (fake_store.reads, fake_store.writes) == (0, 1)
+
+    stale = client.put(f"/api/v1/notes/{NOTE_ID}", json={"title": "Eski"}, headers={"If-Match": etag})
+    assert stale.status_code == 412
+    assert stale.json()["errorCode"] == "PRECONDITION_FAILED"
+
+
+def test_if_match_rereads_when_cache_is_stale(client, fake_store):
+    client.get(f"/api/v1/notes/{NOTE_ID}")
+    # Başka bir worker notu bu sürecin cache'ini güncellemeden değiştirir
+    data, _ = fake_store.docs[NOTE_ID]
+    fake_store.put(NOTE_ID, {**data, "title": "Başka worker", "updated_at": firestore_async.SERVER_TIMESTAMP})
+    etag = note_etag(database._normalize_note(fake_store.docs[NOTE_ID][0]))
+    fake_store.reset_counts()
+
+    response = client.put(f"/api/v1/notes/{NOTE_ID}", json={"pinned": True}, headers={"If-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["data"]["title"] == "Başka worker"
+    assert (fake_store.reads, fake_store.writes) == (1, 1)
+
+    # Güncel snapshot da eşleşmiyorsa 412 döner
+    stale = client.put(f"/api/v1/notes/{NOTE_ID}", json={"pinned": False}, headers={"If-Match": etag})
+    assert stale.status_code == 412
+
+
+def test_batch_is_one_read_one_commit(client, fake_store):
+    response = client.post("/api/v1/notes/batch", json={"operations": [
+        {"op": "create", "note": {"title": "Yeni", "content": "İçerik"}},
+        {"op": "update", "noteId": NOTE_ID, "changes": {"title": "Yeni başlık"}},
+        {"op": "update", "noteId": NOTE_ID, "changes": {"pinned": True}}
+    ]})
+    results = response.json()["data"]
+    assert [result["isSuccess"] for result in results] == [True, True, True]
+    assert results[2]["data"]["title"] == "Yeni başlık" and results[2]["data"]["pinned"] is True
+    assert (fake_store.reads, fake_store.commits) == (1, 1)
+    assert fake_store.docs[NOTE_ID][0]["title"] == "Yeni başlık"
+
+
+def test_batch_reports_conflict_per_operation(client, fake_store):
+    original_get_all = FakeFirestore.get_all
+
+    async def racing_get_all(self, refs, timeout=None):
+        # Okumadan hemen sonra başka bir istemci notu değiştirir
+        async for snapshot in original_get_all(self, refs, timeout=timeout):
+            yield snapshot
+        data, _ = self.docs[NOTE_ID]
+        self.put(NOTE_ID, {**data, "title": "Başka istemci"})
+
+    FakeFirestore.get_all = racing_get_all
+    try:
+        response = client.post("/api/v1/notes/batch", json={"operations": [
+            {"op": "update", "noteId": NOTE_ID, "changes": {"title": "Yeni başlık"}},
+            {"op": "create", "note": {"title": "Yeni", "content": "İçerik"}},
+            {"op": "delete", "noteId": NOTE_ID}
+        ]})
+    finally:
+        FakeFirestore.get_all = original_get_all
+
+    results = response.json()["data"]
+    assert [(result["isSuccess"], result["errorCode"]) for result in results] == [
+        (False, "NOTE_CONFLICT"), (True, None), (False, "NOTE_CONFLICT")
+    ]
+    # Diğer istemcinin yazması ezilmez, çakışmayan create yine de yazılır
+    assert fake_store.docs[NOTE_ID][0]["title"] == "Başka istemci"
+    assert fake_store.docs[NOTE_ID][0]["deleted"] is False
+    assert results[1]["note_id"] in fake_store.docs
+
+
+def test_pagination_with_equal_timestamps(client, fake_store):
+    # Aynı anda oluşturulan notlar (ör. toplu içe aktarma) sayfa sınırında atlanmamalı
+    data, _ = fake_store.docs[NOTE_ID]
+    for i in range(1, 5):
+        note_id = NOTE_ID[:-1] + str(i)
+        fake_store.put(note_id, {**data, "id": note_id})
+
+    seen, page_token = [], None
+    while True:
+        params = {"limit": 2, **({"page_token": page_token} if page_token else {})}
+        body = client.get("/api/v1/notes/", params=params).json()
+        seen += [note["id"] for note in body["data"]]
+        page_token = body["nextPageToken"]
+        if not page_token:
+            break
+
+    assert seen == sorted(fake_store.docs, reverse=True)
+
+
+def test_summary_view_derives_snippet_for_old_notes(client, fake_store):
+    # Fixture'daki not snippet alanı eklenmeden önce oluşturulmuş gibi saklanır
+    body = client.get("/api/v1/notes/", params={"view": "summary"}).json()
+    assert body["data"][0]["snippet"] == "İçerik"
+    assert "content" not in body["data"][0]
+    # Liste sorgusu + eksik özetler için tek get_all
+    assert fake_store.reads == 2
+
+    fake_store.reset_counts()
+    body = client.put(f"/api/v1/notes/{NOTE_ID}", json={"content": "Yeni  içerik"}).json()
+    assert body["data"]["snippet"] == "Yeni içerik"
+
+
+def test_index_load_does_not_fill_note_cache(client, fake_store):
+    search_index.clear()
+    try:
+        body = client.get("/api/v1/notes/search", params={"q": "başlık"}).json()
+    finally:
+        search_index.clear()
+    assert [note["id"] for note in body["data"]] == [NOTE_ID]
+    # Toplu indeks yüklemesi tekil not cache'indeki sıcak kayıtları atmamalı
+    assert db.cache.stats()["entries"] == 0
+
+
+def test_save_ai_analyses_batches_and_retries_failed_batch_per_note(fake_store, monkeypatch):
+    monkeypatch.setattr(database, "MAX_BATCH_WRITES", 2)
+    data, _ = fake_store.docs[NOTE_ID]
+    for note_id in ("note-2", "note-3"):
+        fake_store.put(note_id, {**data, "id": note_id})
+    before = {note_id: doc[0]["updated_at"] for note_id, doc in fake_store.docs.items()}
+    analysis = {"note_type": "İş"}
+    fake_store.reset_counts()
+
+    # İkinci batch'teki silinmiş not commit'i düşürür; o batch tek tek yazılır
+    saved = asyncio.run(db.save_ai_analyses(USER_ID, [
+        (NOTE_ID, "key", analysis), ("note-2", "key", analysis), ("note-3", "key", analysis), ("silinmis", "key", analysis)
+    ]))
+    assert saved == 3
+    assert fake_store.commits == 2
+    assert "silinmis" not in fake_store.docs
+    for note_id, (data, _) in fake_store.docs.items():
+        assert data["ai_analysis"] == {"key": "key", "result": analysis}
+        # Analiz kaydı notun sürümünü (updated_at/ETag) değiştirmez
+        assert data["updated_at"] == before[note_id]
+
+
+def test_save_ai_analysis_checks_owner_when_not_cached(fake_store):
+    data, _ = fake_store.docs[NOTE_ID]
+    fake_store.put("foreign", {**data, "id": "foreign", "user_id": "user-2"})
+    analysis = {"note_type": "İş"}
+    fake_store.reset_counts()
+
+    assert asyncio.run(db.save_ai_analysis("foreign", USER_ID, "key", analysis)) is False
+    assert "ai_analysis" not in fake_store.docs["foreign"][0]
+    assert asyncio.run(db.save_ai_analysis("silinmis", USER_ID, "key", analysis)) is False
+
+    assert asyncio.run(db.save_ai_analysis(NOTE_ID, USER_ID, "key", analysis)) is True
+    assert fake_store.docs[NOTE_ID][0]["ai_analysis"] == {"key": "key", "result": analysis}
+    assert fake_store.writes == 1
+
+
+def test_save_ai_analysis_skips_note_changed_since_cached(client, fake_store):
+    client.get(f"/api/v1/notes/{NOTE_ID}")
+    fake_store.reset_counts()
+    assert asyncio.run(db.save_ai_analysis(NOTE_ID, USER_ID, "key", {"note_type": "İş"})) is True
+    assert (fake_store.reads, fake_store.writes) == (0, 1)
+
+    # Cache'teki sürümden sonra yazılan not için eski analiz kaydedilmez
+    data, _ = fake_store.docs[NOTE_ID]
+    fake_store.put(NOTE_ID, {**data, "content": "Yeni içerik", "ai_analysis": None})
+    assert asyncio.run(db.save_ai_analysis(NOTE_ID, USER_ID, "eski", {"note_type": "İş"})) is False
+    assert fake_store.docs[NOTE_ID][0]["ai_analysis"] is None
@@ -0,0 +1,64 @@
+"""
+Tam metin arama indeksi testleri
+Türkçe harf katlamayı, BM25 sıralamasını, artımlı güncellemeleri ve
+/notes/search endpoint'ini doğrular.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.search import UserSearchIndex
+from app.text import tokenize
+
+NOW = datetime(2025, 1, 15, 10, 30)
+
+
+def test_turkish_case_folding():
+    assert tokenize("İSTANBUL'da IŞIK") == ["istanbul", "da", "ışık"]
+    assert tokenize("Kâr marjı") == ["kar", "marjı"]
+
+
+def test_title_match_ranks_above_content_match(make_note):
+    index = UserSearchIndex()
+    index.add(make_note("a", "Alışveriş", "Toplantıdan sonra market"))
+    index.add(make_note("b", "Toplantı notları", "Bütçe konuşuldu"))
+    index.add(make_note("c", "Tatil", "Deniz kenarı"))
+
+    results = index.search("toplantı", limit=10)
+    assert [summary["id"] for summary, _ in results] == ["b", "a"]
+
+
+def test_incremental_update_delete_and_stale_version(make_note):
+    index = UserSearchIndex()
+    index.add(make_note("a", "Eski başlık", "içerik"))
+    index.add(make_note("a", "Yeni başlık", "içerik", updated_at=NOW + timedelta(minutes=1)))
+    assert index.search("eski", limit=10) == []
+    assert len(index.search("yeni", limit=10)) == 1
+
+    # Delta sync'ten gelen eski sürüm yeni sürümü ezmez
+    index.add(make_note("a", "Eski başlık", "içerik"))
+    assert index.search("eski", limit=10) == []
+
+    index.add(make_note("a", "Yeni başlık", "içerik", updated_at=NOW + timedelta(minutes=2), deleted=True))
+    assert index.search("yeni", limit=10) == []
+    assert index.postings == {} and index.total_length == 0
+
+
+@pytest.fixture
+def notes(make_note):
+    return [
+        make_note("123e4567-e89b-12d3-a456-426614174000", "Proje toplantısı", "Sprint planlaması", tags=["iş"]),
+        make_note("123e4567-e89b-12d3-a456-426614174001", "Market", "Süt, ekmek")
+    ]
+
+
+def test_search_endpoint_loads_index_once(client, index_reads):
+    response = client.get("/api/v1/notes/search", params={"q": "TOPLANTI"})
+    body = response.json()
+    assert body["isSuccess"]
+    assert [note["title"] for note in body["data"]] == ["Proje toplantısı"]
+    assert body["data"][0]["score"] > 0
+
+    client.get("/api/v1/notes/search", params={"q": "süt"})
+    assert index_reads == [None]
@@ -0,0 +1,65 @@
+"""
+Etiket indeksi testleri
+Facet sayaçlarının artımlı güncellenmesini, trie ile otomatik tamamlamayı
+ve /notes/tags endpoint'lerini doğrular.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.search import UserSearchIndex
+from app.tags import TagIndex
+
+NOW = datetime(2025, 1, 15, 10, 30)
+
+
+def test_counts_follow_note_updates_and_deletes(make_note):
+    index = UserSearchIndex()
+    index.add(make_note("a", tags=["iş", "acil"]))
+    index.add(make_note("b", tags=["iş"]))
+    assert index.tags.facets() == [("iş", 2), ("acil", 1)]
+
+    index.add(make_note("a", tags=["iş", "ev"], updated_at=NOW + timedelta(minutes=1)))
+    assert index.tags.facets() == [("iş", 2), ("ev", 1)]
+
+    index.add(make_note("b", tags=["iş"], updated_at=NOW + timedelta(minutes=1), deleted=True))
+    index.purge("a")
+    assert index.tags.facets() == []
+    # Boşalan trie dalları budanır
+    assert index.tags._root.children == {}
+
+
+def test_complete_is_case_insensitive_and_ranked_by_count():
+    tags = TagIndex()
+    tags.add(["İstanbul", "iş"])
+    tags.add(["iş", "İzmir"])
+    tags.add(["Işık"])
+
+    assert tags.complete("i", limit=10) == [("iş", 2), ("İstanbul", 1), ("İzmir", 1)]
+    assert tags.complete("İS", limit=1) == [("İstanbul", 1)]
+    assert tags.complete("ı", limit=10) == [("Işık", 1)]
+    assert tags.complete("yok", limit=10) == []
+
+
+@pytest.fixture
+def notes(make_note):
+    return [
+        make_note("123e4567-e89b-12d3-a456-426614174000", tags=["iş", "toplantı"]),
+        make_note("123e4567-e89b-12d3-a456-426614174001", tags=["iş"]),
+        make_note("123e4567-e89b-12d3-a456-426614174002", tags=["tatil"], deleted=True)
+    ]
+
+
+def test_tag_endpoints(client):
+    body = client.get("/api/v1/notes/tags").json()
+    assert body["isSuccess"]
+    assert body["data"] == [{"tag": "iş", "count": 2}, {"tag": "toplantı", "count": 1}]
+
+    body = client.get("/api/v1/notes/tags/autocomplete", params={"prefix": "TOP"}).json()
+    assert body["data"] == [{"tag": "toplantı", "count": 1}]
+
+
+def test_too_many_tag_filters_rejected(client):
+    response = client.get("/api/v1/notes/", params={"tag": [f"t{i}" for i in range(31)]})
+    assert response.json()["errorCode"] == "INVALID_TAGS"